@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+"""
+크롤러 공용 모듈
+gold-price-crawler와 yahoo-stocks-crawler가 함께 쓰는 WebDriver·엑셀 내보내기·차트 렌더링 도구
+(각 프로젝트는 common_path를 import하여 이 패키지를 경로에 추가)
+"""
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+스트리밍 엑셀 내보내기
+xlsxwriter constant_memory 모드로 행 단위로 기록하고, 컬럼 너비는 데이터프레임에서 미리 계산
+"""
+
+import logging
+import xlsxwriter
+
+logger = logging.getLogger(__name__)
+
+
+def column_widths(df, max_width=50):
+    """각 컬럼의 최대 문자열 길이(헤더 포함)로 엑셀 컬럼 너비 계산"""
+    widths = []
+    for col in df.columns:
+        lengths = df[col].astype(str).str.len()
+        max_length = max(len(str(col)), int(lengths.max()) if len(lengths) else 0)
+        widths.append(min(max_length + 2, max_width))
+    return widths
+
+
+def _cell(value):
+    """결측값(NaN, NaT, pd.NA)은 None, 나머지는 그대로"""
+    try:
+        return None if value != value else value
+    except TypeError:  # pd.NA는 비교 결과를 bool로 바꿀 수 없음
+        return None
+
+
+def write_sheet(workbook, sheet_name, df, index=False, header_format=None):
+    """데이터프레임 하나를 워크시트에 행 단위로 기록"""
+    if index:
+        df = df.reset_index()
+        if df.columns[0] == 'index':
+            df = df.rename(columns={'index': ''})
+
+    worksheet = workbook.add_worksheet(sheet_name)
+    for col_idx, width in enumerate(column_widths(df)):
+        worksheet.set_column(col_idx, col_idx, width)
+
+    worksheet.write_row(0, 0, [str(col) for col in df.columns], header_format)
+
+    # 시트 전체를 object로 복사하지 않고 한 행씩 변환 (NaN/NaT/NA는 빈 셀로 기록)
+    for row_idx, row in enumerate(df.itertuples(index=False, name=None), start=1):
+        worksheet.write_row(row_idx, 0, [_cell(value) for value in row])
+    return worksheet
+
+
+def export_sheets(filename, sheets):
+    """(시트명, 데이터프레임, index 포함 여부) 목록을 하나의 엑셀 파일로 스트리밍 저장"""
+    workbook = xlsxwriter.Workbook(filename, {
+        'constant_memory': True,
+        'default_date_format': 'yyyy-mm-dd',
+        'remove_timezone': True,
+    })
+    try:
+        header_format = workbook.add_format({'bold': True, 'border': 1, 'align': 'center'})
+        for sheet_name, df, index in sheets:
+            write_sheet(workbook, sheet_name, df, index=index, header_format=header_format)
+    finally:
+        workbook.close()
+    logger.info(f"엑셀 파일 저장 완료: {filename} ({len(sheets)}개 시트)")
+    return True
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+차트 렌더링 캐시
+차트 입력 데이터·플롯 설정·라이브러리 버전의 해시가 같으면 기존 이미지를 재사용하고,
+출력 디렉토리의 매니페스트로 오래 쓰이지 않은 이미지를 LRU 방식으로 정리
+"""
+
+import os
+import json
+import time
+import hashlib
+import inspect
+import logging
+from importlib import metadata
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = ".render_cache.json"
+MTIME_TOLERANCE = 0.05  # 파일 시스템 시각과 time.time()의 오차(초)
+VERSIONED_PACKAGES = ['matplotlib', 'seaborn', 'pandas', 'numpy']
+
+
+def library_versions():
+    """렌더링 결과에 영향을 주는 라이브러리 버전"""
+    versions = {}
+    for package in VERSIONED_PACKAGES:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+
+def method_fingerprint(method):
+    """차트 메서드 소스 코드 해시 (코드가 바뀌면 캐시 무효화)"""
+    try:
+        source = inspect.getsource(method)
+    except (OSError, TypeError):
+        source = method.__qualname__
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+
+class RenderCache:
+    """출력 디렉토리별 차트 렌더링 캐시 (매니페스트 + LRU 정리)"""
+
+    def __init__(self, output_dir, max_entries=64):
+        self.output_dir = output_dir
+        self.max_entries = max_entries
+        self.manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+        self.versions = library_versions()
+        self.entries = self._load_manifest()
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('entries', {})
+        except (OSError, ValueError):
+            return {}
+
+    def key(self, chart, data, params=None):
+        """차트 이름·입력 데이터 조각·플롯 설정·라이브러리 버전으로 캐시 키 계산"""
+        digest = hashlib.sha256()
+        digest.update(chart.encode('utf-8'))
+        digest.update(json.dumps([list(map(str, data.columns)), list(map(str, data.dtypes))]).encode('utf-8'))
+        digest.update(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+        digest.update(json.dumps(params or {}, sort_keys=True, default=str).encode('utf-8'))
+        digest.update(json.dumps(self.versions, sort_keys=True).encode('utf-8'))
+        return digest.hexdigest()
+
+    def hit(self, key):
+        """같은 키로 만든 이미지가 모두 남아 있으면 True (사용 시각 갱신)"""
+        entry = self.entries.get(key)
+        if not entry:
+            return False
+        if not all(os.path.exists(os.path.join(self.output_dir, name)) for name in entry['files']):
+            del self.entries[key]
+            return False
+        entry['last_used'] = time.time()
+        return True
+
+    def record(self, key, chart, files, rendered_after=None):
+        """새로 렌더링한 이미지 등록 (같은 파일을 가리키던 이전 항목은 덮어써졌으므로 제거)
+
+        rendered_after(렌더링 시작 시각) 이후에 쓰이지 않은 파일이 하나라도 있으면 렌더링이 실패한 것이므로
+        이전 실행의 이미지를 새 키로 등록하지 않음
+        """
+        paths = [os.path.join(self.output_dir, name) for name in files]
+        fresh = all(os.path.exists(path) and (rendered_after is None
+                                              or os.path.getmtime(path) >= rendered_after - MTIME_TOLERANCE)
+                    for path in paths)
+        if not files or not fresh:
+            logger.warning(f"렌더링되지 않은 차트는 캐시에 등록하지 않음: {chart}")
+            return False
+        for old_key in [k for k, entry in self.entries.items() if set(entry['files']) & set(files)]:
+            del self.entries[old_key]
+        self.entries[key] = {'chart': chart, 'files': files, 'last_used': time.time()}
+        return True
+
+    def evict(self):
+        """최대 항목 수를 넘으면 가장 오래 사용되지 않은 이미지부터 삭제"""
+        stale = sorted(self.entries, key=lambda k: self.entries[k]['last_used'])[:max(len(self.entries) - self.max_entries, 0)]
+        for key in stale:
+            for name in self.entries.pop(key)['files']:
+                path = os.path.join(self.output_dir, name)
+                if os.path.exists(path):
+                    os.remove(path)
+            logger.info(f"렌더링 캐시 정리: {key[:12]}")
+        return len(stale)
+
+    def save(self):
+        """LRU 정리 후 매니페스트 저장"""
+        self.evict()
+        os.makedirs(self.output_dir, exist_ok=True)
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'versions': self.versions, 'entries': self.entries}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.manifest_path)
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+차트 출력 프로파일
+- preview: 72 dpi WebP (대시보드·미리보기)
+- report: 300 dpi PNG (보고서, 기본)
+- vector: SVG + PDF (인쇄·편집)
+소비처(consumer)를 지정하면 그 용도를 만족하는 가장 가벼운 프로파일을 선택
+"""
+
+import os
+import matplotlib.pyplot as plt
+
+PROFILES = {
+    'preview': {'formats': ['webp'], 'dpi': 72, 'options': {'pil_kwargs': {'quality': 80}}},
+    'report': {'formats': ['png'], 'dpi': 300, 'options': {}},
+    'vector': {'formats': ['svg', 'pdf'], 'dpi': 300, 'options': {}},
+}
+DEFAULT_PROFILE = 'report'
+# 모든 프로파일에 공통으로 적용하는 savefig 옵션
+SAVEFIG_OPTIONS = {'bbox_inches': 'tight'}
+
+# 소비처 -> 프로파일
+CONSUMER_PROFILES = {
+    'dashboard': 'preview',
+    'web': 'preview',
+    'report': 'report',
+    'excel': 'report',
+    'print': 'vector',
+}
+
+
+def resolve_profile(profile=None, consumer=None):
+    """프로파일 이름 결정 (직접 지정 > 소비처 > 기본값)"""
+    if profile is None:
+        profile = CONSUMER_PROFILES.get(consumer, DEFAULT_PROFILE) if consumer else DEFAULT_PROFILE
+    if profile not in PROFILES:
+        raise ValueError(f"지원하지 않는 출력 프로파일: {profile}")
+    return profile
+
+
+def profile_files(stem, profile):
+    """프로파일로 저장될 파일 이름 목록"""
+    return [f"{stem}.{fmt}" for fmt in PROFILES[profile]['formats']]
+
+
+def profile_settings(profile):
+    """프로파일로 저장할 때 실제로 쓰는 형식·해상도·savefig 옵션 (렌더링 캐시 키에 포함)"""
+    settings = PROFILES[profile]
+    return {'formats': settings['formats'], 'dpi': settings['dpi'],
+            'options': {**SAVEFIG_OPTIONS, **settings['options']}}
+
+
+def save_figure(output_dir, stem, profile=DEFAULT_PROFILE, figure=None):
+    """현재(또는 지정한) 그림을 프로파일의 형식·해상도로 저장하고 파일 이름 목록 반환"""
+    settings = profile_settings(profile)
+    figure = figure or plt.gcf()
+    names = profile_files(stem, profile)
+    for name, fmt in zip(names, settings['formats']):
+        figure.savefig(os.path.join(output_dir, name), format=fmt, dpi=settings['dpi'], **settings['options'])
+    return names
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+차트 병렬 렌더링 스케줄러
+시각화 클래스의 각 차트 메서드를 Agg 백엔드 프로세스 풀에 나눠 실행
+데이터프레임은 작업마다 피클링하지 않고 Arrow IPC 파일 하나로 저장한 뒤 워커가 메모리 맵으로 읽음
+"""
+
+import os
+import time
+import logging
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+# 워커 프로세스마다 한 번만 만드는 시각화 객체
+_worker_visualizer = None
+
+
+def write_shared_frame(df, path):
+    """데이터프레임을 Arrow IPC 파일로 저장 (워커가 메모리 맵으로 공유)"""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.OSFile(path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    return path
+
+
+def read_shared_frame(path):
+    """메모리 맵으로 Arrow IPC 파일을 읽어 데이터프레임으로 변환 (숫자 컬럼은 복사 없이 사용)"""
+    with pa.memory_map(path, 'r') as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas(split_blocks=True)
+
+
+def _init_worker(shared_path, visualizer_cls, init_kwargs, attributes):
+    """워커 초기화: Agg 백엔드 설정 후 공유 데이터로 시각화 객체 생성"""
+    global _worker_visualizer
+    import matplotlib
+    matplotlib.use('Agg')
+
+    visualizer = visualizer_cls(df=read_shared_frame(shared_path), **init_kwargs)
+    visualizer.__dict__.update(attributes)
+    _worker_visualizer = visualizer
+
+
+def _render(method_name):
+    """차트 메서드 하나를 실행하고 소요 시간 반환"""
+    start = time.perf_counter()
+    getattr(_worker_visualizer, method_name)()
+    return method_name, time.perf_counter() - start, os.getpid()
+
+
+class RenderScheduler:
+    """차트 메서드를 프로세스 풀에 분배하고 차트별 소요 시간을 수집"""
+
+    def __init__(self, visualizer_cls, init_kwargs=None, attributes=None, max_workers=None):
+        self.visualizer_cls = visualizer_cls
+        self.init_kwargs = init_kwargs or {}
+        self.attributes = attributes or {}  # 워커의 시각화 객체에 그대로 설정할 속성 (출력 디렉토리 등)
+        self.max_workers = max_workers
+        self.timings = {}
+        self.wall_time = 0.0
+
+    def run(self, df, method_names):
+        """모든 차트를 병렬로 렌더링하고 {메서드명: 초}를 반환"""
+        self.timings = {}
+        workers = self.max_workers or min(len(method_names), os.cpu_count() or 1)
+
+        fd, shared_path = tempfile.mkstemp(suffix='.arrow', prefix='render_')
+        os.close(fd)
+        try:
+            write_shared_frame(df, shared_path)
+            started = time.perf_counter()
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(shared_path, self.visualizer_cls, self.init_kwargs, self.attributes)) as executor:
+                futures = [executor.submit(_render, name) for name in method_names]
+                for future in as_completed(futures):
+                    name, elapsed, _ = future.result()
+                    self.timings[name] = elapsed
+            self.wall_time = time.perf_counter() - started
+        finally:
+            os.remove(shared_path)
+        return self.timings
+
+    def run_serial(self, visualizer, method_names):
+        """같은 차트를 현재 프로세스에서 순서대로 렌더링 (비교·대체 실행용)"""
+        self.timings = {}
+        started = time.perf_counter()
+        for name in method_names:
+            start = time.perf_counter()
+            getattr(visualizer, name)()
+            self.timings[name] = time.perf_counter() - start
+        self.wall_time = time.perf_counter() - started
+        return self.timings
+
+    def report(self):
+        """차트별 소요 시간 로그 기록"""
+        for name, elapsed in sorted(self.timings.items(), key=lambda item: -item[1]):
+            logger.info(f"⏱  {name}: {elapsed:.2f}초")
+        if self.timings:
+            logger.info(f"⏱  전체 {self.wall_time:.2f}초 (차트 합계 {sum(self.timings.values()):.2f}초)")
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+크롤러 상시 실행기
+미리 띄워둔 WebDriverPool 하나를 소유한 채 금 시세·주식 크롤러를 같은 프로세스에서 주기적으로 연속 실행
+(스크립트를 따로 실행하면 매번 Chrome을 새로 띄우므로, 몇 분마다 실행할 때는 이 실행기를 사용)
+
+사용법 (cursorstudy 디렉토리에서): python -m crawler_common.runner [--interval 5] [--once]
+"""
+
+import os
+import sys
+import time
+import argparse
+import importlib
+import logging
+from crawler_common.webdriver_utils import WebDriverPool
+
+logger = logging.getLogger(__name__)
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (이름, 프로젝트 디렉토리, 모듈, 크롤러 클래스, 생성자 인자, run 인자) - 단독 실행(main)과 같은 설정
+CRAWL_JOBS = [
+    ('금 시세', 'gold-price-crawler', 'gold_crawler', 'GoldPriceCrawler',
+     {'fetch_mode': 'selenium', 'incremental': True}, {'target_count': 100}),
+    ('주식 상승률', 'yahoo-stocks-crawler', 'yahoo_stocks_crawler', 'YahooStocksCrawler', {}, {}),
+]
+
+
+def import_project_module(project_dir, module_name):
+    """프로젝트 디렉토리의 모듈을 import
+    프로젝트마다 같은 이름의 모듈(storage 등)이 있으므로 import가 끝나면 프로젝트 모듈을 캐시에서 빼서 섞이지 않게 함
+    (이미 import한 모듈은 자신이 참조하는 프로젝트 모듈을 그대로 사용)"""
+    local = {os.path.splitext(name)[0] for name in os.listdir(project_dir) if name.endswith('.py')}
+    saved = {name: sys.modules.pop(name) for name in local if name in sys.modules}
+    sys.path.insert(0, project_dir)
+    try:
+        return importlib.import_module(module_name)
+    finally:
+        sys.path.remove(project_dir)
+        for name in local:
+            sys.modules.pop(name, None)
+        sys.modules.update(saved)
+
+
+class CrawlRunner:
+    """WebDriverPool을 소유하고 등록된 크롤러를 같은 풀로 순서대로 실행"""
+
+    def __init__(self, jobs=CRAWL_JOBS, pool=None, root_dir=ROOT_DIR):
+        self.pool = pool or WebDriverPool(size=1)
+        self.jobs = []
+        for name, project, module_name, class_name, init_kwargs, run_kwargs in jobs:
+            project_dir = os.path.join(root_dir, project)
+            crawler_class = getattr(import_project_module(project_dir, module_name), class_name)
+            self.jobs.append((name, project_dir, crawler_class, init_kwargs, run_kwargs))
+
+    def warm_up(self):
+        """풀의 드라이버를 미리 생성 (실패해도 크롤러가 대여할 때 다시 생성을 시도)"""
+        try:
+            self.pool.warm_up()
+            return True
+        except Exception as e:
+            logger.warning(f"WebDriver 풀 준비 실패: {e}")
+            return False
+
+    def run_once(self):
+        """등록된 크롤러를 한 번씩 실행하고 {이름: 성공 여부} 반환"""
+        results = {}
+        for name, project_dir, crawler_class, init_kwargs, run_kwargs in self.jobs:
+            cwd = os.getcwd()
+            os.chdir(project_dir)  # 단독 실행과 같은 위치에 저장소·엑셀·상태 파일 저장
+            try:
+                crawler = crawler_class(driver_pool=self.pool, **init_kwargs)
+                results[name] = bool(crawler.run(**run_kwargs))
+            except Exception as e:
+                logger.error(f"{name} 크롤링 중 오류 발생: {e}")
+                results[name] = False
+            finally:
+                os.chdir(cwd)
+            logger.info(f"{name} 크롤링 {'성공' if results[name] else '실패'}")
+
+        # 사용 횟수 초과·오류로 폐기된 드라이버는 다음 실행 전에 미리 다시 생성
+        self.warm_up()
+        return results
+
+    def run_forever(self, interval_minutes):
+        """interval_minutes분마다 run_once 실행 (실행 시간만큼 대기 시간을 줄임)"""
+        while True:
+            started = time.monotonic()
+            self.run_once()
+            time.sleep(max(0.0, interval_minutes * 60 - (time.monotonic() - started)))
+
+    def close(self):
+        """풀의 드라이버를 모두 종료"""
+        self.pool.close()
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description="금 시세·주식 크롤러 상시 실행 (WebDriver 풀 공유)")
+    parser.add_argument('--interval', type=float, default=5, help="실행 간격(분)")
+    parser.add_argument('--once', action='store_true', help="한 번만 실행하고 종료")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    runner = CrawlRunner()
+    runner.warm_up()
+    try:
+        if args.once:
+            results = runner.run_once()
+            for name, success in results.items():
+                print(f"{'✅' if success else '❌'} {name} 크롤링 {'성공' if success else '실패'}")
+        else:
+            runner.run_forever(args.interval)
+    except KeyboardInterrupt:
+        print("실행을 종료합니다.")
+    finally:
+        runner.close()
+
+
+if __name__ == "__main__":
+    main()
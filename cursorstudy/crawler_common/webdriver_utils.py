@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Selenium WebDriver 공용 유틸리티
+- chromedriver 경로 캐시 (매 실행마다 버전 확인 요청을 보내지 않음)
+- Chrome WebDriver 생성 및 재사용 가능한 드라이버 풀 (크롤러는 항상 풀에서 대여)
+- 고정 sleep 대신 실제 DOM 변화(행 렌더링, 요소 교체, 페이지 표시 변경)를 기다리고 대기 시간을 기록
+"""
+
+import os
+import re
+import json
+import time
+import atexit
+import shutil
+import logging
+import threading
+import subprocess
+from contextlib import contextmanager
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, WebDriverException
+from webdriver_manager.chrome import ChromeDriverManager
+
+logger = logging.getLogger(__name__)
+
+# chromedriver 경로와 Chrome 버전을 기록하는 로컬 매니페스트
+DRIVER_MANIFEST = os.path.join(os.path.expanduser("~"), ".cache", "crawler_chromedriver.json")
+
+CHROME_BINARIES = [
+    "google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome",
+    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+]
+
+
+def detect_chrome_version():
+    """설치된 Chrome의 메이저 버전 확인 (네트워크 없이 로컬 바이너리로 확인)"""
+    for binary in [os.environ.get("CHROME_BINARY")] + CHROME_BINARIES:
+        if not binary or not (shutil.which(binary) or os.path.exists(binary)):
+            continue
+        try:
+            output = subprocess.run([binary, "--version"], capture_output=True, text=True, timeout=10).stdout
+        except (OSError, subprocess.SubprocessError):
+            continue
+        match = re.search(r"(\d+)\.\d+\.\d+", output)
+        if match:
+            return match.group(1)
+    return None
+
+
+def resolve_chromedriver_path(manifest_file=DRIVER_MANIFEST):
+    """chromedriver 경로를 매니페스트에서 찾고, 없거나 Chrome이 업그레이드된 경우에만 새로 설치"""
+    # 환경 변수로 경로를 고정한 경우 (폐쇄망 러너)
+    env_path = os.environ.get("CHROMEDRIVER_PATH")
+    if env_path and os.path.exists(env_path):
+        return env_path
+
+    chrome_version = detect_chrome_version()
+    manifest = {}
+    if os.path.exists(manifest_file):
+        try:
+            with open(manifest_file, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"chromedriver 매니페스트 로드 실패: {e}")
+
+    cached_path = manifest.get("driver_path")
+    if cached_path and os.path.exists(cached_path):
+        # Chrome 버전을 확인할 수 없으면 캐시된 드라이버를 그대로 사용
+        if chrome_version is None or manifest.get("chrome_version") == chrome_version:
+            logger.info(f"캐시된 chromedriver 사용: {cached_path}")
+            return cached_path
+        logger.info(f"Chrome 버전 변경 감지 ({manifest.get('chrome_version')} -> {chrome_version}), chromedriver 재설치")
+
+    driver_path = ChromeDriverManager().install()
+    try:
+        os.makedirs(os.path.dirname(manifest_file) or ".", exist_ok=True)
+        with open(manifest_file, "w", encoding="utf-8") as f:
+            json.dump({"driver_path": driver_path, "chrome_version": chrome_version}, f)
+    except OSError as e:
+        logger.warning(f"chromedriver 매니페스트 저장 실패: {e}")
+    return driver_path
+
+
+def create_chrome_options():
+    """크롤러 공통 헤드리스 Chrome 옵션"""
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")  # 브라우저 창을 띄우지 않음
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--window-size=1920,1080")
+    chrome_options.add_argument("--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+    return chrome_options
+
+
+def create_chrome_driver():
+    """새 헤드리스 Chrome WebDriver 생성"""
+    service = Service(resolve_chromedriver_path())
+    # 명시적 대기만 사용하므로 implicit wait는 설정하지 않음
+    return webdriver.Chrome(service=service, options=create_chrome_options())
+
+
+def is_driver_alive(driver):
+    """드라이버 세션이 살아 있는지 확인"""
+    try:
+        driver.current_url
+        return True
+    except WebDriverException:
+        return False
+
+
+class WebDriverPool:
+    """헤드리스 Chrome 인스턴스를 미리 띄워두고 크롤러 작업에 대여하는 풀"""
+
+    def __init__(self, size=2, max_uses=20, driver_factory=create_chrome_driver):
+        self.size = size  # 동시에 유지할 최대 드라이버 수
+        self.max_uses = max_uses  # 이 횟수만큼 대여되면 드라이버를 새로 생성
+        self.driver_factory = driver_factory
+        self._idle = []
+        self._uses = {}
+        self._created = 0
+        self._cond = threading.Condition()
+
+    def warm_up(self):
+        """풀 크기만큼 드라이버를 미리 생성"""
+        while True:
+            with self._cond:
+                if self._created >= self.size:
+                    break
+                self._created += 1
+            try:
+                driver = self.driver_factory()
+            except Exception:
+                with self._cond:
+                    self._created -= 1
+                raise
+            with self._cond:
+                self._uses[id(driver)] = 0
+                self._idle.append(driver)
+                self._cond.notify()
+        logger.info(f"WebDriver 풀 준비 완료 ({self.size}개)")
+
+    def acquire(self, timeout=None):
+        """유휴 드라이버를 대여 (없으면 새로 생성하거나 반납될 때까지 대기)"""
+        while True:
+            with self._cond:
+                if not self._cond.wait_for(lambda: self._idle or self._created < self.size, timeout):
+                    raise TimeoutError("대여 가능한 WebDriver가 없습니다.")
+                driver = self._idle.pop() if self._idle else None
+                if driver is None:
+                    self._created += 1
+
+            if driver is None:
+                try:
+                    driver = self.driver_factory()
+                except Exception:
+                    with self._cond:
+                        self._created -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._uses[id(driver)] = 0
+                logger.info("WebDriver 풀: 새 드라이버 생성")
+                return driver
+
+            if is_driver_alive(driver):
+                return driver
+
+            # 유휴 상태에서 죽은 드라이버는 버리고 다시 시도
+            logger.warning("WebDriver 풀: 응답 없는 드라이버 폐기")
+            self._discard(driver)
+
+    def release(self, driver, broken=False):
+        """드라이버를 반납 (상태 초기화 후 재사용, 사용 횟수 초과·오류 시 재생성)"""
+        with self._cond:
+            uses = self._uses[id(driver)] = self._uses.get(id(driver), 0) + 1
+        if broken or uses >= self.max_uses or not self._reset(driver):
+            logger.info("WebDriver 풀: 드라이버 재활용 (폐기)")
+            self._discard(driver)
+            return
+        with self._cond:
+            self._idle.append(driver)
+            self._cond.notify()
+
+    @contextmanager
+    def lease(self, timeout=None):
+        """with 문으로 드라이버를 대여하고 자동 반납"""
+        driver = self.acquire(timeout)
+        broken = False
+        try:
+            yield driver
+        except WebDriverException:
+            broken = True
+            raise
+        finally:
+            self.release(driver, broken=broken)
+
+    def close(self):
+        """유휴 드라이버를 모두 종료"""
+        with self._cond:
+            idle, self._idle = self._idle, []
+        for driver in idle:
+            self._discard(driver)
+        logger.info("WebDriver 풀 종료")
+
+    def _reset(self, driver):
+        """다음 대여를 위해 쿠키·스토리지·추가 창을 정리"""
+        try:
+            try:
+                driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+            except WebDriverException:
+                pass  # about:blank 등 스토리지 접근이 불가능한 페이지
+            driver.delete_all_cookies()
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            driver.get("about:blank")
+            return True
+        except WebDriverException as e:
+            logger.warning(f"WebDriver 상태 초기화 실패: {e}")
+            return False
+
+    def _discard(self, driver):
+        """드라이버 종료 후 풀에서 제거"""
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass
+        with self._cond:
+            self._uses.pop(id(driver), None)
+            self._created -= 1
+            self._cond.notify()
+
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def shared_pool():
+    """프로세스 전체에서 함께 쓰는 WebDriverPool (처음 대여할 때 드라이버 생성, 프로세스 종료 시 자동으로 닫음)
+    스크립트를 따로 실행하면 실행마다 새 프로세스이므로 Chrome도 매번 새로 뜸 -> 주기 실행은 crawler_common.runner 사용"""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = WebDriverPool(size=1)
+            atexit.register(_shared_pool.close)
+        return _shared_pool
+
+
+class WaitTimer:
+    """페이지별 대기 시간 기록"""
+
+    def __init__(self):
+        self.records = []
+
+    def measure(self, label, wait_func, *args, **kwargs):
+        """대기 함수를 실행하고 걸린 시간을 기록"""
+        start = time.perf_counter()
+        try:
+            return wait_func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.records.append((label, elapsed))
+            logger.info(f"{label} 대기 시간: {elapsed:.2f}초")
+
+    def total(self):
+        """전체 대기 시간 (초)"""
+        return sum(elapsed for _, elapsed in self.records)
+
+    def report(self):
+        """대기 시간 요약 로그 출력"""
+        if not self.records:
+            return
+        logger.info(f"총 대기 시간: {self.total():.2f}초 ({len(self.records)}회, "
+                    f"최대 {max(elapsed for _, elapsed in self.records):.2f}초)")
+
+
+def wait_for_rows(driver, row_selector, min_rows=1, timeout=20):
+    """행이 min_rows개 이상 렌더링될 때까지 대기하고 행 수를 반환"""
+    def count_rows(d):
+        count = len(d.find_elements(By.CSS_SELECTOR, row_selector))
+        return count if count >= min_rows else False
+
+    return WebDriverWait(driver, timeout).until(count_rows)
+
+
+def wait_for_any_selector(driver, selectors, timeout=20):
+    """여러 선택자 중 먼저 나타나는 요소를 기다려 (선택자, 요소)를 반환"""
+    def find_first(d):
+        for selector in selectors:
+            elements = d.find_elements(By.CSS_SELECTOR, selector)
+            if elements:
+                return selector, elements[0]
+        return False
+
+    return WebDriverWait(driver, timeout).until(find_first)
+
+
+def wait_for_page_change(driver, old_element, indicator_selector=None, old_indicator_text=None, timeout=20):
+    """이전 페이지의 요소가 교체(stale)되거나 페이지 표시가 바뀔 때까지 대기"""
+    def changed(d):
+        try:
+            old_element.is_enabled()
+        except StaleElementReferenceException:
+            return True
+        if indicator_selector:
+            try:
+                return d.find_element(By.CSS_SELECTOR, indicator_selector).text != old_indicator_text
+            except (NoSuchElementException, StaleElementReferenceException):
+                return False
+        return False
+
+    return WebDriverWait(driver, timeout).until(changed)
+
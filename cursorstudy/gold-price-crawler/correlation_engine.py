@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+다중 자산 상관관계 엔진
+금 종류별 시세, 주식 종목 가격, 환율 등 임의 개수의 시계열에 대해 피어슨/스피어만 상관계수를
+결측값은 쌍별로 제외(pairwise-complete)하여 컬럼 블록 단위 NumPy 행렬곱으로 계산
+스피어만은 두 시리즈가 모두 있는 행에서 다시 순위를 매겨야 하므로 결측값이 있는 쌍만 누적합 기반 순위로 따로 계산
+"""
+
+import numpy as np
+import pandas as pd
+
+METHODS = ('pearson', 'spearman')
+
+
+def align_series(series_map):
+    """{이름: 날짜 인덱스 시리즈}를 날짜 기준 외부 조인한 프레임으로 정렬 (없는 날짜는 NaN)"""
+    return pd.concat(series_map, axis=1, join='outer').sort_index()
+
+
+def _prepare(frame, method):
+    """float64 행렬(결측값 0)과 유효값 마스크 생성 (스피어만은 시리즈별 순위로 변환, 결측값 없는 쌍에만 유효)"""
+    if method not in METHODS:
+        raise ValueError(f"지원하지 않는 상관계수 방식: {method}")
+    if method == 'spearman':
+        frame = frame.rank()
+    values = frame.to_numpy(dtype='float64')
+    mask = ~np.isnan(values)
+    # 열 평균으로 중심화하여 큰 가격값의 제곱합에서 생기는 자릿수 손실을 줄임
+    with np.errstate(invalid='ignore'):
+        values = values - np.nanmean(values, axis=0)
+    return np.where(mask, values, 0.0), mask.astype('float64')
+
+
+def _block(x_left, m_left, x_right, m_right, min_periods):
+    """두 컬럼 블록 사이의 쌍별 완전 피어슨 상관계수와 관측치 수"""
+    n = m_left.T @ m_right
+    sum_left = x_left.T @ m_right
+    sum_right = m_left.T @ x_right
+    sq_left = (x_left ** 2).T @ m_right
+    sq_right = m_left.T @ (x_right ** 2)
+    cross = x_left.T @ x_right
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = cross - sum_left * sum_right / n
+        var_left = sq_left - sum_left ** 2 / n
+        var_right = sq_right - sum_right ** 2 / n
+        corr = cov / np.sqrt(var_left * var_right)
+    corr[(n < max(min_periods, 2)) | (var_left <= 0) | (var_right <= 0)] = np.nan
+    return np.clip(corr, -1.0, 1.0), n
+
+
+def _rank_layout(values):
+    """열별 정렬 순서, 유효값 수, 동률 위치 (정렬 위치·같은 값 묶음의 첫/마지막 위치, 열 순서로 나열)
+    NaN은 정렬 순서의 맨 뒤에 오고 서로 같은 값으로 보지 않음"""
+    n, k = values.shape
+    order = np.argsort(values, axis=0, kind='stable')
+    ordered = np.take_along_axis(values, order, axis=0)
+    same = ordered[1:] == ordered[:-1]
+    first = np.ones((n, k), dtype=bool)
+    first[1:] = ~same
+    last = np.ones((n, k), dtype=bool)
+    last[:-1] = ~same
+    positions = np.arange(n)[:, None]
+    first_pos = np.maximum.accumulate(np.where(first, positions, 0), axis=0)
+    last_pos = np.minimum.accumulate(np.where(last, positions, n - 1)[::-1], axis=0)[::-1]
+    tie_col, tie_pos = np.nonzero(~(first & last).T)
+    ties = (tie_pos, first_pos[tie_pos, tie_col], last_pos[tie_pos, tie_col],
+            np.searchsorted(tie_col, np.arange(k + 1)))
+    return order, (~np.isnan(values)).sum(axis=0), ties
+
+
+def _tie_entries(ties, cols):
+    """cols 열들의 동률 위치 (정렬 위치, 첫 위치, 마지막 위치, 블록 안 열 번호)"""
+    tie_pos, tie_first, tie_last, bounds = ties
+    starts = bounds[cols]
+    lengths = bounds[cols + 1] - starts
+    picked = np.arange(lengths.sum()) + np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return tie_pos[picked], tie_first[picked], tie_last[picked], np.repeat(np.arange(len(cols)), lengths)
+
+
+def _ranks_in_order(kept, tie_pos, tie_first, tie_last, tie_slot=None):
+    """정렬 순서로 놓인 포함 여부(kept)만으로 매긴 순위 (동률은 평균 순위, pandas rank와 같음)
+    포함된 행 수의 누적합이므로 다시 정렬하지 않고 여러 마스크를 한 번에 처리
+    tie_slot이 None이면 모든 열이 같은 시리즈의 정렬 순서(동률 위치)를 공유"""
+    through = np.cumsum(kept.astype('float64'), axis=0)
+    ranks = through.copy()
+    if tie_slot is None:
+        ranks[tie_pos] = (through[tie_first] - kept[tie_first] + through[tie_last] + 1) / 2.0
+    else:
+        ranks[tie_pos, tie_slot] = (through[tie_first, tie_slot] - kept[tie_first, tie_slot]
+                                    + through[tie_last, tie_slot] + 1) / 2.0
+    return ranks
+
+
+def _spearman_missing_pairs(left, right, result, min_periods, block_size, symmetric=False):
+    """결측값이 있는 시리즈가 낀 쌍은 전체 순위가 아니라 쌍별 완전 행에서 다시 매긴 순위로 계산
+    left 시리즈 하나와 right 컬럼 블록의 모든 쌍을 누적합으로 한 번에 순위 매김 (Python 반복은 left 컬럼 수만큼)"""
+    left_values = left.to_numpy(dtype='float64')
+    right_values = right.to_numpy(dtype='float64')
+    left_valid = ~np.isnan(left_values)
+    right_valid = ~np.isnan(right_values)
+    left_order, left_count, left_ties = _rank_layout(left_values)
+    right_order, right_count, right_ties = _rank_layout(right_values)
+    n = len(left_values)
+    left_missing = left_count < n
+    right_missing = right_count < n
+    positions = np.arange(n)[:, None]
+
+    for i in range(left_values.shape[1]):
+        # 두 시리즈 모두 결측값이 없는 쌍은 블록 행렬곱 결과가 이미 정확함
+        targets = np.flatnonzero(right_missing | left_missing[i])
+        if symmetric:
+            targets = targets[targets > i]
+        order = left_order[:, i]
+        left_tie = [tie[left_ties[3][i]:left_ties[3][i + 1]] for tie in left_ties[:3]]
+        for j in range(0, len(targets), block_size):
+            cols = targets[j:j + block_size]
+            # i 시리즈를 각 쌍의 완전 행에서 순위 매김 (모든 쌍이 i의 정렬 순서를 공유)
+            kept_left = right_valid[order][:, cols] & (positions < left_count[i])
+            rank_left = _ranks_in_order(kept_left, *left_tie)
+            rows_left = np.empty_like(rank_left)
+            rows_left[order] = rank_left
+
+            # 블록의 각 시리즈를 i 시리즈와의 완전 행에서 순위 매김 (시리즈별 정렬 순서)
+            right_sorted = right_order[:, cols]
+            kept_right = left_valid[:, i][right_sorted] & (positions < right_count[cols])
+            rank_right = _ranks_in_order(kept_right, *_tie_entries(right_ties, cols)) * kept_right
+            rank_left *= kept_left
+
+            # 순위 합은 count(count+1)/2로 정해져 있으므로 중심화 없이 제곱합·곱의 합에서 보정 (반 단위 정수라 오차 없음)
+            count = kept_right.sum(axis=0)
+            offset = count * ((count + 1) / 2.0) ** 2
+            cross = np.einsum('ij,ij->j', rank_right, np.take_along_axis(rows_left, right_sorted, axis=0)) - offset
+            with np.errstate(divide='ignore', invalid='ignore'):
+                denominator = np.sqrt((np.einsum('ij,ij->j', rank_left, rank_left) - offset)
+                                      * (np.einsum('ij,ij->j', rank_right, rank_right) - offset))
+                corr = cross / denominator
+            corr[(count < max(min_periods, 2)) | ~(denominator > 0)] = np.nan
+            corr = np.clip(corr, -1.0, 1.0)
+            result[i, cols] = corr
+            if symmetric:
+                result[cols, i] = corr
+    return result
+
+
+def cross_correlation(left, right, method='pearson', min_periods=1, block_size=512, rerank=True):
+    """left의 각 시리즈와 right의 각 시리즈 간 상관계수 행렬 (예: 금 시세 대 수천 개 종목)
+    rerank=False면 스피어만 순위를 시리즈별 전체 순위로 근사 (결측값이 없으면 같은 결과, 행렬곱만으로 계산)"""
+    left, right = left.align(right, join='outer', axis=0)
+    x_left, m_left = _prepare(left, method)
+    x_right, m_right = _prepare(right, method)
+
+    result = np.empty((left.shape[1], right.shape[1]))
+    for i in range(0, left.shape[1], block_size):
+        for j in range(0, right.shape[1], block_size):
+            result[i:i + block_size, j:j + block_size], _ = _block(
+                x_left[:, i:i + block_size], m_left[:, i:i + block_size],
+                x_right[:, j:j + block_size], m_right[:, j:j + block_size], min_periods)
+    if method == 'spearman' and rerank:
+        _spearman_missing_pairs(left, right, result, min_periods, block_size)
+    return pd.DataFrame(result, index=left.columns, columns=right.columns)
+
+
+def pairwise_correlation(frame, method='pearson', min_periods=1, block_size=512, rerank=True):
+    """모든 시리즈 쌍의 상관계수 행렬 (대칭이므로 상삼각 블록만 계산, rerank는 cross_correlation과 같음)"""
+    values, mask = _prepare(frame, method)
+    k = frame.shape[1]
+    result = np.empty((k, k))
+    for i in range(0, k, block_size):
+        for j in range(i, k, block_size):
+            block, _ = _block(values[:, i:i + block_size], mask[:, i:i + block_size],
+                              values[:, j:j + block_size], mask[:, j:j + block_size], min_periods)
+            result[i:i + block_size, j:j + block_size] = block
+            result[j:j + block_size, i:i + block_size] = block.T
+    # 값이 모두 같은 시리즈는 자기 자신과의 상관계수도 정의되지 않음 (pandas와 같음)
+    defined = (mask.sum(axis=0) >= max(min_periods, 2)) & ((values ** 2).sum(axis=0) > 0)
+    np.fill_diagonal(result, np.where(defined, 1.0, np.nan))
+    if method == 'spearman' and rerank:
+        _spearman_missing_pairs(frame, frame, result, min_periods, block_size, symmetric=True)
+    return pd.DataFrame(result, index=frame.columns, columns=frame.columns)
+
+
+def upper_triangle(corr):
+    """상관계수 행렬의 상삼각(대각선 제외)을 (series_1, series_2, corr) 형태의 표로 변환"""
+    rows, cols = np.triu_indices(len(corr.columns), k=1)
+    labels = np.asarray(corr.columns)
+    return pd.DataFrame({
+        'series_1': labels[rows],
+        'series_2': labels[cols],
+        'corr': corr.to_numpy()[rows, cols],
+    })
+
+
+def top_pairs(corr, k=10, absolute=True):
+    """상관계수가 가장 큰 k개 쌍 (absolute=True면 절댓값 기준, NaN 제외)"""
+    rows, cols = np.triu_indices(len(corr.columns), k=1)
+    values = corr.to_numpy()[rows, cols]
+    score = np.abs(values) if absolute else values.copy()
+    score[np.isnan(score)] = -np.inf
+
+    k = min(k, len(score))
+    if k == 0:
+        return upper_triangle(corr).iloc[0:0]
+    picked = np.argpartition(-score, k - 1)[:k]
+    picked = picked[np.argsort(-score[picked], kind='stable')]
+    picked = picked[np.isfinite(score[picked])]
+
+    labels = np.asarray(corr.columns)
+    return pd.DataFrame({
+        'series_1': labels[rows[picked]],
+        'series_2': labels[cols[picked]],
+        'corr': values[picked],
+    })
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+시계열 차트용 다운샘플링
+긴 시세 이력을 화면에 그릴 만큼의 점(수천 개)으로 줄인 뒤 차트에 전달
+- lttb: Largest-Triangle-Three-Buckets (선 모양 보존)
+- minmax: 구간별 최저·최고점 (최고가·최저가를 정확히 보존)
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _as_float(values):
+    """날짜/숫자 배열을 계산용 float64로 변환 (날짜는 ns 정수)"""
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype('datetime64[ns]').astype('int64').astype('float64')
+    return values.astype('float64')
+
+
+def lttb(x, y, n_out):
+    """LTTB로 선택한 행 위치 배열 (처음·마지막 점은 항상 포함)"""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = _as_float(x)
+    y = _as_float(y)
+
+    # 처음·마지막 점을 제외한 나머지를 n_out - 2개 구간으로 분할
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+
+    anchor = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+
+        # 직전 선택점·현재 구간 후보·다음 구간 평균점이 이루는 삼각형 넓이가 최대인 점 선택
+        area = np.abs((x[anchor] - avg_x) * (y[start:end] - y[anchor])
+                      - (x[anchor] - x[start:end]) * (avg_y - y[anchor]))
+        anchor = start + int(np.argmax(area))
+        selected[i + 1] = anchor
+    return selected
+
+
+def _first_match_per_bucket(matches, bucket_ids):
+    """구간마다 조건을 만족하는 첫 위치 (없는 구간은 제외)"""
+    positions = np.flatnonzero(matches)
+    _, first = np.unique(bucket_ids[positions], return_index=True)
+    return positions[first]
+
+
+def minmax(y, n_out):
+    """구간별 최저·최고점 위치 배열 (처음·마지막 점 포함, 전체 최고·최저점은 항상 보존)"""
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+    y = _as_float(y)
+
+    # 처음·마지막 점을 위해 2개를 남기고 구간마다 최저·최고 2개씩
+    n_buckets = (n_out - 2) // 2
+    starts = (np.arange(n_buckets) * n) // n_buckets
+    bucket_ids = np.repeat(np.arange(n_buckets), np.diff(np.append(starts, n)))
+
+    lows = np.fmin.reduceat(y, starts)
+    highs = np.fmax.reduceat(y, starts)
+    selected = np.concatenate([
+        [0, n - 1],
+        _first_match_per_bucket(y == lows[bucket_ids], bucket_ids),
+        _first_match_per_bucket(y == highs[bucket_ids], bucket_ids),
+    ])
+    return np.unique(selected)
+
+
+METHODS = {
+    'lttb': lambda x, y, n_out: lttb(x, y, n_out),
+    'minmax': lambda x, y, n_out: minmax(y, n_out),
+}
+
+
+def downsample(x, y, max_points=2000, method='lttb'):
+    """(x, y) 시계열을 최대 max_points개 점으로 줄여 반환 (max_points가 None이면 그대로)"""
+    x = x.to_numpy() if isinstance(x, pd.Series) else np.asarray(x)
+    y = y.to_numpy() if isinstance(y, pd.Series) else np.asarray(y)
+    if not max_points or len(y) <= max_points:
+        return x, y
+    if method not in METHODS:
+        raise ValueError(f"지원하지 않는 다운샘플링 방식: {method}")
+    index = METHODS[method](x, y, max_points)
+    return x[index], y[index]
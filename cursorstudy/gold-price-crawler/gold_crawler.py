@@ -5,16 +5,19 @@
 https://www.koreagoldx.co.kr/price/gold 에서 금 시세 데이터를 수집하여 엑셀 파일로 저장
 """
 
+import os
+import json
+import math
 import time
 import pandas as pd
-from selenium import webdriver
+import requests
+from requests.adapters import HTTPAdapter
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from storage import open_store
+import common_path  # crawler_common 패키지 경로 추가
+from crawler_common.webdriver_utils import shared_pool, WaitTimer, wait_for_rows, wait_for_page_change
 import logging
 
 # 로깅 설정
@@ -22,26 +25,270 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 logger = logging.getLogger(__name__)
 
 class GoldPriceCrawler:
-    def __init__(self):
+    # HTTP 모드에서 JSON 행의 키 -> 레코드 컬럼 매핑 (Tabulator 컬럼 field 값)
+    # 실제 응답으로 검증되지 않은 값이므로 main()은 Selenium 모드로 실행하며,
+    # HTTP 모드에서 응답 행을 하나도 해석하지 못하면 오류로 처리해 Selenium으로 전환
+    HTTP_FIELDS = ('date', 'buyPure', 'sellPure', 'sell18k', 'sell14k')
+    # Tabulator 페이지네이션의 현재 페이지 버튼
+    ACTIVE_PAGE_SELECTOR = ".tabulator-page.active"
+
+    def __init__(self, fetch_mode="selenium", max_workers=4, incremental=False, state_file="gold_crawl_state.json",
+                 driver_pool=None, storage_backend="parquet", store_path=None, export_excel=True):
         self.url = "https://www.koreagoldx.co.kr/price/gold"
+        # Tabulator 테이블이 ajaxURL로 호출하는 것으로 가정한 데이터 엔드포인트 (실제 응답으로 검증되지 않음)
+        # (오프라인 테스트 시 fixture 응답을 내려주는 로컬 서버 주소로 교체)
+        self.api_url = "https://www.koreagoldx.co.kr/api/price/gold/list"
+        self.fetch_mode = fetch_mode  # "selenium" 또는 "http"
+        self.page_size = 10
+        self.max_workers = max_workers  # HTTP 모드 동시 페이지 요청 수
+        self.page_retries = 3  # 페이지 요청 실패 시 재시도 횟수
+        self.retry_backoff = 1.0  # 재시도 대기 시간(초), 재시도마다 2배
+        self.incremental = incremental  # 마지막 수집일 이후 데이터만 수집
+        self.state_file = state_file
+        self.since_date = None  # 이미 수집된 가장 최신 고시날짜 (YYYY.MM.DD)
+        self.reached_known_date = False
+        self.store = open_store(storage_backend, store_path)  # 기본 저장소 (Parquet 또는 SQLite)
+        self.export_excel = export_excel  # 엑셀은 내보내기 전용
         self.driver = None
+        self.driver_pool = driver_pool or shared_pool()  # 드라이버는 항상 풀에서 대여 (기본은 프로세스 공용 풀)
+        self.session = None
+        self.wait_timer = WaitTimer()
         self.data = []
         
+    def setup_session(self, pool_size=None):
+        """HTTP 모드용 커넥션 풀 세션 설정"""
+        try:
+            pool_size = pool_size or self.max_workers
+            self.session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=2)
+            self.session.mount("http://", adapter)
+            self.session.mount("https://", adapter)
+            self.session.headers.update({
+                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+                'Accept': 'application/json, text/javascript, */*; q=0.01',
+                'X-Requested-With': 'XMLHttpRequest',
+                'Referer': self.url,
+            })
+            logger.info("HTTP 세션 설정 완료")
+            return True
+        except Exception as e:
+            logger.error(f"HTTP 세션 설정 실패: {e}")
+            return False
+    
+    def fetch_page_json(self, page):
+        """데이터 엔드포인트에서 한 페이지의 JSON 응답 조회"""
+        response = self.session.get(self.api_url, params={'page': page, 'size': self.page_size}, timeout=15)
+        response.raise_for_status()
+        payload = response.json()
+        # Tabulator 원격 페이지네이션 응답: {"last_page": N, "data": [...]}
+        if isinstance(payload, list):
+            return {'last_page': 1, 'data': payload}
+        return payload
+    
+    def fetch_page_with_retry(self, page):
+        """실패한 페이지 요청을 지수 백오프로 재시도 (모두 실패하면 마지막 예외 발생)"""
+        for attempt in range(self.page_retries + 1):
+            try:
+                return self.fetch_page_json(page)
+            except Exception as e:
+                if attempt == self.page_retries:
+                    raise
+                delay = self.retry_backoff * 2 ** attempt
+                logger.warning(f"페이지 {page} 요청 실패, {delay:.1f}초 후 재시도 ({attempt + 1}/{self.page_retries}): {e}")
+                time.sleep(delay)
+    
+    def parse_json_rows(self, rows):
+        """JSON 행을 크롤러 레코드 형식으로 변환"""
+        records = []
+        for row in rows:
+            try:
+                if isinstance(row, dict):
+                    values = [row.get(field, '') for field in self.HTTP_FIELDS]
+                else:
+                    values = list(row)[:len(self.HTTP_FIELDS)]
+                record = self._make_record(*values)
+                if record:
+                    records.append(record)
+            except Exception as e:
+                logger.warning(f"JSON 행 변환 실패: {e}")
+                continue
+        return records
+    
+    def parse_page(self, payload):
+        """페이지 응답의 행을 레코드로 변환 (행이 있는데 하나도 해석하지 못하면 응답 형식 오류)"""
+        rows = payload.get('data', [])
+        records = self.parse_json_rows(rows)
+        if rows and not records:
+            raise ValueError(f"응답 행을 해석할 수 없습니다 (필드: {', '.join(self.HTTP_FIELDS)})")
+        return records
+    
+    def _make_record(self, date, buy_pure, sell_pure, sell_18k, sell_14k):
+        """셀 값을 검증하여 레코드 생성 (유효하지 않으면 None)"""
+        date = str(date).strip().replace('-', '.').replace('/', '.')
+        buy_pure = str(buy_pure).strip().replace(',', '')
+        sell_pure = str(sell_pure).strip().replace(',', '')
+        sell_18k = str(sell_18k).strip().replace(',', '')
+        sell_14k = str(sell_14k).strip().replace(',', '')
+        
+        # 데이터가 유효한지 확인
+        if not (date and buy_pure.isdigit() and sell_pure.isdigit()):
+            return None
+        
+        return {
+            '고시날짜': date,
+            '내가살때_순금(3.75g)': int(buy_pure),
+            '내가팔때_순금(3.75g)': int(sell_pure),
+            '내가팔때_18K(3.75g)': int(sell_18k) if sell_18k.isdigit() else 0,
+            '내가팔때_14K(3.75g)': int(sell_14k) if sell_14k.isdigit() else 0
+        }
+    
+    def load_state(self):
+        """증분 수집 상태 파일에서 마지막 고시날짜 로드"""
+        try:
+            if os.path.exists(self.state_file):
+                with open(self.state_file, 'r', encoding='utf-8') as f:
+                    self.since_date = json.load(f).get('last_date')
+                logger.info(f"증분 수집 기준일: {self.since_date}")
+            else:
+                logger.info("상태 파일이 없어 전체 수집을 진행합니다.")
+            return True
+        except Exception as e:
+            logger.error(f"상태 파일 로드 실패: {e}")
+            return False
+    
+    def save_state(self):
+        """수집된 가장 최신 고시날짜를 상태 파일에 저장"""
+        try:
+            dates = [record['고시날짜'] for record in self.data]
+            if self.since_date:
+                dates.append(self.since_date)
+            if not dates:
+                return False
+            
+            with open(self.state_file, 'w', encoding='utf-8') as f:
+                json.dump({'last_date': max(dates)}, f, ensure_ascii=False)
+            logger.info(f"증분 수집 상태 저장: {max(dates)}")
+            return True
+        except Exception as e:
+            logger.error(f"상태 파일 저장 실패: {e}")
+            return False
+    
+    def filter_new_records(self, records):
+        """이미 수집된 날짜 이후의 레코드만 반환 (기준일에 도달하면 표시)"""
+        if not self.since_date:
+            return records
+        new_records = [record for record in records if record['고시날짜'] > self.since_date]
+        if len(new_records) < len(records):
+            self.reached_known_date = True
+        return new_records
+    
+    def below_target(self, count, target_count):
+        """더 수집해야 하는지 여부 (증분 수집은 목표 개수와 관계없이 기준일까지 수집)"""
+        # 새 행을 목표 개수로 자르면 기준일은 가장 최신 날짜로 저장되어 잘린 날짜들이 영영 수집되지 않음
+        return bool(self.since_date) or count < target_count
+    
+    def crawl_http_incremental(self):
+        """기준일에 도달할 때까지 최신 페이지부터 순서대로 수집 (새 행은 자르지 않음)"""
+        page = 1
+        last_page = 1
+        while page <= last_page:
+            payload = self.fetch_page_with_retry(page)
+            last_page = int(payload.get('last_page', 1) or 1)
+            records = self.parse_page(payload)
+            self.data.extend(self.filter_new_records(records))
+            logger.info(f"페이지 {page} 처리 완료. 새 데이터 수: {len(self.data)}")
+            if not records or self.reached_known_date:
+                break
+            page += 1
+        
+        self.data = self.merge_records(self.data)
+        return True
+    
+    def fetch_pages_concurrently(self, start_page, end_page):
+        """start_page..end_page 페이지를 제한된 워커 풀로 병렬 수집 (재시도 후에도 실패한 페이지가 있으면 예외)"""
+        records = []
+        failed = []
+        pages = range(start_page, end_page + 1)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.fetch_page_with_retry, page): page for page in pages}
+            for future in as_completed(futures):
+                page = futures[future]
+                try:
+                    page_records = self.parse_page(future.result())
+                    records.extend(page_records)
+                    logger.info(f"페이지 {page} 처리 완료 ({len(page_records)}개)")
+                except Exception as e:
+                    logger.error(f"페이지 {page} 수집 실패: {e}")
+                    failed.append(page)
+        if failed:
+            # 빠진 페이지를 건너뛴 채 저장하면 증분 수집 기준일이 그 구간을 지나쳐 영영 수집되지 않음
+            raise RuntimeError(f"수집하지 못한 페이지: {', '.join(map(str, sorted(failed)))}")
+        return records
+    
+    def merge_records(self, records):
+        """고시날짜 기준 중복 제거 후 최신 날짜순 정렬"""
+        merged = {}
+        for record in records:
+            merged.setdefault(record['고시날짜'], record)
+        return sorted(merged.values(), key=lambda r: r['고시날짜'], reverse=True)
+    
+    def crawl_http(self, target_count=100):
+        """Selenium 없이 데이터 엔드포인트를 직접 호출하여 수집"""
+        try:
+            if not self.session and not self.setup_session():
+                return False
+            
+            if self.since_date:
+                self.crawl_http_incremental()
+                logger.info(f"HTTP 모드로 {len(self.data)}개 새 데이터 수집 완료")
+                return True
+            
+            # 첫 페이지로 전체 페이지 수 확인
+            payload = self.fetch_page_with_retry(1)
+            last_page = int(payload.get('last_page', 1) or 1)
+            records = self.parse_page(payload)
+            
+            # 목표 개수에 필요한 페이지만 병렬 수집
+            per_page = max(len(records), 1)
+            end_page = min(last_page, math.ceil(target_count / per_page))
+            if end_page > 1:
+                logger.info(f"페이지 2~{end_page} 병렬 수집 (워커 {self.max_workers}개)")
+                records.extend(self.fetch_pages_concurrently(2, end_page))
+            
+            self.data = self.merge_records(self.data + records)[:target_count]
+            
+            logger.info(f"HTTP 모드로 총 {len(self.data)}개 데이터 수집 완료")
+            return len(self.data) > 0
+            
+        except Exception as e:
+            logger.error(f"HTTP 모드 수집 실패: {e}")
+            return False
+    
+    def crawl_selenium(self, target_count=100):
+        """Selenium으로 페이지를 렌더링하여 수집"""
+        # WebDriver 설정
+        if not self.setup_driver():
+            return False
+        
+        # 페이지 로드
+        if not self.load_page():
+            return False
+        
+        # 첫 페이지 데이터 추출
+        if not self.extract_table_data() and not self.reached_known_date:
+            return False
+        
+        # 추가 페이지에서 데이터 수집
+        if self.below_target(len(self.data), target_count) and not self.reached_known_date:
+            self.navigate_pages(target_count)
+        
+        return True
+        
     def setup_driver(self):
         """Chrome WebDriver 설정"""
         try:
-            chrome_options = Options()
-            chrome_options.add_argument("--headless")  # 브라우저 창을 띄우지 않음
-            chrome_options.add_argument("--no-sandbox")
-            chrome_options.add_argument("--disable-dev-shm-usage")
-            chrome_options.add_argument("--disable-gpu")
-            chrome_options.add_argument("--window-size=1920,1080")
-            chrome_options.add_argument("--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-            
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
-            self.driver.implicitly_wait(10)
-            logger.info("Chrome WebDriver 설정 완료")
+            self.driver = self.driver_pool.acquire()
+            logger.info("WebDriver 풀에서 드라이버 대여")
             return True
         except Exception as e:
             logger.error(f"WebDriver 설정 실패: {e}")
@@ -53,50 +300,39 @@ class GoldPriceCrawler:
             logger.info(f"페이지 로드 중: {self.url}")
             self.driver.get(self.url)
             
-            # 페이지가 완전히 로드될 때까지 대기
-            WebDriverWait(self.driver, 20).until(
-                EC.presence_of_element_located((By.CLASS_NAME, "tabulator"))
-            )
-            
-            # 추가 대기 시간 (JavaScript 로딩 완료)
-            time.sleep(3)
-            logger.info("페이지 로드 완료")
+            # 테이블 행이 실제로 렌더링될 때까지 대기
+            row_count = self.wait_timer.measure("페이지 1", wait_for_rows, self.driver, ".tabulator .tabulator-row")
+            logger.info(f"페이지 로드 완료 (행 {row_count}개)")
             return True
         except Exception as e:
             logger.error(f"페이지 로드 실패: {e}")
             return False
     
+    def parse_table_html(self, html):
+        """Tabulator 테이블 HTML에서 행별 셀 텍스트 목록 추출"""
+        soup = BeautifulSoup(html, 'html.parser')
+        return [
+            [cell.get_text(' ', strip=True) for cell in row.select('.tabulator-cell')]
+            for row in soup.select('.tabulator-row')
+        ]
+    
     def extract_table_data(self):
         """테이블에서 데이터 추출"""
         try:
-            # Tabulator 테이블 찾기
+            # Tabulator 테이블 HTML을 한 번에 가져와 프로세스 내에서 파싱
             table = self.driver.find_element(By.CLASS_NAME, "tabulator")
-            
-            # 테이블의 모든 행 찾기
-            rows = table.find_elements(By.CSS_SELECTOR, ".tabulator-row")
+            rows = self.parse_table_html(table.get_attribute("outerHTML"))
             logger.info(f"발견된 행 수: {len(rows)}")
             
-            for row in rows:
+            for cells in rows:
                 try:
-                    cells = row.find_elements(By.CSS_SELECTOR, ".tabulator-cell")
                     if len(cells) >= 5:  # 최소 5개 컬럼이 있어야 함
-                        date = cells[0].text.strip()
-                        buy_pure = cells[1].text.strip().replace(',', '')
-                        sell_pure = cells[2].text.strip().replace(',', '')
-                        sell_18k = cells[3].text.strip().replace(',', '')
-                        sell_14k = cells[4].text.strip().replace(',', '')
-                        
-                        # 데이터가 유효한지 확인
-                        if date and buy_pure.isdigit() and sell_pure.isdigit():
-                            data_row = {
-                                '고시날짜': date,
-                                '내가살때_순금(3.75g)': int(buy_pure),
-                                '내가팔때_순금(3.75g)': int(sell_pure),
-                                '내가팔때_18K(3.75g)': int(sell_18k) if sell_18k.isdigit() else 0,
-                                '내가팔때_14K(3.75g)': int(sell_14k) if sell_14k.isdigit() else 0
-                            }
+                        data_row = self._make_record(*cells[:5])
+                        if data_row and not self.filter_new_records([data_row]):
+                            continue
+                        if data_row:
                             self.data.append(data_row)
-                            logger.info(f"데이터 추출: {date} - 순금구매: {buy_pure}, 순금판매: {sell_pure}")
+                            logger.info(f"데이터 추출: {data_row['고시날짜']} - 순금구매: {data_row['내가살때_순금(3.75g)']}, 순금판매: {data_row['내가팔때_순금(3.75g)']}")
                 
                 except Exception as e:
                     logger.warning(f"행 데이터 추출 실패: {e}")
@@ -115,13 +351,17 @@ class GoldPriceCrawler:
             current_count = len(self.data)
             page_num = 1
             
-            while current_count < target_count:
+            while self.below_target(current_count, target_count) and not self.reached_known_date:
                 # 다음 페이지 버튼 찾기
                 try:
                     next_button = self.driver.find_element(By.CSS_SELECTOR, "button[data-page='next']:not([disabled])")
                     if next_button.is_enabled():
+                        # 현재 페이지의 첫 행과 활성 페이지 번호를 기억한 뒤 교체될 때까지 대기
+                        first_row = self.driver.find_element(By.CSS_SELECTOR, ".tabulator .tabulator-row")
+                        active_page = self.driver.find_element(By.CSS_SELECTOR, self.ACTIVE_PAGE_SELECTOR).text
                         next_button.click()
-                        time.sleep(3)  # 페이지 로딩 대기
+                        self.wait_timer.measure(f"페이지 {page_num + 1}", wait_for_page_change, self.driver, first_row,
+                                                self.ACTIVE_PAGE_SELECTOR, active_page)
                         
                         # 새 데이터 추출
                         if self.extract_table_data():
@@ -129,6 +369,9 @@ class GoldPriceCrawler:
                             page_num += 1
                             logger.info(f"페이지 {page_num} 처리 완료. 현재 데이터 수: {new_count}")
                             
+                            if self.reached_known_date:  # 이미 수집된 날짜에 도달하면 중단
+                                logger.info("이미 수집된 날짜에 도달했습니다.")
+                                break
                             if new_count == current_count:  # 더 이상 새 데이터가 없으면 중단
                                 logger.info("더 이상 새로운 데이터가 없습니다.")
                                 break
@@ -145,7 +388,7 @@ class GoldPriceCrawler:
                     break
             
             # 목표 개수에 도달했으면 중단
-            if len(self.data) >= target_count:
+            if not self.below_target(len(self.data), target_count):
                 self.data = self.data[:target_count]
                 logger.info(f"목표 개수 {target_count}개에 도달하여 수집을 중단합니다.")
             
@@ -155,8 +398,20 @@ class GoldPriceCrawler:
             logger.error(f"페이지 네비게이션 실패: {e}")
             return False
     
-    def save_to_excel(self, filename="gold_prices.xlsx"):
-        """데이터를 엑셀 파일로 저장"""
+    def save_to_store(self):
+        """수집한 데이터를 저장소에 추가"""
+        try:
+            if not self.data:
+                logger.warning("저장할 데이터가 없습니다.")
+                return False
+            self.store.append(pd.DataFrame(self.data))
+            return True
+        except Exception as e:
+            logger.error(f"저장소 저장 실패: {e}")
+            return False
+    
+    def save_to_excel(self, filename="gold_prices.xlsx", append=False):
+        """데이터를 엑셀 파일로 저장 (append=True면 기존 데이터에 새 행 추가)"""
         try:
             if not self.data:
                 logger.warning("저장할 데이터가 없습니다.")
@@ -167,6 +422,12 @@ class GoldPriceCrawler:
             # 날짜 컬럼을 datetime으로 변환
             df['고시날짜'] = pd.to_datetime(df['고시날짜'], format='%Y.%m.%d')
             
+            # 기존 데이터와 병합 (같은 날짜는 새 데이터 우선)
+            if append and os.path.exists(filename):
+                existing = pd.read_excel(filename, sheet_name='금시세')
+                existing['고시날짜'] = pd.to_datetime(existing['고시날짜'])
+                df = pd.concat([df, existing], ignore_index=True).drop_duplicates('고시날짜', keep='first')
+            
             # 날짜순으로 정렬
             df = df.sort_values('고시날짜', ascending=False)
             
@@ -199,29 +460,36 @@ class GoldPriceCrawler:
     def run(self, target_count=100):
         """크롤링 실행"""
         try:
-            logger.info("금 시세 크롤링을 시작합니다.")
+            logger.info(f"금 시세 크롤링을 시작합니다. (모드: {self.fetch_mode})")
             
-            # WebDriver 설정
-            if not self.setup_driver():
-                return False
+            if self.incremental:
+                self.load_state()
             
-            # 페이지 로드
-            if not self.load_page():
-                return False
+            collected = False
+            if self.fetch_mode == "http":
+                collected = self.crawl_http(target_count)
+                if not collected:
+                    # HTTP 모드 실패 시 Selenium으로 대체 수집
+                    logger.warning("HTTP 모드 실패, Selenium 모드로 전환합니다.")
+                    self.data = []
             
-            # 첫 페이지 데이터 추출
-            if not self.extract_table_data():
+            if not collected and not self.crawl_selenium(target_count):
                 return False
             
-            # 추가 페이지에서 데이터 수집
-            if len(self.data) < target_count:
-                self.navigate_pages(target_count)
-            
-            # 엑셀 파일로 저장
+            # 저장소에 저장 후 엑셀로 내보내기
             if self.data:
-                self.save_to_excel()
+                # 저장소에 추가된 경우에만 기준일을 옮김 (실패하면 다음 실행에서 같은 구간을 다시 수집)
+                if not self.save_to_store():
+                    return False
+                if self.export_excel:
+                    self.save_to_excel(append=self.incremental)
+                if self.incremental:
+                    self.save_state()
                 logger.info(f"크롤링 완료! 총 {len(self.data)}개의 데이터를 수집했습니다.")
                 return True
+            elif self.incremental and self.reached_known_date:
+                logger.info("새로운 데이터가 없습니다. 이미 최신 상태입니다.")
+                return True
             else:
                 logger.warning("수집된 데이터가 없습니다.")
                 return False
@@ -231,13 +499,18 @@ class GoldPriceCrawler:
             return False
         
         finally:
+            self.wait_timer.report()
+            if self.session:
+                self.session.close()
             if self.driver:
-                self.driver.quit()
-                logger.info("WebDriver 종료")
+                self.driver_pool.release(self.driver)
+                self.driver = None
+                logger.info("WebDriver 풀에 드라이버 반납")
 
 def main():
     """메인 함수"""
-    crawler = GoldPriceCrawler()
+    # HTTP 모드의 엔드포인트·필드가 실제 응답으로 검증되기 전까지는 Selenium 모드로 수집
+    crawler = GoldPriceCrawler(fetch_mode="selenium", incremental=True)
     success = crawler.run(target_count=100)
     
     if success:
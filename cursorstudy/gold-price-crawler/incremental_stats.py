@@ -0,0 +1,462 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+금 시세 누적 통계 상태
+새로 들어온 행만으로 평균·분산(Welford/Chan 병합), 최고가·최저가, 일일 변동률 통계,
+상승/하락/보합 일수, 상관관계 공적률(co-moment)을 갱신하고 저장소 옆에 JSON으로 보관
+중앙값은 누적 갱신이 불가능하므로 가격별 빈도(히스토그램)를 함께 보관하여 계산
+(빈도표가 MAX_HISTOGRAM_BINS개를 넘으면 구간으로 묶어 상태 크기를 제한)
+가장 긴 기간별분석 구간만큼의 최근 행은 원본 그대로 보관하여, 그 안에서 추가·정정된 행은
+처음 달라진 날짜부터 다시 계산 (보관 구간을 벗어난 행만 누적 통계에 병합)
+저장소의 월 파티션별 서명과 병합된 행의 파티션별 체크섬을 함께 보관하여 바뀐 파티션만 다시 읽음
+"""
+
+import os
+import copy
+import json
+import logging
+import numpy as np
+import pandas as pd
+from storage import DATE_COLUMN, PRICE_COLUMNS, partition_keys
+from rolling_analytics import RollingAnalytics, window_label
+
+logger = logging.getLogger(__name__)
+
+STATE_VERSION = 3
+DEFAULT_TAIL_DAYS = 365  # 원본데이터 시트에 기록하는 최근 일수 (최소 보관 일수)
+MAX_HISTOGRAM_BINS = 4096  # 컬럼별 가격 빈도표의 최대 항목 수 (넘으면 구간 폭을 넓혀 다시 묶음)
+
+
+def tail_requirements(period_windows):
+    """기간별분석 구간을 모두 계산할 수 있는 보관 범위 (일수, 행 수)"""
+    days = [int(np.ceil(pd.Timedelta(spec) / pd.Timedelta(days=1)))
+            for spec in period_windows.values() if isinstance(spec, str)]
+    rows = [int(spec) for spec in period_windows.values() if not isinstance(spec, str)]
+    return max([DEFAULT_TAIL_DAYS] + days), max([0] + rows)
+
+
+def default_state_path(store):
+    """저장소 옆의 누적 통계 상태 파일 경로 (Parquet 디렉토리 안에는 두지 않음)"""
+    path = store.base_dir.rstrip(os.sep) if hasattr(store, 'base_dir') else os.path.splitext(store.db_path)[0]
+    return path + "_stats.json"
+
+
+def _merge_moments(count, mean, m2, values):
+    """기존 (개수, 평균, 편차 제곱합/공적률)에 새 행 묶음을 병합 (Chan 병렬 Welford)"""
+    n_new = len(values)
+    if n_new == 0:
+        return count, mean, m2
+    mean_new = values.mean(axis=0)
+    centered = values - mean_new
+    if m2.ndim == 2:
+        m2_new = centered.T @ centered
+    else:
+        m2_new = (centered ** 2).sum(axis=0)
+
+    total = count + n_new
+    delta = mean_new - mean
+    mean = mean + delta * n_new / total
+    if m2.ndim == 2:
+        m2 = m2 + m2_new + np.outer(delta, delta) * count * n_new / total
+    else:
+        m2 = m2 + m2_new + delta ** 2 * count * n_new / total
+    return total, mean, m2
+
+
+def _checksums(rows):
+    """월 파티션별 [행 수, 행 해시 합(mod 2^64)] (행 순서와 무관하고 나눠서 병합해도 같은 값)"""
+    if rows.empty:
+        return {}
+    hashes = pd.util.hash_pandas_object(rows, index=False).to_numpy(dtype=np.uint64)
+    codes, keys = pd.factorize(partition_keys(rows[DATE_COLUMN]))
+    sums = np.zeros(len(keys), dtype=np.uint64)
+    np.add.at(sums, codes, hashes)
+    counts = np.bincount(codes, minlength=len(keys))
+    return {key: [int(n), int(total)] for key, n, total in zip(keys, counts, sums)}
+
+
+def _native(value):
+    """정수값은 int로 반환 (엑셀에 원 단위 정수로 기록)"""
+    return int(value) if np.isfinite(value) and float(value).is_integer() else value
+
+
+class IncrementalStats:
+    """금 시세 누적 통계 상태 (보관 구간 이전 행의 누적 통계 + 보관 구간의 원본 행)"""
+
+    def __init__(self, state_file, columns=None, tail_days=DEFAULT_TAIL_DAYS, tail_rows=0):
+        self.state_file = state_file
+        self.columns = list(columns or PRICE_COLUMNS)
+        self.tail_days = tail_days  # 기간별분석·원본데이터 시트용으로 보관하는 최근 일수
+        self.tail_rows = tail_rows  # 관측치 개수 구간용으로 최소한 보관하는 최근 행 수
+        self.reset()
+
+    def reset(self):
+        """빈 상태로 초기화"""
+        k = len(self.columns)
+        # 아래 누적 통계는 보관 구간(tail) 이전에 병합된 행만 반영
+        self.first_date = None
+        self.folded_last_date = None
+        self.count = 0
+        self.mean = np.zeros(k)
+        self.comoment = np.zeros((k, k))  # 대각선은 각 컬럼의 M2
+        self.minimum = np.full(k, np.inf)
+        self.maximum = np.full(k, -np.inf)
+        self.histograms = [{} for _ in range(k)]  # 가격(또는 구간 시작값) -> 빈도 (중앙값 계산용)
+        self.bin_widths = np.zeros(k)  # 빈도표 구간 폭 (0이면 가격별 정확한 빈도)
+        self.last_values = None  # 일일 변동률 계산용 직전 행
+        self.change_count = 0
+        self.change_mean = np.zeros(k)
+        self.change_m2 = np.zeros(k)
+        self.change_min = np.full(k, np.inf)
+        self.change_max = np.full(k, -np.inf)
+        self.up_days = np.zeros(k, dtype=np.int64)
+        self.down_days = np.zeros(k, dtype=np.int64)
+        self.flat_days = np.zeros(k, dtype=np.int64)
+        self.folded_checksums = {}  # 월 파티션 -> 병합된 행의 [행 수, 해시 합]
+        self.tail = pd.DataFrame({DATE_COLUMN: pd.Series(dtype='datetime64[ns]'),
+                                  **{col: pd.Series(dtype='float64') for col in self.columns}})
+        self.partitions = {}  # 마지막 갱신 때의 저장소 파티션 서명
+        self._totals = None
+
+    @property
+    def last_date(self):
+        """반영된 마지막 고시날짜"""
+        return self.tail[DATE_COLUMN].iloc[-1] if len(self.tail) else self.folded_last_date
+
+    @property
+    def total_count(self):
+        """반영된 전체 행 수"""
+        return self.count + len(self.tail)
+
+    def changed_partitions(self, signatures):
+        """마지막 갱신 이후 서명이 바뀌었거나 새로 생기거나 없어진 파티션 키 (정렬된 목록)"""
+        keys = set(signatures) | set(self.partitions)
+        return sorted(key for key in keys if signatures.get(key) != self.partitions.get(key))
+
+    def folded_rows_match(self, df, months=None):
+        """다시 읽은 행 중 이미 누적 통계에 병합된 날짜의 행이 병합 당시와 같은지 파티션 체크섬으로 확인
+        (months가 None이면 df가 전체 데이터이므로 모든 파티션을 확인)"""
+        if self.folded_last_date is None:
+            return True
+        rows = self._normalize(df)
+        current = _checksums(rows[rows[DATE_COLUMN] <= self.folded_last_date])
+        keys = set(current) | set(self.folded_checksums) if months is None else months
+        return all(current.get(key) == self.folded_checksums.get(key) for key in keys)
+
+    def update(self, df, months=None):
+        """다시 읽은 행을 반영하고 다시 계산한 행 수 반환
+
+        months가 주어지면 df는 그 월 파티션의 행만 담고 있으므로 보관 구간에서 해당 월의 행만 교체,
+        None이면 df가 전체 데이터. 보관 구간과 비교해 처음 달라진(추가·정정·삭제된) 날짜부터 다시 구성하고
+        보관 범위를 벗어난 행만 누적 통계에 병합 (이미 병합된 날짜의 행은 folded_rows_match로 먼저 확인)
+        """
+        rows = self._normalize(df)
+        if self.folded_last_date is not None:
+            rows = rows[rows[DATE_COLUMN] > self.folded_last_date]
+        if months is not None:
+            untouched = self.tail[~partition_keys(self.tail[DATE_COLUMN]).isin(months)]
+            rows = pd.concat([untouched, rows], ignore_index=True).sort_values(DATE_COLUMN, kind="stable")
+
+        changed_from = self._first_change(rows)
+        if changed_from is None:
+            return 0
+        self.tail = rows.reset_index(drop=True)
+        self._fold_expired()
+        self._totals = None
+
+        changed = int((rows[DATE_COLUMN] >= changed_from).sum())
+        logger.info(f"누적 통계 갱신: {changed_from:%Y-%m-%d}부터 {changed}개 행 다시 계산 "
+                    f"(총 {self.total_count}개, 마지막 {self.last_date:%Y-%m-%d})")
+        return changed
+
+    def _normalize(self, df):
+        """날짜순·고시날짜별 한 행으로 정리하고 타입을 맞춤 (체크섬이 같은 값에 같은 해시를 내도록)"""
+        rows = df[[DATE_COLUMN] + self.columns].copy()
+        rows[DATE_COLUMN] = pd.to_datetime(rows[DATE_COLUMN]).astype('datetime64[ns]')
+        rows[self.columns] = rows[self.columns].astype('float64')
+        rows = rows.sort_values(DATE_COLUMN, kind="stable").drop_duplicates(DATE_COLUMN, keep='last')
+        return rows.reset_index(drop=True)
+
+    def _first_change(self, rows):
+        """보관 구간과 새로 읽은 행이 처음 달라지는 날짜 (같으면 None)"""
+        old = self.tail.set_index(DATE_COLUMN)[self.columns]
+        new = rows.set_index(DATE_COLUMN)[self.columns]
+        dates = old.index.union(new.index)
+        old, new = old.reindex(dates), new.reindex(dates)
+        differs = ~((old == new) | (old.isna() & new.isna())).all(axis=1).to_numpy()
+        return dates[differs][0] if differs.any() else None
+
+    def _fold_expired(self):
+        """보관 범위(tail_days일, 최소 tail_rows행)를 벗어난 오래된 행을 누적 통계에 병합"""
+        if self.tail.empty:
+            return
+        cutoff = self.tail[DATE_COLUMN].iloc[-1] - pd.Timedelta(days=self.tail_days)
+        keep = max(int((self.tail[DATE_COLUMN] >= cutoff).sum()), min(self.tail_rows, len(self.tail)))
+        expired = len(self.tail) - keep
+        if expired:
+            self._fold(self.tail.iloc[:expired])
+            self.tail = self.tail.iloc[expired:].reset_index(drop=True)
+
+    def totals(self):
+        """누적 통계에 보관 구간의 행까지 병합한 상태 (보고서 계산용, 갱신 전까지 캐시)"""
+        if self._totals is None:
+            totals = copy.copy(self)
+            totals.histograms = [dict(h) for h in self.histograms]
+            totals.bin_widths = self.bin_widths.copy()
+            totals.folded_checksums = dict(self.folded_checksums)
+            totals.up_days, totals.down_days, totals.flat_days = (
+                self.up_days.copy(), self.down_days.copy(), self.flat_days.copy())
+            if len(self.tail):
+                totals._fold(self.tail)
+            self._totals = totals
+        return self._totals
+
+    def _fold(self, df):
+        """날짜순 행 묶음을 누적 통계에 병합"""
+        values = df[self.columns].to_numpy(dtype='float64')
+        self.count, self.mean, self.comoment = _merge_moments(self.count, self.mean, self.comoment, values)
+        self.minimum = np.minimum(self.minimum, values.min(axis=0))
+        self.maximum = np.maximum(self.maximum, values.max(axis=0))
+        for i in range(len(self.columns)):
+            self._add_to_histogram(i, values[:, i])
+        for key, (n, total) in _checksums(df[[DATE_COLUMN] + self.columns]).items():
+            folded_n, folded_total = self.folded_checksums.get(key, (0, 0))
+            self.folded_checksums[key] = [folded_n + n, (folded_total + total) % 2 ** 64]
+
+        # 일일 변동률 (직전 실행의 마지막 행과 이어서 계산)
+        previous = values if self.last_values is None else np.vstack([self.last_values, values])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            changes = (previous[1:] / previous[:-1] - 1) * 100
+        if len(changes):
+            self.change_count, self.change_mean, self.change_m2 = _merge_moments(
+                self.change_count, self.change_mean, self.change_m2, changes)
+            self.change_min = np.minimum(self.change_min, changes.min(axis=0))
+            self.change_max = np.maximum(self.change_max, changes.max(axis=0))
+            self.up_days += (changes > 0).sum(axis=0)
+            self.down_days += (changes < 0).sum(axis=0)
+            self.flat_days += (changes == 0).sum(axis=0)
+        self.last_values = values[-1]
+
+        if self.first_date is None:
+            self.first_date = df[DATE_COLUMN].iloc[0]
+        self.folded_last_date = df[DATE_COLUMN].iloc[-1]
+
+    def _add_to_histogram(self, i, values):
+        """가격 빈도표에 값 추가 (구간으로 묶인 뒤에는 구간 시작값으로 집계)"""
+        width = self.bin_widths[i]
+        keys = values if width == 0 else np.floor(values / width) * width
+        prices, counts = np.unique(keys, return_counts=True)
+        histogram = self.histograms[i]
+        for price, n in zip(prices.tolist(), counts.tolist()):
+            histogram[price] = histogram.get(price, 0) + n
+        if len(histogram) > MAX_HISTOGRAM_BINS:
+            self._coarsen(i)
+
+    def _coarsen(self, i):
+        """빈도표 구간 폭을 2의 거듭제곱으로 넓혀 다시 묶음 (가격 범위가 MAX_HISTOGRAM_BINS의 절반 구간에 들어가도록)"""
+        histogram = self.histograms[i]
+        span = max(histogram) - min(histogram)
+        width = max(self.bin_widths[i] * 2, 2.0 ** np.ceil(np.log2(max(span, 1.0) * 2 / MAX_HISTOGRAM_BINS)))
+        merged = {}
+        for price, n in histogram.items():
+            key = float(np.floor(price / width) * width)
+            merged[key] = merged.get(key, 0) + n
+        self.histograms[i] = merged
+        self.bin_widths[i] = width
+        logger.info(f"{self.columns[i]} 가격 빈도표를 {width:g} 단위 구간으로 묶었습니다 ({len(merged)}개 구간)")
+
+    def median(self, i):
+        """가격별 빈도에서 중앙값 계산 (구간으로 묶인 뒤에는 구간 안에서 선형 보간한 근삿값)"""
+        prices = sorted(self.histograms[i])
+        counts = np.array([self.histograms[i][p] for p in prices])
+        cumulative = np.cumsum(counts)
+        width = self.bin_widths[i]
+
+        def ranked(rank):
+            b = int(np.searchsorted(cumulative, rank + 1))
+            if width == 0:
+                return prices[b]
+            return prices[b] + width * (rank - (cumulative[b] - counts[b]) + 0.5) / counts[b]
+
+        return (ranked((self.count - 1) // 2) + ranked(self.count // 2)) / 2
+
+    def basic_statistics(self):
+        """기본통계 시트 데이터 (stats_engine.basic_statistics와 같은 형식)"""
+        state = self.totals()
+        std = np.sqrt(state.comoment.diagonal() / (state.count - 1)) if state.count > 1 else np.full(len(state.columns), np.nan)
+        return {
+            col: {
+                '평균': round(state.mean[i], 0),
+                '중앙값': round(state.median(i), 0),
+                '최고가': _native(state.maximum[i]),
+                '최저가': _native(state.minimum[i]),
+                '표준편차': round(std[i], 0),
+                '변동계수': round(std[i] / state.mean[i] * 100, 2),
+                '범위': _native(state.maximum[i] - state.minimum[i])
+            }
+            for i, col in enumerate(state.columns)
+        }
+
+    def price_change_statistics(self):
+        """가격변동분석 시트 데이터 (stats_engine.price_change_statistics와 같은 형식)"""
+        state = self.totals()
+        n = state.change_count
+        std = np.sqrt(state.change_m2 / (n - 1)) if n > 1 else np.full(len(state.columns), np.nan)
+        return {
+            col: {
+                '최대상승률': round(state.change_max[i], 2) if n else np.nan,
+                '최대하락률': round(state.change_min[i], 2) if n else np.nan,
+                '평균변동률': round(state.change_mean[i], 2) if n else np.nan,
+                '변동률_표준편차': round(std[i], 2),
+                '상승일수': state.up_days[i],
+                '하락일수': state.down_days[i],
+                '보합일수': state.flat_days[i]
+            }
+            for i, col in enumerate(state.columns)
+        }
+
+    def correlations(self):
+        """상관관계분석 시트 데이터 ("col1 vs col2" -> 피어슨 상관계수)"""
+        state = self.totals()
+        scale = np.sqrt(state.comoment.diagonal())
+        with np.errstate(divide='ignore', invalid='ignore'):
+            matrix = state.comoment / np.outer(scale, scale)
+        return {
+            f"{col1} vs {col2}": round(matrix[i, j], 4)
+            for i, col1 in enumerate(state.columns)
+            for j, col2 in enumerate(state.columns)
+            if i < j
+        }
+
+    def period_analysis(self, period_windows, columns):
+        """기간별분석 시트 데이터 (최근 구간은 보관 중인 최근 행으로 계산)"""
+        state = self.totals()
+        period_analysis = {
+            '전체기간': {
+                '기간': f"{(state.last_date - state.first_date).days}일",
+                '데이터수': state.count,
+                '시작일': state.first_date.strftime('%Y-%m-%d'),
+                '종료일': state.last_date.strftime('%Y-%m-%d')
+            }
+        }
+        for col in columns:
+            i = state.columns.index(col)
+            period_analysis['전체기간'][f'{col}_평균'] = round(state.mean[i], 0)
+            period_analysis['전체기간'][f'{col}_최고가'] = _native(state.maximum[i])
+            period_analysis['전체기간'][f'{col}_최저가'] = _native(state.minimum[i])
+
+        rolling = RollingAnalytics(self.tail_frame(), state.columns)
+        for period_name, spec in period_windows.items():
+            latest = rolling.latest(spec, columns[0])
+            period_analysis[period_name] = {
+                '기간': window_label(spec),
+                '데이터수': latest['count'] if latest else 0,
+                '시작일': latest['start'].strftime('%Y-%m-%d') if latest else 'N/A',
+                '종료일': latest['end'].strftime('%Y-%m-%d') if latest else 'N/A'
+            }
+            if latest:
+                for col in columns:
+                    window_stats = rolling.latest(spec, col)
+                    period_analysis[period_name][f'{col}_평균'] = round(window_stats['mean'], 0)
+                    period_analysis[period_name][f'{col}_최고가'] = window_stats['max']
+                    period_analysis[period_name][f'{col}_최저가'] = window_stats['min']
+        return period_analysis
+
+    def tail_frame(self):
+        """보관 중인 최근 행 (정수 가격)"""
+        tail = self.tail.copy()
+        tail[DATE_COLUMN] = pd.to_datetime(tail[DATE_COLUMN])
+        tail[self.columns] = tail[self.columns].astype('float64').round().astype('int64')
+        return tail.reset_index(drop=True)
+
+    def to_dict(self):
+        """JSON 저장용 딕셔너리"""
+        return {
+            'version': STATE_VERSION,
+            'columns': self.columns,
+            'tail_days': self.tail_days,
+            'tail_rows': self.tail_rows,
+            'first_date': None if self.first_date is None else f"{self.first_date:%Y-%m-%d}",
+            'folded_last_date': None if self.folded_last_date is None else f"{self.folded_last_date:%Y-%m-%d}",
+            'count': self.count,
+            'mean': self.mean.tolist(),
+            'comoment': self.comoment.tolist(),
+            'minimum': self.minimum.tolist(),
+            'maximum': self.maximum.tolist(),
+            'histograms': [[[price, n] for price, n in sorted(h.items())] for h in self.histograms],
+            'bin_widths': self.bin_widths.tolist(),
+            'folded_checksums': self.folded_checksums,
+            'partitions': self.partitions,
+            'last_values': None if self.last_values is None else self.last_values.tolist(),
+            'change_count': self.change_count,
+            'change_mean': self.change_mean.tolist(),
+            'change_m2': self.change_m2.tolist(),
+            'change_min': self.change_min.tolist(),
+            'change_max': self.change_max.tolist(),
+            'up_days': self.up_days.tolist(),
+            'down_days': self.down_days.tolist(),
+            'flat_days': self.flat_days.tolist(),
+            'tail': [[f"{row[0]:%Y-%m-%d}"] + list(row[1:]) for row in self.tail_frame().itertuples(index=False, name=None)],
+        }
+
+    def save(self):
+        """상태 파일 저장 (임시 파일에 쓴 뒤 교체)"""
+        try:
+            directory = os.path.dirname(self.state_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = self.state_file + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.to_dict(), f, ensure_ascii=False)
+            os.replace(tmp_path, self.state_file)
+            logger.info(f"누적 통계 상태 저장: {self.state_file}")
+            return True
+        except Exception as e:
+            logger.error(f"누적 통계 상태 저장 실패: {e}")
+            return False
+
+    @classmethod
+    def load(cls, state_file, columns=None, tail_days=DEFAULT_TAIL_DAYS, tail_rows=0):
+        """상태 파일 로드 (없거나 컬럼 구성이 다르거나 보관 구간이 요구 범위보다 짧으면 빈 상태)"""
+        stats = cls(state_file, columns, tail_days, tail_rows)
+        if not os.path.exists(state_file):
+            logger.info("누적 통계 상태 파일이 없어 처음부터 계산합니다.")
+            return stats
+
+        with open(state_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != STATE_VERSION or data.get('columns') != stats.columns:
+            logger.warning("누적 통계 상태 형식이 달라 처음부터 다시 계산합니다.")
+            return stats
+        # 이미 병합된 행은 되돌릴 수 없으므로 더 긴 구간이 필요해지면 처음부터 다시 계산
+        if data['count'] and (data['tail_days'] < tail_days or data['tail_rows'] < tail_rows):
+            logger.warning(f"보관 구간({data['tail_days']}일, {data['tail_rows']}행)이 기간별분석 구간보다 짧아 "
+                           f"처음부터 다시 계산합니다.")
+            return stats
+
+        stats.first_date = pd.Timestamp(data['first_date']) if data['first_date'] else None
+        stats.folded_last_date = pd.Timestamp(data['folded_last_date']) if data['folded_last_date'] else None
+        stats.count = data['count']
+        stats.mean = np.array(data['mean'])
+        stats.comoment = np.array(data['comoment'])
+        stats.minimum = np.array(data['minimum'])
+        stats.maximum = np.array(data['maximum'])
+        stats.histograms = [{price: n for price, n in h} for h in data['histograms']]
+        stats.bin_widths = np.array(data['bin_widths'])
+        stats.folded_checksums = data['folded_checksums']
+        stats.partitions = data['partitions']
+        stats.last_values = None if data['last_values'] is None else np.array(data['last_values'])
+        stats.change_count = data['change_count']
+        stats.change_mean = np.array(data['change_mean'])
+        stats.change_m2 = np.array(data['change_m2'])
+        stats.change_min = np.array(data['change_min'])
+        stats.change_max = np.array(data['change_max'])
+        stats.up_days = np.array(data['up_days'], dtype=np.int64)
+        stats.down_days = np.array(data['down_days'], dtype=np.int64)
+        stats.flat_days = np.array(data['flat_days'], dtype=np.int64)
+        tail = pd.DataFrame(data['tail'], columns=[DATE_COLUMN] + stats.columns)
+        tail[DATE_COLUMN] = pd.to_datetime(tail[DATE_COLUMN]).astype('datetime64[ns]')
+        tail[stats.columns] = tail[stats.columns].astype('float64')
+        stats.tail = tail
+        stats._fold_expired()
+        return stats
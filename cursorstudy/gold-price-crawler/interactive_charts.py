@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+금 시세 인터랙티브 차트 (plotly)
+가격 추이와 통합 대시보드를 확대/축소 가능한 HTML 한 페이지로 저장
+긴 시계열은 서버에서 다운샘플링하여 브라우저로 보내는 점 수를 제한
+"""
+
+import os
+import numpy as np
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+from storage import DATE_COLUMN, PRICE_COLUMNS
+from rolling_analytics import RollingAnalytics
+from downsampling import downsample
+
+PRICE_LABELS = {
+    '내가살때_순금(3.75g)': '순금 구매가',
+    '내가팔때_순금(3.75g)': '순금 판매가',
+    '내가팔때_18K(3.75g)': '18K 판매가',
+    '내가팔때_14K(3.75g)': '14K 판매가',
+}
+
+
+def _line(df, col, max_points):
+    x, y = downsample(df[DATE_COLUMN], df[col], max_points)
+    return go.Scattergl(x=x, y=y, mode='lines', name=PRICE_LABELS[col])
+
+
+def _histogram(values, bins=20, name=None):
+    """히스토그램은 구간별 빈도만 계산하여 막대로 전달"""
+    counts, edges = np.histogram(values[~np.isnan(values)], bins=bins)
+    return go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges), name=name, opacity=0.7)
+
+
+def price_trend_figure(df, max_points=2000):
+    """금 종류별 가격 추이 (2x2)"""
+    fig = make_subplots(rows=2, cols=2, subplot_titles=[f"{PRICE_LABELS[col]} (3.75g)" for col in PRICE_COLUMNS])
+    for i, col in enumerate(PRICE_COLUMNS):
+        fig.add_trace(_line(df, col, max_points), row=i // 2 + 1, col=i % 2 + 1)
+    fig.update_yaxes(tickformat=',.0f')
+    fig.update_layout(title='Gold Price Trends Over Time', height=800, showlegend=False)
+    return fig
+
+
+def dashboard_figure(df, max_points=2000):
+    """통합 대시보드 (추이·상관관계·분포·변동률·기간별 평균·요약표)"""
+    buy, sell = PRICE_COLUMNS[0], PRICE_COLUMNS[1]
+    fig = make_subplots(
+        rows=3, cols=3,
+        specs=[[{}, {}, {'type': 'heatmap'}], [{}, {}, {}], [{'type': 'table', 'colspan': 3}, None, None]],
+        subplot_titles=['순금 가격 추이', '18K/14K 가격 추이', '가격 상관관계',
+                        '순금 가격 분포', '순금 구매가 일일 변동률', '기간별 순금 구매가 평균'],
+        row_heights=[0.35, 0.35, 0.3],
+    )
+
+    # 1~2. 가격 추이
+    for col in (buy, sell):
+        fig.add_trace(_line(df, col, max_points), row=1, col=1)
+    for col in PRICE_COLUMNS[2:]:
+        fig.add_trace(_line(df, col, max_points), row=1, col=2)
+
+    # 3. 상관관계 히트맵
+    corr = df[PRICE_COLUMNS].corr().round(2)
+    labels = [PRICE_LABELS[col] for col in PRICE_COLUMNS]
+    fig.add_trace(go.Heatmap(z=corr.to_numpy(), x=labels, y=labels, colorscale='RdBu', reversescale=True,
+                             zmid=0, text=corr.to_numpy(), texttemplate='%{text}', showscale=False), row=1, col=3)
+
+    # 4~5. 분포·일일 변동률
+    for col in (buy, sell):
+        fig.add_trace(_histogram(df[col].to_numpy(dtype='float64'), name=PRICE_LABELS[col]), row=2, col=1)
+    changes = df[buy].pct_change().to_numpy() * 100
+    fig.add_trace(_histogram(changes, name='일일 변동률(%)'), row=2, col=2)
+
+    # 6. 기간별 평균
+    rolling = RollingAnalytics(df, [buy])
+    means = [df[buy].mean(), rolling.latest('30D', buy)['mean'], rolling.latest('7D', buy)['mean']]
+    fig.add_trace(go.Bar(x=['전체기간', '최근30일', '최근7일'], y=means, name='기간별 평균'), row=2, col=3)
+
+    # 7. 통계 요약
+    rows = [[PRICE_LABELS[col], f"{df[col].mean():,.0f}원", f"{df[col].max():,.0f}원",
+             f"{df[col].min():,.0f}원", f"{df[col].max() - df[col].min():,.0f}원"] for col in (buy, sell)]
+    fig.add_trace(go.Table(
+        header=dict(values=['구분', '평균', '최고가', '최저가', '변동폭']),
+        cells=dict(values=list(map(list, zip(*rows)))),
+    ), row=3, col=1)
+
+    period = (f"{df[DATE_COLUMN].min():%Y-%m-%d} ~ {df[DATE_COLUMN].max():%Y-%m-%d} "
+              f"({(df[DATE_COLUMN].max() - df[DATE_COLUMN].min()).days}일, 총 {len(df)}개 데이터)")
+    fig.update_layout(title=f'Gold Price Analysis Dashboard<br><sup>{period}</sup>', height=1200, barmode='overlay')
+    return fig
+
+
+def write_html_page(figures, path, title='Gold Price Interactive Charts'):
+    """여러 차트를 plotly.js를 포함한 독립 실행형 HTML 한 페이지로 저장"""
+    parts = [fig.to_html(full_html=False, include_plotlyjs=(i == 0)) for i, fig in enumerate(figures)]
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f"<!DOCTYPE html>\n<html lang=\"ko\">\n<head>\n<meta charset=\"utf-8\">\n<title>{title}</title>\n</head>\n<body>\n")
+        f.write("\n".join(parts))
+        f.write("\n</body>\n</html>\n")
+    return path
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+금 시세 이동 구간 분석
+고시날짜 인덱스 시계열에 대해 기간(7D/30D/90D/365D) 또는 관측치 개수(N) 구간의
+이동 평균·최소·최대·표준편차·수익률·낙폭을 O(n) rolling 연산으로 계산하고 구간별로 캐시
+"""
+
+import numpy as np
+import pandas as pd
+from storage import DATE_COLUMN, PRICE_COLUMNS
+
+DEFAULT_WINDOWS = ['7D', '30D', '90D', '365D']
+
+
+def window_label(spec):
+    """구간 표기 ('30D' -> '30일', 20 -> '20개')"""
+    if isinstance(spec, str) and spec.upper().endswith('D'):
+        return f"{spec[:-1]}일"
+    return f"{spec}개"
+
+
+class RollingAnalytics:
+    """이동 구간 통계 계산기"""
+
+    def __init__(self, df, columns=None):
+        columns = columns or PRICE_COLUMNS
+        df = df.sort_values(DATE_COLUMN) if not df[DATE_COLUMN].is_monotonic_increasing else df
+        self.dates = df[DATE_COLUMN].to_numpy(dtype='datetime64[ns]')
+        self.dtypes = df[columns].dtypes
+        self.frame = df.set_index(DATE_COLUMN)[columns].astype('float64')
+        self._cache = {}
+
+    def _start_positions(self, spec):
+        """각 행의 구간 시작 위치 (기간 구간은 양 끝 포함)"""
+        n = len(self.dates)
+        if isinstance(spec, str):
+            offset = pd.Timedelta(spec).to_timedelta64()
+            return np.searchsorted(self.dates, self.dates - offset, side='left')
+        return np.maximum(np.arange(n) - int(spec) + 1, 0)
+
+    def window(self, spec, column):
+        """구간 하나의 이동 통계 프레임 (mean/min/max/std/count/return/drawdown)"""
+        key = (spec, column)
+        if key in self._cache:
+            return self._cache[key]
+
+        series = self.frame[column]
+        if isinstance(spec, str):
+            roller = series.rolling(spec, min_periods=1, closed='both')
+        else:
+            roller = series.rolling(int(spec), min_periods=1)
+
+        values = series.to_numpy()
+        start = self._start_positions(spec)
+        rolling_max = roller.max()
+        result = pd.DataFrame({
+            'mean': roller.mean(),
+            'min': roller.min(),
+            'max': rolling_max,
+            'std': roller.std(),
+            'count': roller.count(),
+            'start': self.dates[start],
+            'return': values / values[start] - 1,
+            'drawdown': series / rolling_max - 1,
+        }, index=series.index)
+
+        self._cache[key] = result
+        return result
+
+    def _native(self, column, value):
+        """정수 컬럼의 최소/최대는 원래 정수 타입으로 반환"""
+        dtype = self.dtypes[column]
+        if pd.api.types.is_integer_dtype(dtype) and not np.isnan(value):
+            return dtype.type(value)
+        return value
+
+    def latest(self, spec, column):
+        """가장 최근 시점의 구간 통계 (기간별 요약용)"""
+        if not len(self.frame):
+            return None
+        last = self.window(spec, column).iloc[-1]
+        return {
+            'count': int(last['count']),
+            'start': pd.Timestamp(last['start']),
+            'end': self.frame.index[-1],
+            'mean': last['mean'],
+            'min': self._native(column, last['min']),
+            'max': self._native(column, last['max']),
+            'std': last['std'],
+            'return': last['return'],
+            'drawdown': last['drawdown'],
+        }
+
+    def summary(self, specs=None, columns=None):
+        """여러 구간·컬럼의 최근 통계를 하나의 표로 반환"""
+        specs = specs or DEFAULT_WINDOWS
+        columns = columns or list(self.frame.columns)
+        rows = []
+        for spec in specs:
+            for column in columns:
+                latest = self.latest(spec, column)
+                if latest:
+                    rows.append({'구간': window_label(spec), '구분': column, **latest})
+        return pd.DataFrame(rows)
@@ -5,48 +5,118 @@
 크롤링된 금 시세 데이터를 분석하여 통계값을 계산하고 엑셀에 저장
 """
 
+import os
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime
 import logging
+from storage import open_store, DATE_COLUMN, PRICE_COLUMNS
+import common_path  # crawler_common 패키지 경로 추가
+from crawler_common.excel_export import export_sheets
+from stats_engine import sort_by_date, basic_statistics, price_change_statistics
+from rolling_analytics import RollingAnalytics, window_label
+from incremental_stats import IncrementalStats, default_state_path, tail_requirements
+from correlation_engine import pairwise_correlation, upper_triangle
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class GoldPriceAnalyzer:
-    def __init__(self, excel_file="gold_prices.xlsx"):
+    # 기간별분석 시트에 들어갈 최근 구간 (기간 문자열 또는 관측치 개수)
+    PERIOD_WINDOWS = {'최근30일': '30D', '최근7일': '7D'}
+
+    def __init__(self, excel_file="gold_prices.xlsx", storage_backend="parquet", store_path=None,
+                 period_windows=None, incremental=False, stats_file=None):
         self.excel_file = excel_file
+        self.period_windows = period_windows or self.PERIOD_WINDOWS
+        self.rolling = None
+        self.store = open_store(storage_backend, store_path)
+        self.incremental = incremental  # 누적 통계 상태에 새 행만 반영하여 보고서 생성
+        self.stats_file = stats_file or default_state_path(self.store)
+        self.incremental_stats = None
         self.df = None
         self.stats_data = {}
         
     def load_data(self):
-        """엑셀 파일에서 데이터 로드"""
+        """저장소(없으면 엑셀 파일)에서 데이터 로드"""
         try:
-            self.df = pd.read_excel(self.excel_file)
+            if self.store.exists():
+                self.df = self.store.load()
+            else:
+                self.df = pd.read_excel(self.excel_file)
+            # 날짜순 정렬은 여기서 한 번만 수행
+            self.df = sort_by_date(self.df)
             logger.info(f"데이터 로드 완료: {len(self.df)}개 행")
             return True
         except Exception as e:
             logger.error(f"데이터 로드 실패: {e}")
             return False
     
+    def update_incremental_stats(self):
+        """누적 통계 상태에 마지막 갱신 이후 바뀐 파티션(월)의 행만 반영
+        (이미 누적 통계에 병합된 날짜의 행이 바뀐 경우에만 전체를 다시 읽어 처음부터 계산)"""
+        try:
+            tail_days, tail_rows = tail_requirements(self.period_windows)
+            state = IncrementalStats.load(self.stats_file, PRICE_COLUMNS, tail_days, tail_rows)
+            self.incremental_stats = state
+            from_store = self.store.exists()
+            signatures = self.store.partition_signatures() if from_store else self.excel_signature()
+            changed = state.changed_partitions(signatures)
+
+            updated = 0
+            if changed:
+                # 저장소는 바뀐 월 파티션만 읽고, 엑셀은 파티션이 없으므로 파일이 바뀐 경우에만 전체를 읽음
+                months = changed if from_store else None
+                rows = self.store.load_partitions(changed) if from_store else pd.read_excel(self.excel_file)
+                if not state.folded_rows_match(rows, months):
+                    logger.warning("누적 통계에 병합된 날짜의 데이터가 바뀌어 처음부터 다시 계산합니다.")
+                    state.reset()
+                    months = None
+                    if from_store:
+                        rows = self.store.load()
+                updated = state.update(sort_by_date(rows), months)
+                state.partitions = signatures
+                state.save()
+            else:
+                logger.info("마지막 갱신 이후 바뀐 파티션이 없습니다.")
+            if state.total_count == 0:
+                logger.error("누적 통계에 반영된 데이터가 없습니다.")
+                return False
+            
+            # 원본데이터 시트에는 상태에 보관된 최근 행만 기록
+            self.df = state.tail_frame()
+            logger.info(f"누적 통계 반영 완료: 다시 읽은 파티션 {len(changed)}개, 다시 계산한 행 {updated}개")
+            return True
+        except Exception as e:
+            logger.error(f"누적 통계 갱신 실패: {e}")
+            return False
+
+    def excel_signature(self):
+        """엑셀 파일 전체를 하나의 파티션으로 보는 서명 (파일 정보만 확인)"""
+        stat = os.stat(self.excel_file)
+        return {'excel': f"{stat.st_mtime_ns}:{stat.st_size}"}
+    
+    def build_statistics_from_state(self):
+        """누적 통계 상태만으로 보고서 시트 데이터 생성"""
+        try:
+            state = self.incremental_stats
+            self.stats_data['기본통계'] = state.basic_statistics()
+            self.stats_data['가격변동'] = state.price_change_statistics()
+            self.stats_data['기간별분석'] = state.period_analysis(
+                self.period_windows, ['내가살때_순금(3.75g)', '내가팔때_순금(3.75g)'])
+            self.stats_data['상관관계'] = state.correlations()
+            logger.info("누적 통계 상태에서 통계 생성 완료")
+            return True
+        except Exception as e:
+            logger.error(f"누적 통계 상태에서 통계 생성 실패: {e}")
+            return False
+    
     def calculate_basic_statistics(self):
         """기본 통계값 계산"""
         try:
-            # 각 금 종류별 기본 통계
-            price_columns = ['내가살때_순금(3.75g)', '내가팔때_순금(3.75g)', '내가팔때_18K(3.75g)', '내가팔때_14K(3.75g)']
-            
-            basic_stats = {}
-            for col in price_columns:
-                basic_stats[col] = {
-                    '평균': round(self.df[col].mean(), 0),
-                    '중앙값': round(self.df[col].median(), 0),
-                    '최고가': self.df[col].max(),
-                    '최저가': self.df[col].min(),
-                    '표준편차': round(self.df[col].std(), 0),
-                    '변동계수': round((self.df[col].std() / self.df[col].mean()) * 100, 2),
-                    '범위': self.df[col].max() - self.df[col].min()
-                }
+            # 각 금 종류별 기본 통계 (모든 컬럼을 한 번에 집계)
+            basic_stats = basic_statistics(self.df, PRICE_COLUMNS)
             
             self.stats_data['기본통계'] = basic_stats
             logger.info("기본 통계 계산 완료")
@@ -59,26 +129,8 @@ class GoldPriceAnalyzer:
     def calculate_price_changes(self):
         """가격 변동 분석"""
         try:
-            # 날짜순으로 정렬
-            df_sorted = self.df.sort_values('고시날짜')
-            
-            price_changes = {}
-            price_columns = ['내가살때_순금(3.75g)', '내가팔때_순금(3.75g)', '내가팔때_18K(3.75g)', '내가팔때_14K(3.75g)']
-            
-            for col in price_columns:
-                # 일일 변동률 계산
-                daily_changes = df_sorted[col].pct_change() * 100
-                
-                # 가격 변동 통계
-                price_changes[col] = {
-                    '최대상승률': round(daily_changes.max(), 2),
-                    '최대하락률': round(daily_changes.min(), 2),
-                    '평균변동률': round(daily_changes.mean(), 2),
-                    '변동률_표준편차': round(daily_changes.std(), 2),
-                    '상승일수': (daily_changes > 0).sum(),
-                    '하락일수': (daily_changes < 0).sum(),
-                    '보합일수': (daily_changes == 0).sum()
-                }
+            # 일일 변동률 통계 (load_data에서 이미 날짜순 정렬됨)
+            price_changes = price_change_statistics(self.df, PRICE_COLUMNS)
             
             self.stats_data['가격변동'] = price_changes
             logger.info("가격 변동 분석 완료")
@@ -89,48 +141,43 @@ class GoldPriceAnalyzer:
             return False
     
     def calculate_period_analysis(self):
-        """기간별 분석"""
+        """기간별 분석 (최근 구간은 이동 구간 분석의 마지막 시점 값 사용)"""
         try:
-            # 최근 7일, 30일, 전체 기간 분석
-            df_sorted = self.df.sort_values('고시날짜')
+            # load_data에서 이미 날짜순 정렬됨
+            df_sorted = self.df
+            target_columns = ['내가살때_순금(3.75g)', '내가팔때_순금(3.75g)']
+            self.rolling = RollingAnalytics(df_sorted, PRICE_COLUMNS)
             
             # 전체 기간
             total_days = (df_sorted['고시날짜'].max() - df_sorted['고시날짜'].min()).days
-            
-            # 최근 30일 데이터
-            recent_30_days = df_sorted[df_sorted['고시날짜'] >= (df_sorted['고시날짜'].max() - timedelta(days=30))]
-            
-            # 최근 7일 데이터
-            recent_7_days = df_sorted[df_sorted['고시날짜'] >= (df_sorted['고시날짜'].max() - timedelta(days=7))]
-            
             period_analysis = {
                 '전체기간': {
                     '기간': f"{total_days}일",
                     '데이터수': len(df_sorted),
                     '시작일': df_sorted['고시날짜'].min().strftime('%Y-%m-%d'),
                     '종료일': df_sorted['고시날짜'].max().strftime('%Y-%m-%d')
-                },
-                '최근30일': {
-                    '기간': '30일',
-                    '데이터수': len(recent_30_days),
-                    '시작일': recent_30_days['고시날짜'].min().strftime('%Y-%m-%d') if len(recent_30_days) > 0 else 'N/A',
-                    '종료일': recent_30_days['고시날짜'].max().strftime('%Y-%m-%d') if len(recent_30_days) > 0 else 'N/A'
-                },
-                '최근7일': {
-                    '기간': '7일',
-                    '데이터수': len(recent_7_days),
-                    '시작일': recent_7_days['고시날짜'].min().strftime('%Y-%m-%d') if len(recent_7_days) > 0 else 'N/A',
-                    '종료일': recent_7_days['고시날짜'].max().strftime('%Y-%m-%d') if len(recent_7_days) > 0 else 'N/A'
                 }
             }
+            for col in target_columns:
+                period_analysis['전체기간'][f'{col}_평균'] = round(df_sorted[col].mean(), 0)
+                period_analysis['전체기간'][f'{col}_최고가'] = df_sorted[col].max()
+                period_analysis['전체기간'][f'{col}_최저가'] = df_sorted[col].min()
             
-            # 각 기간별 가격 통계 추가
-            for period_name, period_df in [('전체기간', df_sorted), ('최근30일', recent_30_days), ('최근7일', recent_7_days)]:
-                if len(period_df) > 0:
-                    for col in ['내가살때_순금(3.75g)', '내가팔때_순금(3.75g)']:
-                        period_analysis[period_name][f'{col}_평균'] = round(period_df[col].mean(), 0)
-                        period_analysis[period_name][f'{col}_최고가'] = period_df[col].max()
-                        period_analysis[period_name][f'{col}_최저가'] = period_df[col].min()
+            # 최근 N일/N개 구간
+            for period_name, spec in self.period_windows.items():
+                latest = self.rolling.latest(spec, target_columns[0])
+                period_analysis[period_name] = {
+                    '기간': window_label(spec),
+                    '데이터수': latest['count'] if latest else 0,
+                    '시작일': latest['start'].strftime('%Y-%m-%d') if latest else 'N/A',
+                    '종료일': latest['end'].strftime('%Y-%m-%d') if latest else 'N/A'
+                }
+                if latest:
+                    for col in target_columns:
+                        window_stats = self.rolling.latest(spec, col)
+                        period_analysis[period_name][f'{col}_평균'] = round(window_stats['mean'], 0)
+                        period_analysis[period_name][f'{col}_최고가'] = window_stats['max']
+                        period_analysis[period_name][f'{col}_최저가'] = window_stats['min']
             
             self.stats_data['기간별분석'] = period_analysis
             logger.info("기간별 분석 완료")
@@ -143,18 +190,14 @@ class GoldPriceAnalyzer:
     def calculate_correlation_analysis(self):
         """상관관계 분석"""
         try:
-            price_columns = ['내가살때_순금(3.75g)', '내가팔때_순금(3.75g)', '내가팔때_18K(3.75g)', '내가팔때_14K(3.75g)']
-            
-            # 상관계수 계산
-            correlation_matrix = self.df[price_columns].corr()
+            # 상관계수 계산 (상삼각만 표로 추출)
+            correlation_matrix = pairwise_correlation(self.df[PRICE_COLUMNS])
+            pairs = upper_triangle(correlation_matrix)
             
-            # 주요 상관관계 추출
-            correlations = {}
-            for i, col1 in enumerate(price_columns):
-                for j, col2 in enumerate(price_columns):
-                    if i < j:  # 중복 제거
-                        corr_value = correlation_matrix.loc[col1, col2]
-                        correlations[f"{col1} vs {col2}"] = round(corr_value, 4)
+            correlations = {
+                f"{col1} vs {col2}": round(corr_value, 4)
+                for col1, col2, corr_value in zip(pairs['series_1'], pairs['series_2'], pairs['corr'])
+            }
             
             self.stats_data['상관관계'] = correlations
             logger.info("상관관계 분석 완료")
@@ -209,46 +252,19 @@ class GoldPriceAnalyzer:
     def save_to_excel(self, output_file="gold_prices_with_statistics.xlsx"):
         """통계 데이터를 포함한 엑셀 파일 저장"""
         try:
-            with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-                # 원본 데이터
-                self.df.to_excel(writer, sheet_name='원본데이터', index=False)
-                
-                # 기본 통계
-                basic_stats_df = pd.DataFrame(self.stats_data['기본통계']).T
-                basic_stats_df.to_excel(writer, sheet_name='기본통계')
-                
-                # 가격 변동 분석
-                price_changes_df = pd.DataFrame(self.stats_data['가격변동']).T
-                price_changes_df.to_excel(writer, sheet_name='가격변동분석')
-                
-                # 기간별 분석
-                period_analysis_df = pd.DataFrame(self.stats_data['기간별분석']).T
-                period_analysis_df.to_excel(writer, sheet_name='기간별분석')
-                
-                # 상관관계 분석
-                correlation_df = pd.DataFrame(list(self.stats_data['상관관계'].items()), 
-                                            columns=['금종류', '상관계수'])
-                correlation_df.to_excel(writer, sheet_name='상관관계분석', index=False)
-                
-                # 요약 테이블
-                self.stats_data['요약테이블'].to_excel(writer, sheet_name='요약테이블', index=False)
-                
-                # 워크시트 스타일링
-                for sheet_name in writer.sheets:
-                    worksheet = writer.sheets[sheet_name]
-                    
-                    # 컬럼 너비 자동 조정
-                    for column in worksheet.columns:
-                        max_length = 0
-                        column_letter = column[0].column_letter
-                        for cell in column:
-                            try:
-                                if len(str(cell.value)) > max_length:
-                                    max_length = len(str(cell.value))
-                            except:
-                                pass
-                        adjusted_width = min(max_length + 2, 50)
-                        worksheet.column_dimensions[column_letter].width = adjusted_width
+            # 상관관계 분석
+            correlation_df = pd.DataFrame(list(self.stats_data['상관관계'].items()), 
+                                        columns=['금종류', '상관계수'])
+            
+            # 시트별로 행 단위 스트리밍 저장 (컬럼 너비는 데이터프레임에서 미리 계산)
+            export_sheets(output_file, [
+                ('원본데이터', self.df, False),
+                ('기본통계', pd.DataFrame(self.stats_data['기본통계']).T, True),
+                ('가격변동분석', pd.DataFrame(self.stats_data['가격변동']).T, True),
+                ('기간별분석', pd.DataFrame(self.stats_data['기간별분석']).T, True),
+                ('상관관계분석', correlation_df, False),
+                ('요약테이블', self.stats_data['요약테이블'], False),
+            ])
             
             logger.info(f"통계 데이터가 포함된 엑셀 파일이 저장되었습니다: {output_file}")
             return True
@@ -262,15 +278,22 @@ class GoldPriceAnalyzer:
         try:
             logger.info("금 시세 데이터 분석을 시작합니다.")
             
-            # 데이터 로드
-            if not self.load_data():
-                return False
-            
-            # 각종 분석 수행
-            self.calculate_basic_statistics()
-            self.calculate_price_changes()
-            self.calculate_period_analysis()
-            self.calculate_correlation_analysis()
+            if self.incremental:
+                # 새 행만 누적 통계에 반영하고 상태에서 통계 생성
+                if not self.update_incremental_stats():
+                    return False
+                if not self.build_statistics_from_state():
+                    return False
+            else:
+                # 데이터 로드
+                if not self.load_data():
+                    return False
+                
+                # 각종 분석 수행
+                self.calculate_basic_statistics()
+                self.calculate_price_changes()
+                self.calculate_period_analysis()
+                self.calculate_correlation_analysis()
             self.create_summary_table()
             
             # 엑셀 파일로 저장
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+금 시세 통계 엔진
+날짜순 정렬은 한 번만 수행하고, 컬럼별 집계는 float64 행렬에 대해 NumPy로 한 번에 계산
+"""
+
+import numpy as np
+import pandas as pd
+from storage import DATE_COLUMN
+
+
+def sort_by_date(df):
+    """고시날짜 오름차순으로 한 번만 정렬 (이후 분석은 정렬된 프레임을 공유)"""
+    return df.sort_values(DATE_COLUMN).reset_index(drop=True)
+
+
+def _as_matrix(df, columns):
+    return df[columns].to_numpy(dtype='float64')
+
+
+def _native(df, col, value):
+    """정수 컬럼의 최고가/최저가는 원래 정수 타입으로 반환"""
+    dtype = df[col].dtype
+    if pd.api.types.is_integer_dtype(dtype) and not np.isnan(value):
+        return dtype.type(value)
+    return value
+
+
+def basic_statistics(df, columns):
+    """평균·중앙값·최고가·최저가·표준편차·변동계수·범위를 모든 컬럼에 대해 한 번에 계산"""
+    values = _as_matrix(df, columns)
+    mean = np.nanmean(values, axis=0)
+    median = np.nanmedian(values, axis=0)
+    maximum = np.nanmax(values, axis=0)
+    minimum = np.nanmin(values, axis=0)
+    std = np.nanstd(values, axis=0, ddof=1)
+    cv = std / mean * 100
+
+    return {
+        col: {
+            '평균': round(mean[i], 0),
+            '중앙값': round(median[i], 0),
+            '최고가': _native(df, col, maximum[i]),
+            '최저가': _native(df, col, minimum[i]),
+            '표준편차': round(std[i], 0),
+            '변동계수': round(cv[i], 2),
+            '범위': _native(df, col, maximum[i] - minimum[i])
+        }
+        for i, col in enumerate(columns)
+    }
+
+
+def daily_changes(sorted_df, columns):
+    """날짜순으로 정렬된 프레임의 일일 변동률(%) 행렬 (첫 행은 NaN)"""
+    values = _as_matrix(sorted_df, columns)
+    changes = np.full_like(values, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        changes[1:] = (values[1:] / values[:-1] - 1) * 100
+    return changes
+
+
+def price_change_statistics(sorted_df, columns):
+    """일일 변동률의 최대상승률·최대하락률·평균·표준편차·상승/하락/보합 일수를 한 번에 계산"""
+    changes = daily_changes(sorted_df, columns)
+    valid = changes[1:]
+    maximum = np.nanmax(valid, axis=0) if len(valid) else np.full(len(columns), np.nan)
+    minimum = np.nanmin(valid, axis=0) if len(valid) else np.full(len(columns), np.nan)
+    mean = np.nanmean(valid, axis=0) if len(valid) else np.full(len(columns), np.nan)
+    std = np.nanstd(valid, axis=0, ddof=1) if len(valid) > 1 else np.full(len(columns), np.nan)
+    up = (valid > 0).sum(axis=0)
+    down = (valid < 0).sum(axis=0)
+    flat = (valid == 0).sum(axis=0)
+
+    return {
+        col: {
+            '최대상승률': round(maximum[i], 2),
+            '최대하락률': round(minimum[i], 2),
+            '평균변동률': round(mean[i], 2),
+            '변동률_표준편차': round(std[i], 2),
+            '상승일수': up[i],
+            '하락일수': down[i],
+            '보합일수': flat[i]
+        }
+        for i, col in enumerate(columns)
+    }
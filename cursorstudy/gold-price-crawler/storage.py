@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+금 시세 저장소
+- Parquet: 연/월 단위로 파티션된 컬럼형 파일 (기본)
+- SQLite: WAL 모드, 고시날짜 기준 upsert를 지원하는 시계열 테이블
+엑셀은 내보내기 전용으로 사용
+두 저장소 모두 월 파티션('YYYY-MM')별 서명을 제공하여 바뀐 달의 데이터만 다시 읽을 수 있음
+"""
+
+import os
+import glob
+import sqlite3
+import logging
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DATE_COLUMN = '고시날짜'
+PRICE_COLUMNS = ['내가살때_순금(3.75g)', '내가팔때_순금(3.75g)', '내가팔때_18K(3.75g)', '내가팔때_14K(3.75g)']
+PARTITION_COLUMNS = ['year', 'month']
+
+# SQLite 테이블 컬럼 -> 데이터프레임 컬럼
+SQLITE_COLUMNS = {
+    'quote_date': DATE_COLUMN,
+    'buy_pure': '내가살때_순금(3.75g)',
+    'sell_pure': '내가팔때_순금(3.75g)',
+    'sell_18k': '내가팔때_18K(3.75g)',
+    'sell_14k': '내가팔때_14K(3.75g)',
+}
+
+
+def partition_keys(dates):
+    """고시날짜 Series의 월 파티션 키 ('YYYY-MM')"""
+    return pd.to_datetime(dates).dt.strftime('%Y-%m')
+
+
+def empty_frame():
+    """저장용 타입의 빈 데이터프레임"""
+    return pd.DataFrame({DATE_COLUMN: pd.Series(dtype='datetime64[ns]'),
+                         **{col: pd.Series(dtype='int64') for col in PRICE_COLUMNS}})
+
+
+def to_typed_frame(df):
+    """크롤링 결과를 저장용 타입(datetime64, int64)으로 변환"""
+    typed = df[[DATE_COLUMN] + PRICE_COLUMNS].copy()
+    if not pd.api.types.is_datetime64_any_dtype(typed[DATE_COLUMN]):
+        typed[DATE_COLUMN] = pd.to_datetime(typed[DATE_COLUMN].astype(str).str.replace('-', '.'), format='%Y.%m.%d')
+    typed[DATE_COLUMN] = typed[DATE_COLUMN].astype('datetime64[ns]')
+    typed[PRICE_COLUMNS] = typed[PRICE_COLUMNS].astype('int64')
+    return typed
+
+
+class ParquetPriceStore:
+    """연/월 파티션 Parquet 금 시세 저장소"""
+
+    def __init__(self, base_dir="gold_prices_store"):
+        self.base_dir = base_dir
+
+    def exists(self):
+        """저장된 데이터가 있는지 확인"""
+        return os.path.isdir(self.base_dir) and any(
+            name.endswith('.parquet') for _, _, files in os.walk(self.base_dir) for name in files
+        )
+
+    def _partition_path(self, year, month):
+        return os.path.join(self.base_dir, f"year={year}", f"month={month}", "data.parquet")
+
+    def append(self, df):
+        """새 데이터를 저장 (같은 고시날짜는 새 데이터로 교체, 해당 월 파티션만 다시 씀)"""
+        typed = to_typed_frame(df)
+        for (year, month), part in typed.groupby([typed[DATE_COLUMN].dt.year, typed[DATE_COLUMN].dt.month]):
+            path = self._partition_path(year, month)
+            if os.path.exists(path):
+                part = pd.concat([part, pd.read_parquet(path)], ignore_index=True)
+            part = part.drop_duplicates(DATE_COLUMN, keep='first').sort_values(DATE_COLUMN)
+
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + ".tmp"
+            part.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+        logger.info(f"Parquet 저장소에 {len(typed)}개 행 저장: {self.base_dir}")
+        return len(typed)
+
+    def load(self, start=None, end=None, columns=None):
+        """기간으로 필터링하여 날짜순으로 로드 (해당 연도 파티션만 읽음)"""
+        filters = []
+        if start is not None:
+            start = pd.Timestamp(start)
+            filters += [('year', '>=', start.year), (DATE_COLUMN, '>=', start)]
+        if end is not None:
+            end = pd.Timestamp(end)
+            filters += [('year', '<=', end.year), (DATE_COLUMN, '<=', end)]
+
+        read_columns = None if columns is None else [DATE_COLUMN] + [c for c in columns if c != DATE_COLUMN]
+        df = pd.read_parquet(self.base_dir, columns=read_columns, filters=filters or None)
+        df = df.drop(columns=[c for c in PARTITION_COLUMNS if c in df.columns])
+        return df.sort_values(DATE_COLUMN).reset_index(drop=True)
+
+    def latest_date(self):
+        """저장된 가장 최신 고시날짜"""
+        if not self.exists():
+            return None
+        return self.load(columns=[DATE_COLUMN])[DATE_COLUMN].max()
+
+    def partition_signatures(self):
+        """월 파티션별 서명 {'YYYY-MM': 'mtime_ns:size'} (파일 정보만 확인하고 데이터는 읽지 않음)
+        append가 파티션 파일을 다시 쓸 때마다 바뀜"""
+        signatures = {}
+        for path in glob.glob(os.path.join(self.base_dir, "year=*", "month=*", "data.parquet")):
+            month_dir = os.path.dirname(path)
+            year = int(os.path.basename(os.path.dirname(month_dir)).split('=', 1)[1])
+            month = int(os.path.basename(month_dir).split('=', 1)[1])
+            stat = os.stat(path)
+            signatures[f"{year:04d}-{month:02d}"] = f"{stat.st_mtime_ns}:{stat.st_size}"
+        return signatures
+
+    def load_partitions(self, keys):
+        """월 파티션('YYYY-MM') 파일만 읽어 날짜순으로 로드 (없는 파티션은 건너뜀)"""
+        frames = []
+        for key in keys:
+            year, month = (int(part) for part in key.split('-'))
+            path = self._partition_path(year, month)
+            if os.path.exists(path):
+                frames.append(pd.read_parquet(path))
+        if not frames:
+            return empty_frame()
+        df = pd.concat(frames, ignore_index=True)
+        return df.sort_values(DATE_COLUMN).reset_index(drop=True)
+
+
+class SQLitePriceStore:
+    """SQLite 금 시세 저장소 (gold_daily_quotes 테이블)"""
+
+    def __init__(self, db_path="gold_prices.db"):
+        self.db_path = db_path
+
+    def connect(self):
+        """WAL 모드 연결 생성 (테이블이 없으면 생성)"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS gold_daily_quotes (
+                quote_date TEXT PRIMARY KEY,
+                buy_pure INTEGER NOT NULL,
+                sell_pure INTEGER NOT NULL,
+                sell_18k INTEGER NOT NULL,
+                sell_14k INTEGER NOT NULL
+            )
+        """)
+        # 월별 변경 번호 (upsert마다 해당 월의 번호를 올려 바뀐 달만 다시 읽을 수 있게 함)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS gold_quote_months (
+                month TEXT PRIMARY KEY,
+                revision INTEGER NOT NULL
+            )
+        """)
+        return conn
+
+    def exists(self):
+        """저장된 데이터가 있는지 확인"""
+        if not os.path.exists(self.db_path):
+            return False
+        conn = self.connect()
+        try:
+            return conn.execute("SELECT 1 FROM gold_daily_quotes LIMIT 1").fetchone() is not None
+        finally:
+            conn.close()
+
+    def append(self, df):
+        """새 데이터를 저장 (같은 고시날짜는 새 데이터로 갱신)"""
+        typed = to_typed_frame(df)
+        rows = list(zip(
+            typed[DATE_COLUMN].dt.strftime('%Y-%m-%d'),
+            *(typed[col].tolist() for col in PRICE_COLUMNS)
+        ))
+        conn = self.connect()
+        try:
+            with conn:
+                conn.executemany("""
+                    INSERT INTO gold_daily_quotes (quote_date, buy_pure, sell_pure, sell_18k, sell_14k)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(quote_date) DO UPDATE SET
+                        buy_pure = excluded.buy_pure,
+                        sell_pure = excluded.sell_pure,
+                        sell_18k = excluded.sell_18k,
+                        sell_14k = excluded.sell_14k
+                """, rows)
+                conn.executemany("""
+                    INSERT INTO gold_quote_months (month, revision) VALUES (?, 1)
+                    ON CONFLICT(month) DO UPDATE SET revision = revision + 1
+                """, [(key,) for key in sorted(set(partition_keys(typed[DATE_COLUMN])))])
+        finally:
+            conn.close()
+        logger.info(f"SQLite 저장소에 {len(rows)}개 행 저장: {self.db_path}")
+        return len(rows)
+
+    def load(self, start=None, end=None, columns=None):
+        """기간으로 필터링하여 날짜순으로 로드"""
+        names = {v: k for k, v in SQLITE_COLUMNS.items()}
+        selected = [DATE_COLUMN] + [c for c in (columns or PRICE_COLUMNS) if c != DATE_COLUMN]
+        query = f"SELECT {', '.join(names[c] for c in selected)} FROM gold_daily_quotes"
+
+        conditions, params = [], []
+        if start is not None:
+            conditions.append("quote_date >= ?")
+            params.append(f"{pd.Timestamp(start):%Y-%m-%d}")
+        if end is not None:
+            conditions.append("quote_date <= ?")
+            params.append(f"{pd.Timestamp(end):%Y-%m-%d}")
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY quote_date"
+
+        conn = self.connect()
+        try:
+            df = pd.read_sql_query(query, conn, params=params)
+        finally:
+            conn.close()
+        df = df.rename(columns=SQLITE_COLUMNS)
+        df[DATE_COLUMN] = pd.to_datetime(df[DATE_COLUMN])
+        return df
+
+    def latest_date(self):
+        """저장된 가장 최신 고시날짜"""
+        if not os.path.exists(self.db_path):
+            return None
+        conn = self.connect()
+        try:
+            value = conn.execute("SELECT MAX(quote_date) FROM gold_daily_quotes").fetchone()[0]
+        finally:
+            conn.close()
+        return pd.Timestamp(value) if value else None
+
+    def partition_signatures(self):
+        """월 파티션별 서명 {'YYYY-MM': 변경 번호} (월별 변경 번호 테이블만 읽음)"""
+        if not os.path.exists(self.db_path):
+            return {}
+        conn = self.connect()
+        try:
+            with conn:
+                # 변경 번호 테이블이 생기기 전에 저장된 데이터는 처음 한 번만 채움
+                if conn.execute("SELECT 1 FROM gold_quote_months LIMIT 1").fetchone() is None:
+                    conn.execute("""
+                        INSERT INTO gold_quote_months (month, revision)
+                        SELECT DISTINCT substr(quote_date, 1, 7), 1 FROM gold_daily_quotes
+                    """)
+            rows = conn.execute("SELECT month, revision FROM gold_quote_months").fetchall()
+        finally:
+            conn.close()
+        return {month: str(revision) for month, revision in rows}
+
+    def load_partitions(self, keys):
+        """월 파티션('YYYY-MM')의 행만 날짜순으로 로드"""
+        frames = [self.load(start=pd.Period(key, freq='M').start_time, end=pd.Period(key, freq='M').end_time)
+                  for key in keys]
+        if not frames:
+            return empty_frame()
+        df = pd.concat(frames, ignore_index=True)
+        return df.sort_values(DATE_COLUMN).reset_index(drop=True)
+
+
+def open_store(backend="parquet", path=None):
+    """저장소 백엔드 선택 ("parquet" 또는 "sqlite")"""
+    if backend == "parquet":
+        return ParquetPriceStore(path or "gold_prices_store")
+    if backend == "sqlite":
+        return SQLitePriceStore(path or "gold_prices.db")
+    raise ValueError(f"지원하지 않는 저장소 백엔드: {backend}")
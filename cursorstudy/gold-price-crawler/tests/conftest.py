@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+테스트 공통 설정
+- 프로젝트 디렉토리와 crawler_common 패키지를 import 경로에 추가
+- 데이터 엔드포인트 응답(tests/fixtures, 실제 응답으로 검증되지 않은 가정 형식)을 내려주는 로컬 HTTP 서버
+"""
+
+import os
+import sys
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import pytest
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+sys.path.insert(0, PROJECT_DIR)
+import common_path  # crawler_common 패키지 경로 추가
+
+
+def load_fixture(name):
+    """tests/fixtures의 JSON 응답 로드"""
+    with open(os.path.join(FIXTURE_DIR, name), encoding="utf-8") as f:
+        return json.load(f)
+
+
+class GoldApiHandler(BaseHTTPRequestHandler):
+    """?page=N 요청에 server.pages[N] 응답 (server.failures[N]회는 500 응답)"""
+
+    def do_GET(self):
+        page = int(parse_qs(urlparse(self.path).query).get("page", ["1"])[0])
+        self.server.requests.append(page)
+        if self.server.failures.get(page, 0) > 0:
+            self.server.failures[page] -= 1
+            self.send_error(500)
+            return
+        if page not in self.server.pages:
+            self.send_error(404)
+            return
+        body = json.dumps(self.server.pages[page], ensure_ascii=False).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def gold_api():
+    """fixture 페이지 1~2를 내려주는 로컬 데이터 엔드포인트"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), GoldApiHandler)
+    server.pages = {
+        1: load_fixture("gold_price_list_page1.json"),
+        2: load_fixture("gold_price_list_page2.json"),
+    }
+    server.failures = {}
+    server.requests = []
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/api/price/gold/list"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""상관관계 엔진 테스트 (결측값이 있는 경우 pandas 결과와 비교)"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from correlation_engine import align_series, pairwise_correlation, cross_correlation
+
+
+def frame_with_missing(rows=300, k=12, missing=0.3, seed=1):
+    rng = np.random.default_rng(seed)
+    common = rng.normal(size=(rows, 1))
+    df = pd.DataFrame(common + rng.normal(size=(rows, k)), columns=[f"s{i}" for i in range(k)])
+    df['ties'] = df['s0'].round(0)  # 동률 순위
+    df['flat'] = 1.0  # 분산 0
+    df = df.mask(rng.random(df.shape) < missing)
+    df['complete'] = common[:, 0]
+    return df
+
+
+@pytest.mark.parametrize('method', ['pearson', 'spearman'])
+@pytest.mark.parametrize('min_periods', [1, 200])
+def test_pairwise_matches_pandas_with_missing_values(method, min_periods):
+    df = frame_with_missing()
+    ours = pairwise_correlation(df, method=method, min_periods=min_periods, block_size=5)
+    expected = df.corr(method=method, min_periods=min_periods)
+
+    pd.testing.assert_frame_equal(ours, expected, atol=1e-12, rtol=0)
+
+
+def test_cross_correlation_spearman_on_outer_joined_series():
+    rng = np.random.default_rng(2)
+    dates = pd.date_range('2024-01-01', periods=200)
+
+    def series(size):
+        return pd.Series(np.cumsum(rng.normal(size=size)), index=dates[np.sort(rng.choice(200, size, replace=False))])
+
+    frame = align_series({'금': series(200), 'USD/KRW': series(150), **{f"stock{i}": series(120) for i in range(5)}})
+
+    ours = cross_correlation(frame[['금']], frame.drop(columns='금'), method='spearman')
+    expected = frame.corr(method='spearman').loc[['금'], ours.columns]
+
+    pd.testing.assert_frame_equal(ours, expected, atol=1e-12, rtol=0)
+
+
+def test_spearman_at_target_width_matches_pandas_on_sampled_columns():
+    # 외부 조인 후처럼 모든 시리즈에 결측값이 있는 750일 x 500개 종목 (pandas는 일부 컬럼에서만 비교)
+    rng = np.random.default_rng(3)
+    frame = pd.DataFrame(rng.normal(size=(750, 500)).cumsum(axis=0).round(2))
+    frame = frame.mask(rng.random(frame.shape) < 0.05)
+    assert frame.isna().any().all()
+
+    ours = pairwise_correlation(frame, method='spearman')
+    sampled = frame.columns[::20]
+    expected = frame[sampled].corr(method='spearman')
+
+    pd.testing.assert_frame_equal(ours.loc[sampled, sampled], expected, atol=1e-12, rtol=0)
+
+
+def test_spearman_column_rank_approximation_is_exact_without_missing_values():
+    rng = np.random.default_rng(4)
+    frame = pd.DataFrame(rng.normal(size=(200, 30)).cumsum(axis=0).round(1))
+
+    approx = pairwise_correlation(frame, method='spearman', rerank=False)
+
+    pd.testing.assert_frame_equal(approx, frame.corr(method='spearman'), atol=1e-12, rtol=0)
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""Selenium 경로의 WebDriver 풀 대여·반납 테스트 (실제 Chrome 없이 가짜 드라이버 사용)"""
+
+from crawler_common.webdriver_utils import WebDriverPool, shared_pool
+from gold_crawler import GoldPriceCrawler
+
+
+class FakeDriver:
+    def get(self, url):
+        raise RuntimeError("offline")
+
+
+class RecordingPool:
+    def __init__(self):
+        self.leased = []
+        self.released = []
+
+    def acquire(self):
+        driver = FakeDriver()
+        self.leased.append(driver)
+        return driver
+
+    def release(self, driver, broken=False):
+        self.released.append(driver)
+
+
+def test_crawlers_share_the_process_pool(tmp_path):
+    crawler = GoldPriceCrawler(store_path=str(tmp_path / "store"))
+    assert isinstance(crawler.driver_pool, WebDriverPool)
+    assert crawler.driver_pool is shared_pool()
+
+
+def test_selenium_run_returns_leased_driver(tmp_path):
+    pool = RecordingPool()
+    crawler = GoldPriceCrawler(fetch_mode="selenium", driver_pool=pool, store_path=str(tmp_path / "store"),
+                               export_excel=False)
+
+    assert not crawler.run(target_count=10)
+    assert len(pool.leased) == 1
+    assert pool.released == pool.leased
+    assert crawler.driver is None
+
+
+class FakeChrome:
+    """WebDriverPool이 반납 시 호출하는 메서드만 가진 가짜 드라이버"""
+    window_handles = ['main']
+    current_url = 'about:blank'
+
+    def __init__(self):
+        self.switch_to = self
+        self.quit_called = False
+
+    def execute_script(self, script):
+        pass
+
+    def delete_all_cookies(self):
+        pass
+
+    def window(self, handle):
+        pass
+
+    def get(self, url):
+        pass
+
+    def quit(self):
+        self.quit_called = True
+
+
+CRAWLER_SOURCE = '''
+from storage import NAME
+
+
+class Crawler:
+    def __init__(self, driver_pool, **kwargs):
+        self.driver_pool = driver_pool
+
+    def run(self):
+        driver = self.driver_pool.acquire()
+        try:
+            return NAME
+        finally:
+            self.driver_pool.release(driver)
+'''
+
+
+def test_runner_shares_one_warm_pool_across_projects(tmp_path):
+    from crawler_common.runner import CrawlRunner
+
+    for project in ('first', 'second'):
+        (tmp_path / project).mkdir()
+        (tmp_path / project / "storage.py").write_text(f"NAME = {project!r}\n")  # 같은 이름의 프로젝트 모듈
+        (tmp_path / project / "crawler.py").write_text(CRAWLER_SOURCE)
+    created = []
+    pool = WebDriverPool(size=1, driver_factory=lambda: created.append(FakeChrome()) or created[-1])
+    jobs = [(project, project, 'crawler', 'Crawler', {}, {}) for project in ('first', 'second')]
+
+    runner = CrawlRunner(jobs, pool=pool, root_dir=str(tmp_path))
+    runner.warm_up()
+    assert runner.run_once() == {'first': True, 'second': True}
+    assert runner.run_once() == {'first': True, 'second': True}
+    # 프로젝트별 storage 모듈이 섞이지 않고, 두 번의 실행 동안 드라이버는 처음 준비한 하나만 사용
+    assert [job[2].run.__globals__['NAME'] for job in runner.jobs] == ['first', 'second']
+    assert len(created) == 1
+    runner.close()
+    assert created[0].quit_called
+
+
+def test_runner_loads_both_crawlers():
+    from crawler_common.runner import CrawlRunner
+
+    runner = CrawlRunner(pool=RecordingPool())
+    gold, stocks = (job[2] for job in runner.jobs)
+    assert gold.__name__ == 'GoldPriceCrawler' and stocks.__name__ == 'YahooStocksCrawler'
+    # 각 크롤러는 자기 프로젝트의 storage 모듈을 사용
+    gold_store = gold.__init__.__globals__['open_store']
+    stocks_store = stocks.__init__.__globals__['open_store']
+    assert gold_store.__module__ == stocks_store.__module__ == 'storage'
+    assert gold_store is not stocks_store
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""HTTP 수집 모드 오프라인 테스트 (로컬 서버가 fixture 응답을 내려줌)"""
+
+import pytest
+
+from conftest import load_fixture
+from gold_crawler import GoldPriceCrawler
+
+
+def make_crawler(gold_api, tmp_path, **kwargs):
+    crawler = GoldPriceCrawler(fetch_mode="http", store_path=str(tmp_path / "store"), export_excel=False,
+                               state_file=str(tmp_path / "state.json"), **kwargs)
+    crawler.api_url = gold_api.url
+    return crawler
+
+
+def test_parse_json_rows_fixture():
+    crawler = GoldPriceCrawler(fetch_mode="http")
+    records = crawler.parse_json_rows(load_fixture("gold_price_list_page1.json")["data"])
+
+    assert len(records) == 10
+    assert records[0] == {
+        '고시날짜': '2025.01.24',
+        '내가살때_순금(3.75g)': 561000,
+        '내가팔때_순금(3.75g)': 501000,
+        '내가팔때_18K(3.75g)': 374600,
+        '내가팔때_14K(3.75g)': 292200,
+    }
+    assert records[3]['내가팔때_14K(3.75g)'] == 0  # 고시되지 않은 값("-")
+
+
+def test_parse_page_rejects_unknown_fields():
+    crawler = GoldPriceCrawler(fetch_mode="http")
+    payload = {'last_page': 1, 'data': [{'goldDate': '2025-01-24', 'buy': '561,000'}]}
+
+    with pytest.raises(ValueError):
+        crawler.parse_page(payload)
+    assert crawler.parse_page({'last_page': 1, 'data': []}) == []
+
+
+def test_crawl_http_fixture(gold_api, tmp_path):
+    crawler = make_crawler(gold_api, tmp_path)
+
+    assert crawler.crawl_http(target_count=15)
+    dates = [record['고시날짜'] for record in crawler.data]
+    assert len(dates) == 15
+    assert dates == sorted(dates, reverse=True)
+    assert dates[0] == '2025.01.24' and dates[-1] == '2025.01.10'
+    assert sorted(gold_api.requests) == [1, 2]
+
+
+def test_failed_page_is_retried(gold_api, tmp_path):
+    crawler = make_crawler(gold_api, tmp_path)
+    crawler.retry_backoff = 0.01
+    gold_api.failures = {2: 2}
+
+    assert crawler.crawl_http(target_count=20)
+    assert len(crawler.data) == 20
+    assert gold_api.requests.count(2) == 3
+
+
+def test_missing_page_fails_crawl(gold_api, tmp_path):
+    crawler = make_crawler(gold_api, tmp_path)
+    crawler.retry_backoff = 0.01
+    gold_api.failures = {2: crawler.page_retries + 1}
+
+    crawler.setup_session()
+    with pytest.raises(RuntimeError):
+        crawler.fetch_pages_concurrently(2, 2)
+
+    gold_api.failures = {2: crawler.page_retries + 1}
+    assert not crawler.crawl_http(target_count=20)
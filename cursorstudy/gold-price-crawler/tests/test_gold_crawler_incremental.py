@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""증분 수집 테스트 (목표 개수보다 새 행이 많은 경우, 저장 실패 시 기준일 유지)"""
+
+import json
+
+from gold_crawler import GoldPriceCrawler
+
+
+def make_crawler(gold_api, tmp_path, since_date):
+    state_file = tmp_path / "state.json"
+    state_file.write_text(json.dumps({'last_date': since_date}), encoding="utf-8")
+    crawler = GoldPriceCrawler(fetch_mode="http", incremental=True, store_path=str(tmp_path / "store"),
+                               export_excel=False, state_file=str(state_file))
+    crawler.api_url = gold_api.url
+    return crawler
+
+
+def read_state(tmp_path):
+    return json.loads((tmp_path / "state.json").read_text(encoding="utf-8"))['last_date']
+
+
+def test_keeps_every_new_row_beyond_target_count(gold_api, tmp_path):
+    crawler = make_crawler(gold_api, tmp_path, since_date='2025.01.12')
+
+    assert crawler.run(target_count=5)
+
+    dates = sorted(crawler.store.load()['고시날짜'].dt.strftime('%Y.%m.%d'))
+    assert len(dates) == 12  # 2025.01.13 ~ 2025.01.24
+    assert dates[0] == '2025.01.13' and dates[-1] == '2025.01.24'
+    assert read_state(tmp_path) == '2025.01.24'
+    assert gold_api.requests == [1, 2]
+
+
+def test_state_not_saved_when_store_append_fails(gold_api, tmp_path, monkeypatch):
+    crawler = make_crawler(gold_api, tmp_path, since_date='2025.01.12')
+
+    def fail(df):
+        raise OSError("disk full")
+    monkeypatch.setattr(crawler.store, "append", fail)
+
+    assert not crawler.run(target_count=5)
+    assert read_state(tmp_path) == '2025.01.12'
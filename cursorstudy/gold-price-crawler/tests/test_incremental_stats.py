@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""누적 통계 상태 테스트 (증분 결과가 전체 재계산 결과와 같은지 비교)"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import incremental_stats
+from incremental_stats import IncrementalStats
+from statistics_analyzer import GoldPriceAnalyzer
+from storage import open_store, DATE_COLUMN, PRICE_COLUMNS, ParquetPriceStore, SQLitePriceStore
+
+WINDOWS = {'최근500일': '500D', '최근30일': '30D', '최근400개': 400}
+
+
+def price_rows(start, days, seed):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({DATE_COLUMN: pd.date_range(start, periods=days).strftime('%Y.%m.%d')})
+    for i, col in enumerate(PRICE_COLUMNS):
+        df[col] = (400000 + np.cumsum(rng.normal(0, 2000, days)) * (1 - i * 0.1)).round().astype('int64')
+    return df
+
+
+STORE_PATHS = {'parquet': "store", 'sqlite': "gold.db"}
+
+
+def make_store(tmp_path, backend='parquet'):
+    return open_store(backend, str(tmp_path / STORE_PATHS[backend]))
+
+
+def statistics(tmp_path, incremental, backend='parquet'):
+    analyzer = GoldPriceAnalyzer(storage_backend=backend, store_path=str(tmp_path / STORE_PATHS[backend]),
+                                 period_windows=WINDOWS, incremental=incremental,
+                                 stats_file=str(tmp_path / "stats.json"))
+    if incremental:
+        assert analyzer.update_incremental_stats()
+        assert analyzer.build_statistics_from_state()
+    else:
+        assert analyzer.load_data()
+        analyzer.calculate_basic_statistics()
+        analyzer.calculate_price_changes()
+        analyzer.calculate_period_analysis()
+        analyzer.calculate_correlation_analysis()
+    return analyzer.stats_data
+
+
+def assert_same_statistics(tmp_path, backend='parquet'):
+    incremental = statistics(tmp_path, incremental=True, backend=backend)
+    full = statistics(tmp_path, incremental=False, backend=backend)
+    assert incremental.keys() == full.keys()
+    for sheet in full:
+        for name, expected in full[sheet].items():
+            actual = incremental[sheet][name]
+            if isinstance(expected, dict):
+                assert actual.keys() == expected.keys(), (sheet, name)
+                for key, value in expected.items():
+                    if isinstance(value, str):
+                        assert actual[key] == value, (sheet, name, key)
+                    else:
+                        assert actual[key] == pytest.approx(value, abs=0.011, nan_ok=True), (sheet, name, key)
+            else:
+                assert actual == pytest.approx(expected, abs=1e-4), (sheet, name)
+
+
+def test_windows_longer_than_a_year_are_kept(tmp_path):
+    store = open_store('parquet', str(tmp_path / "store"))
+    store.append(price_rows('2022-01-01', 700, seed=0))
+    assert_same_statistics(tmp_path)
+
+    store.append(price_rows('2023-12-01', 20, seed=1))  # 새 행
+    assert_same_statistics(tmp_path)
+
+
+@pytest.mark.parametrize('backend', ['parquet', 'sqlite'])
+def test_revisions_and_backfills_are_recomputed(tmp_path, backend):
+    store = make_store(tmp_path, backend)
+    rows = price_rows('2022-01-01', 900, seed=0)
+    store.append(rows.drop(index=[850, 100]))
+    assert_same_statistics(tmp_path, backend)
+
+    # 보관 구간 안의 정정과 누락된 날짜 백필
+    revised = rows.iloc[[820]].copy()
+    revised[PRICE_COLUMNS] += 5000
+    store.append(pd.concat([revised, rows.iloc[[850]]]))
+    assert_same_statistics(tmp_path, backend)
+
+    # 보관 구간 이전 날짜 백필 -> 처음부터 다시 계산
+    store.append(rows.iloc[[100]])
+    assert_same_statistics(tmp_path, backend)
+
+    # 보관 구간 이전 날짜의 값만 정정 -> 파티션 체크섬이 달라져 처음부터 다시 계산
+    revised = rows.iloc[[200]].copy()
+    revised[PRICE_COLUMNS] -= 3000
+    store.append(revised)
+    assert_same_statistics(tmp_path, backend)
+
+
+@pytest.mark.parametrize('backend', ['parquet', 'sqlite'])
+def test_only_changed_partitions_are_read(tmp_path, monkeypatch, backend):
+    store = make_store(tmp_path, backend)
+    rows = price_rows('2022-01-01', 900, seed=0)
+    store.append(rows.iloc[:895])
+    statistics(tmp_path, incremental=True, backend=backend)  # 처음에는 전체 파티션을 읽음
+
+    store_class = type(store)
+    read = []
+    original = store_class.load_partitions
+    monkeypatch.setattr(store_class, 'load_partitions', lambda self, keys: read.append(keys) or original(self, keys))
+    original_load = store_class.load
+
+    def load(self, start=None, end=None, columns=None):
+        if start is None:
+            pytest.fail("전체 데이터를 다시 읽음")
+        return original_load(self, start, end, columns)
+    monkeypatch.setattr(store_class, 'load', load)
+
+    # 바뀐 파티션이 없으면 아무것도 읽지 않음
+    statistics(tmp_path, incremental=True, backend=backend)
+    assert read == []
+
+    # 새 행은 해당 월 파티션만 읽음
+    store.append(rows.iloc[895:])
+    statistics(tmp_path, incremental=True, backend=backend)
+    assert read == [['2024-06']]
+
+    # 병합된 날짜의 파티션을 같은 값으로 다시 써도 체크섬이 같으므로 처음부터 계산하지 않음
+    store.append(rows.iloc[[10]])
+    statistics(tmp_path, incremental=True, backend=backend)
+    assert read[-1] == ['2022-01']
+
+
+def test_histograms_are_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(incremental_stats, 'MAX_HISTOGRAM_BINS', 64)
+    rng = np.random.default_rng(5)
+    df = pd.DataFrame({DATE_COLUMN: pd.date_range('2000-01-01', periods=5000)})
+    for col in PRICE_COLUMNS:
+        df[col] = rng.integers(100000, 600000, len(df)).astype('float64')
+
+    state = IncrementalStats(str(tmp_path / "stats.json"), tail_days=30)
+    for start in range(0, len(df), 500):
+        state.update(df.iloc[start:start + 500], months=None if start == 0 else sorted(
+            set(df[DATE_COLUMN].iloc[start:start + 500].dt.strftime('%Y-%m'))))
+
+    totals = state.totals()
+    for i, col in enumerate(PRICE_COLUMNS):
+        assert len(totals.histograms[i]) <= 64
+        assert totals.median(i) == pytest.approx(df[col].median(), abs=totals.bin_widths[i])
+    assert state.save()
+    assert IncrementalStats.load(str(tmp_path / "stats.json"), tail_days=30).count == state.count
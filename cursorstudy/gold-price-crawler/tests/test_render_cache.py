@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""차트 렌더링 캐시 테스트"""
+
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from crawler_common.render_cache import RenderCache
+from crawler_common.render_profiles import PROFILES
+from storage import DATE_COLUMN, PRICE_COLUMNS
+from visualization_generator import GoldPriceVisualizer
+
+
+def price_frame(rows=60):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({DATE_COLUMN: pd.date_range('2024-01-01', periods=rows)})
+    for i, col in enumerate(PRICE_COLUMNS):
+        df[col] = (400000 + np.cumsum(rng.normal(0, 2000, rows)) * (1 - i * 0.1)).round().astype('int64')
+    return df
+
+
+def make_visualizer(tmp_path, df):
+    visualizer = GoldPriceVisualizer(store_path=str(tmp_path / "store"), df=df)
+    visualizer.output_dir = str(tmp_path / "visualizations")
+    visualizer.create_output_directory()
+    return visualizer
+
+
+def test_stale_file_is_not_recorded(tmp_path):
+    cache = RenderCache(str(tmp_path))
+    (tmp_path / "chart.png").write_bytes(b"old")
+    started = time.time() + 10  # 렌더링이 실패해 시작 이후로 파일이 다시 쓰이지 않은 경우
+
+    assert not cache.record("key", "plot_chart", ["chart.png"], rendered_after=started)
+    assert not cache.hit("key")
+
+    os.utime(tmp_path / "chart.png", (started, started))
+    assert cache.record("key", "plot_chart", ["chart.png"], rendered_after=started)
+    assert cache.hit("key")
+
+
+def test_profile_settings_are_part_of_the_key(tmp_path, monkeypatch):
+    visualizer = make_visualizer(tmp_path, price_frame())
+    cache = RenderCache(visualizer.output_dir)
+    before = visualizer.stale_charts(cache)
+
+    monkeypatch.setitem(PROFILES['report'], 'dpi', 150)
+    after = visualizer.stale_charts(cache)
+
+    assert set(before) == set(after)
+    assert all(before[name] != after[name] for name in before)
+
+
+def test_second_render_hits_cache_for_every_chart(tmp_path):
+    visualizer = make_visualizer(tmp_path, price_frame())
+    visualizer.render_charts(parallel=False)
+
+    rendered = sorted(os.listdir(visualizer.output_dir))
+    for stem, _ in GoldPriceVisualizer.CHARTS.values():
+        assert f"{stem}.png" in rendered
+
+    again = make_visualizer(tmp_path, price_frame())
+    assert again.stale_charts(RenderCache(again.output_dir)) == {}
+    assert again.render_charts(parallel=False) == {}
@@ -10,9 +10,21 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
 from datetime import datetime, timedelta
+import time
 import warnings
+import logging
+from concurrent.futures.process import BrokenProcessPool
+from storage import open_store, DATE_COLUMN, PRICE_COLUMNS
+from downsampling import downsample
+import common_path  # crawler_common 패키지 경로 추가
+from crawler_common.render_scheduler import RenderScheduler
+from crawler_common.render_cache import RenderCache, method_fingerprint
+from crawler_common.render_profiles import PROFILES, resolve_profile, profile_files, profile_settings, save_figure
 warnings.filterwarnings('ignore')
 
+# 로깅 설정 (렌더링 소요 시간 기록)
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
 # 한글 폰트 설정
 plt.rcParams['font.family'] = 'DejaVu Sans'
 plt.rcParams['axes.unicode_minus'] = False
@@ -22,16 +34,48 @@ plt.style.use('seaborn-v0_8')
 sns.set_palette("husl")
 
 class GoldPriceVisualizer:
-    def __init__(self, excel_file="gold_prices_with_statistics.xlsx"):
+    # generate_all_visualizations에서 렌더링하는 차트 메서드 -> (출력 파일 이름(확장자 제외), 입력 컬럼)
+    CHARTS = {
+        'plot_price_trends': ('01_price_trends', [DATE_COLUMN] + PRICE_COLUMNS),
+        'plot_price_distribution': ('02_price_distribution', PRICE_COLUMNS),
+        'plot_correlation_heatmap': ('03_correlation_heatmap', PRICE_COLUMNS),
+        'plot_price_changes': ('04_price_changes', PRICE_COLUMNS),
+        'plot_period_comparison': ('05_period_comparison', [DATE_COLUMN] + PRICE_COLUMNS),
+        'plot_box_plots': ('06_box_plots', PRICE_COLUMNS),
+        'plot_dashboard': ('07_dashboard', [DATE_COLUMN] + PRICE_COLUMNS),
+    }
+    CHART_METHODS = list(CHARTS)
+    # backend="plotly"일 때 HTML 페이지로 대신 생성하는 차트
+    INTERACTIVE_CHARTS = ['plot_price_trends', 'plot_dashboard']
+    INTERACTIVE_FILE = '00_interactive_charts.html'
+    # 시계열 차트별 다운샘플링 (방식, 시리즈당 최대 점 수), None이면 모든 행 사용
+    DOWNSAMPLING = {
+        'plot_price_trends': ('minmax', 2000),
+        'plot_dashboard': ('minmax', 1000),
+    }
+
+    def __init__(self, excel_file="gold_prices_with_statistics.xlsx", storage_backend="parquet", store_path=None, df=None,
+                 backend="matplotlib", max_points=2000, downsampling=None, profile=None, consumer=None):
         self.excel_file = excel_file
-        self.df = None
+        self.profile = resolve_profile(profile, consumer)  # 출력 형식·해상도 (preview/report/vector)
+        self.downsampling = {**self.DOWNSAMPLING, **(downsampling or {})}
+        self.backend = backend  # "matplotlib" 또는 "plotly" (추이·대시보드를 인터랙티브 HTML로)
+        self.max_points = max_points  # HTML 차트에 보내는 시계열당 최대 점 수
+        self.storage_backend = storage_backend
+        self.store_path = store_path
+        self.store = open_store(storage_backend, store_path)
+        self.df = df  # 이미 로드된 데이터 (렌더링 워커 등)
         self.output_dir = "visualizations"
+        self.render_timings = {}
         
     def load_data(self):
-        """데이터 로드"""
+        """데이터 로드 (저장소 우선, 없으면 엑셀 원본데이터 시트)"""
         try:
-            self.df = pd.read_excel(self.excel_file, sheet_name='원본데이터')
-            self.df['고시날짜'] = pd.to_datetime(self.df['고시날짜'])
+            if self.store.exists():
+                self.df = self.store.load()
+            else:
+                self.df = pd.read_excel(self.excel_file, sheet_name='원본데이터')
+                self.df['고시날짜'] = pd.to_datetime(self.df['고시날짜'])
             self.df = self.df.sort_values('고시날짜')
             print(f"데이터 로드 완료: {len(self.df)}개 행")
             return True
@@ -39,6 +83,18 @@ class GoldPriceVisualizer:
             print(f"데이터 로드 실패: {e}")
             return False
     
+    def series(self, chart, col):
+        """차트별 다운샘플링 설정을 적용한 (날짜, 가격) 배열"""
+        setting = self.downsampling.get(chart)
+        if not setting:
+            return self.df['고시날짜'].to_numpy(), self.df[col].to_numpy()
+        method, max_points = setting
+        return downsample(self.df['고시날짜'], self.df[col], max_points, method)
+    
+    def save_chart(self, stem):
+        """현재 그림을 출력 프로파일로 저장하고 파일 이름 목록 반환"""
+        return save_figure(self.output_dir, stem, self.profile)
+    
     def create_output_directory(self):
         """출력 디렉토리 생성"""
         import os
@@ -63,7 +119,7 @@ class GoldPriceVisualizer:
                 row, col_idx = i // 2, i % 2
                 ax = axes[row, col_idx]
                 
-                ax.plot(self.df['고시날짜'], self.df[col], linewidth=2, marker='o', markersize=3)
+                ax.plot(*self.series('plot_price_trends', col), linewidth=2, marker='o', markersize=3)
                 ax.set_title(title, fontsize=12, fontweight='bold')
                 ax.set_xlabel('Date')
                 ax.set_ylabel('Price (KRW)')
@@ -76,9 +132,9 @@ class GoldPriceVisualizer:
                 ax.tick_params(axis='x', rotation=45)
             
             plt.tight_layout()
-            plt.savefig(f'{self.output_dir}/01_price_trends.png', dpi=300, bbox_inches='tight')
+            saved = self.save_chart('01_price_trends')
             plt.close()
-            print("✅ 가격 추이 차트 생성 완료: 01_price_trends.png")
+            print(f"✅ 가격 추이 차트 생성 완료: {', '.join(saved)}")
             
         except Exception as e:
             print(f"❌ 가격 추이 차트 생성 실패: {e}")
@@ -117,9 +173,9 @@ class GoldPriceVisualizer:
                 ax.legend()
             
             plt.tight_layout()
-            plt.savefig(f'{self.output_dir}/02_price_distribution.png', dpi=300, bbox_inches='tight')
+            saved = self.save_chart('02_price_distribution')
             plt.close()
-            print("✅ 가격 분포 히스토그램 생성 완료: 02_price_distribution.png")
+            print(f"✅ 가격 분포 히스토그램 생성 완료: {', '.join(saved)}")
             
         except Exception as e:
             print(f"❌ 가격 분포 히스토그램 생성 실패: {e}")
@@ -145,9 +201,9 @@ class GoldPriceVisualizer:
             ax.set_yticklabels(labels, rotation=0)
             
             plt.tight_layout()
-            plt.savefig(f'{self.output_dir}/03_correlation_heatmap.png', dpi=300, bbox_inches='tight')
+            saved = self.save_chart('03_correlation_heatmap')
             plt.close()
-            print("✅ 상관관계 히트맵 생성 완료: 03_correlation_heatmap.png")
+            print(f"✅ 상관관계 히트맵 생성 완료: {', '.join(saved)}")
             
         except Exception as e:
             print(f"❌ 상관관계 히트맵 생성 실패: {e}")
@@ -191,9 +247,9 @@ class GoldPriceVisualizer:
                 ax.legend()
             
             plt.tight_layout()
-            plt.savefig(f'{self.output_dir}/04_price_changes.png', dpi=300, bbox_inches='tight')
+            saved = self.save_chart('04_price_changes')
             plt.close()
-            print("✅ 가격 변동률 분석 차트 생성 완료: 04_price_changes.png")
+            print(f"✅ 가격 변동률 분석 차트 생성 완료: {', '.join(saved)}")
             
         except Exception as e:
             print(f"❌ 가격 변동률 분석 차트 생성 실패: {e}")
@@ -241,9 +297,9 @@ class GoldPriceVisualizer:
             ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'{x:,.0f}'))
             
             plt.tight_layout()
-            plt.savefig(f'{self.output_dir}/05_period_comparison.png', dpi=300, bbox_inches='tight')
+            saved = self.save_chart('05_period_comparison')
             plt.close()
-            print("✅ 기간별 평균 가격 비교 차트 생성 완료: 05_period_comparison.png")
+            print(f"✅ 기간별 평균 가격 비교 차트 생성 완료: {', '.join(saved)}")
             
         except Exception as e:
             print(f"❌ 기간별 평균 가격 비교 차트 생성 실패: {e}")
@@ -269,7 +325,7 @@ class GoldPriceVisualizer:
                 labels.append(label)
             
             # 박스플롯 생성
-            box_plot = ax.boxplot(price_data, labels=labels, patch_artist=True)
+            box_plot = ax.boxplot(price_data, tick_labels=labels, patch_artist=True)
             
             # 색상 설정
             colors = ['lightblue', 'lightgreen', 'lightcoral', 'lightyellow']
@@ -285,9 +341,9 @@ class GoldPriceVisualizer:
             
             plt.xticks(rotation=45)
             plt.tight_layout()
-            plt.savefig(f'{self.output_dir}/06_box_plots.png', dpi=300, bbox_inches='tight')
+            saved = self.save_chart('06_box_plots')
             plt.close()
-            print("✅ 박스플롯 생성 완료: 06_box_plots.png")
+            print(f"✅ 박스플롯 생성 완료: {', '.join(saved)}")
             
         except Exception as e:
             print(f"❌ 박스플롯 생성 실패: {e}")
@@ -300,8 +356,8 @@ class GoldPriceVisualizer:
             
             # 1. 가격 추이 (상단 좌측)
             ax1 = plt.subplot(3, 3, 1)
-            ax1.plot(self.df['고시날짜'], self.df['내가살때_순금(3.75g)'], label='순금 구매가', linewidth=2)
-            ax1.plot(self.df['고시날짜'], self.df['내가팔때_순금(3.75g)'], label='순금 판매가', linewidth=2)
+            ax1.plot(*self.series('plot_dashboard', '내가살때_순금(3.75g)'), label='순금 구매가', linewidth=2)
+            ax1.plot(*self.series('plot_dashboard', '내가팔때_순금(3.75g)'), label='순금 판매가', linewidth=2)
             ax1.set_title('순금 가격 추이')
             ax1.legend()
             ax1.grid(True, alpha=0.3)
@@ -309,8 +365,8 @@ class GoldPriceVisualizer:
             
             # 2. 18K/14K 가격 추이 (상단 중앙)
             ax2 = plt.subplot(3, 3, 2)
-            ax2.plot(self.df['고시날짜'], self.df['내가팔때_18K(3.75g)'], label='18K 판매가', linewidth=2)
-            ax2.plot(self.df['고시날짜'], self.df['내가팔때_14K(3.75g)'], label='14K 판매가', linewidth=2)
+            ax2.plot(*self.series('plot_dashboard', '내가팔때_18K(3.75g)'), label='18K 판매가', linewidth=2)
+            ax2.plot(*self.series('plot_dashboard', '내가팔때_14K(3.75g)'), label='14K 판매가', linewidth=2)
             ax2.set_title('18K/14K 가격 추이')
             ax2.legend()
             ax2.grid(True, alpha=0.3)
@@ -386,15 +442,88 @@ class GoldPriceVisualizer:
                     verticalalignment='top', bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.8))
             
             plt.tight_layout()
-            plt.savefig(f'{self.output_dir}/07_dashboard.png', dpi=300, bbox_inches='tight')
+            saved = self.save_chart('07_dashboard')
             plt.close()
-            print("✅ 통합 대시보드 생성 완료: 07_dashboard.png")
+            print(f"✅ 통합 대시보드 생성 완료: {', '.join(saved)}")
             
         except Exception as e:
             print(f"❌ 통합 대시보드 생성 실패: {e}")
     
-    def generate_all_visualizations(self):
-        """모든 시각화 생성"""
+    def chart_methods(self):
+        """현재 백엔드에서 PNG로 렌더링할 차트 메서드"""
+        if self.backend == "plotly":
+            return [name for name in self.CHART_METHODS if name not in self.INTERACTIVE_CHARTS]
+        return list(self.CHART_METHODS)
+    
+    def export_interactive_html(self):
+        """가격 추이·통합 대시보드를 다운샘플링된 인터랙티브 HTML 한 페이지로 저장"""
+        try:
+            from interactive_charts import price_trend_figure, dashboard_figure, write_html_page
+            
+            path = write_html_page([
+                price_trend_figure(self.df, self.max_points),
+                dashboard_figure(self.df, self.max_points),
+            ], f'{self.output_dir}/{self.INTERACTIVE_FILE}')
+            print(f"✅ 인터랙티브 차트 생성 완료: {self.INTERACTIVE_FILE}")
+            return path
+            
+        except Exception as e:
+            print(f"❌ 인터랙티브 차트 생성 실패: {e}")
+            return None
+    
+    def stale_charts(self, cache):
+        """입력 데이터·설정이 바뀐 차트만 골라 {메서드명: 캐시 키} 반환"""
+        stale = {}
+        for name in self.chart_methods():
+            stem, columns = self.CHARTS[name]
+            files = profile_files(stem, self.profile)
+            key = cache.key(name, self.df[columns], {
+                'files': files,
+                'profile': profile_settings(self.profile),
+                'code': method_fingerprint(getattr(type(self), name)),
+                'downsampling': self.downsampling.get(name),
+            })
+            if cache.hit(key):
+                print(f"♻️ 변경 없음, 기존 이미지 사용: {', '.join(files)}")
+            else:
+                stale[name] = key
+        return stale
+    
+    def render_charts(self, parallel=True, max_workers=None, use_cache=True):
+        """차트 메서드를 프로세스 풀(parallel=True) 또는 현재 프로세스에서 렌더링 (캐시된 차트는 건너뜀)"""
+        cache = RenderCache(self.output_dir) if use_cache else None
+        pending = self.stale_charts(cache) if cache else dict.fromkeys(self.chart_methods())
+        if not pending:
+            self.render_timings = {}
+            cache.save()
+            return self.render_timings
+        
+        scheduler = RenderScheduler(
+            type(self),
+            init_kwargs={'excel_file': self.excel_file, 'storage_backend': self.storage_backend,
+                         'store_path': self.store_path},
+            attributes={'output_dir': self.output_dir, 'downsampling': self.downsampling, 'profile': self.profile},
+            max_workers=max_workers,
+        )
+        started = time.time()
+        if parallel:
+            try:
+                self.render_timings = scheduler.run(self.df, list(pending))
+            except (BrokenProcessPool, OSError) as e:
+                print(f"⚠️ 병렬 렌더링 실패, 순차 렌더링으로 전환: {e}")
+                self.render_timings = scheduler.run_serial(self, list(pending))
+        else:
+            self.render_timings = scheduler.run_serial(self, list(pending))
+        scheduler.report()
+        
+        if cache:
+            for name, key in pending.items():
+                cache.record(key, name, profile_files(self.CHARTS[name][0], self.profile), rendered_after=started)
+            cache.save()
+        return self.render_timings
+    
+    def generate_all_visualizations(self, parallel=True, max_workers=None, use_cache=True):
+        """모든 시각화 생성 (기본은 차트별 병렬 렌더링, 입력이 그대로인 차트는 재사용)"""
         try:
             print("🎨 금 시세 데이터 시각화를 시작합니다...")
             
@@ -402,24 +531,23 @@ class GoldPriceVisualizer:
             self.create_output_directory()
             
             # 각종 차트 생성
-            self.plot_price_trends()
-            self.plot_price_distribution()
-            self.plot_correlation_heatmap()
-            self.plot_price_changes()
-            self.plot_period_comparison()
-            self.plot_box_plots()
-            self.plot_dashboard()
+            self.render_charts(parallel=parallel, max_workers=max_workers, use_cache=use_cache)
+            if self.backend == "plotly":
+                self.export_interactive_html()
             
             print(f"\n🎉 모든 시각화가 완료되었습니다!")
             print(f"📁 생성된 이미지 파일 위치: {self.output_dir}/")
             print("\n생성된 파일 목록:")
-            print("• 01_price_trends.png - 금 가격 추이 시계열 차트")
-            print("• 02_price_distribution.png - 금 가격 분포 히스토그램")
-            print("• 03_correlation_heatmap.png - 상관관계 히트맵")
-            print("• 04_price_changes.png - 가격 변동률 분석")
-            print("• 05_period_comparison.png - 기간별 평균 가격 비교")
-            print("• 06_box_plots.png - 금 종류별 가격 박스플롯")
-            print("• 07_dashboard.png - 통합 대시보드")
+            ext = '/'.join(PROFILES[self.profile]['formats'])
+            if self.backend == "plotly":
+                print(f"• {self.INTERACTIVE_FILE} - 가격 추이·통합 대시보드 (인터랙티브 HTML)")
+            print(f"• 01_price_trends.{ext} - 금 가격 추이 시계열 차트")
+            print(f"• 02_price_distribution.{ext} - 금 가격 분포 히스토그램")
+            print(f"• 03_correlation_heatmap.{ext} - 상관관계 히트맵")
+            print(f"• 04_price_changes.{ext} - 가격 변동률 분석")
+            print(f"• 05_period_comparison.{ext} - 기간별 평균 가격 비교")
+            print(f"• 06_box_plots.{ext} - 금 종류별 가격 박스플롯")
+            print(f"• 07_dashboard.{ext} - 통합 대시보드")
             
             return True
             
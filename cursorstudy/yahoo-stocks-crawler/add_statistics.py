@@ -8,6 +8,10 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 import logging
+from storage import open_store, SNAPSHOT_COLUMN, SCREENER_COLUMN
+import common_path  # crawler_common 패키지 경로 추가
+from crawler_common.excel_export import export_sheets
+from schema import conform, validate
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -16,16 +20,16 @@ logger = logging.getLogger(__name__)
 def analyze_stock_data(df):
     """주식 데이터 분석 및 통계 계산"""
     try:
-        # 변동률을 숫자로 변환
-        df['Change_Percent_Numeric'] = df['Change_Percent'].str.replace('%', '').str.replace('+', '').astype(float)
+        # 수집 시 스키마 타입(float64)으로 저장된 컬럼을 다시 변환하지 않고 그대로 사용
+        validate(df)
         
         # 기본 통계 계산
         stats = {
             '총_주식_수': len(df),
-            '평균_변동률': round(df['Change_Percent_Numeric'].mean(), 2),
-            '최대_변동률': round(df['Change_Percent_Numeric'].max(), 2),
-            '최소_변동률': round(df['Change_Percent_Numeric'].min(), 2),
-            '변동률_표준편차': round(df['Change_Percent_Numeric'].std(), 2),
+            '평균_변동률': round(df['Change_Percent'].mean(), 2),
+            '최대_변동률': round(df['Change_Percent'].max(), 2),
+            '최소_변동률': round(df['Change_Percent'].min(), 2),
+            '변동률_표준편차': round(df['Change_Percent'].std(), 2),
             '평균_가격변동': round(df['Price_Change'].mean(), 2),
             '최대_가격변동': round(df['Price_Change'].max(), 2),
             '최소_가격변동': round(df['Price_Change'].min(), 2),
@@ -35,16 +39,16 @@ def analyze_stock_data(df):
         }
         
         # 변동률 구간별 분석
-        high_gainers = df[df['Change_Percent_Numeric'] >= 20]
-        medium_gainers = df[(df['Change_Percent_Numeric'] >= 10) & (df['Change_Percent_Numeric'] < 20)]
-        low_gainers = df[df['Change_Percent_Numeric'] < 10]
+        high_gainers = df[df['Change_Percent'] >= 20]
+        medium_gainers = df[(df['Change_Percent'] >= 10) & (df['Change_Percent'] < 20)]
+        low_gainers = df[df['Change_Percent'] < 10]
         
         stats['고변동률_주식수'] = len(high_gainers)
         stats['중변동률_주식수'] = len(medium_gainers)
         stats['저변동률_주식수'] = len(low_gainers)
         
         # 상위 5개 주식
-        top_5 = df.nlargest(5, 'Change_Percent_Numeric')[['Symbol', 'Name', 'Change_Percent', 'Price_Change']]
+        top_5 = df.nlargest(5, 'Change_Percent')[['Symbol', 'Name', 'Change_Percent', 'Price_Change']]
         
         return stats, top_5, high_gainers, medium_gainers, low_gainers
         
@@ -79,11 +83,22 @@ def create_summary_sheet(stats, top_5, high_gainers, medium_gainers, low_gainers
         logger.error(f"요약 시트 생성 실패: {e}")
         return None, None, None
 
-def update_excel_with_statistics(filename="yahoo_stocks_gainers.xlsx"):
+def load_stock_data(filename="yahoo_stocks_gainers.xlsx", storage_backend="parquet", store_path=None, screener="gainers"):
+    """최신 스냅샷에서 한 스크리너의 데이터 로드 (스냅샷 저장소 우선, 없으면 엑셀 파일)"""
+    store = open_store(storage_backend, store_path)
+    if store.exists():
+        df = store.load_latest().drop(columns=[SNAPSHOT_COLUMN])
+    else:
+        df = conform(pd.read_excel(filename))  # 이전 형식 엑셀은 숫자가 문자열로 저장됨
+    if SCREENER_COLUMN in df.columns:
+        df = df[df[SCREENER_COLUMN] == screener].drop(columns=[SCREENER_COLUMN]).reset_index(drop=True)
+    return df
+
+def update_excel_with_statistics(filename="yahoo_stocks_gainers.xlsx", storage_backend="parquet", store_path=None):
     """엑셀 파일에 통계 정보 추가"""
     try:
         # 기존 데이터 읽기
-        df = pd.read_excel(filename)
+        df = load_stock_data(filename, storage_backend, store_path)
         logger.info(f"기존 데이터 로드 완료: {len(df)}개 주식")
         
         # 데이터 분석
@@ -97,47 +112,17 @@ def update_excel_with_statistics(filename="yahoo_stocks_gainers.xlsx"):
             return False
         
         # 엑셀 파일 업데이트
-        with pd.ExcelWriter(filename, engine='openpyxl') as writer:
-            # 기존 주식 데이터
-            df.to_excel(writer, sheet_name='주식상승률', index=False)
-            
-            # 통계 요약
-            summary_df.to_excel(writer, sheet_name='통계요약', index=False)
-            
-            # 변동률 구간별 분석
-            category_summary.to_excel(writer, sheet_name='구간별분석', index=False)
-            
-            # 상위 5개 주식
-            top_5_df.to_excel(writer, sheet_name='상위5개주식', index=False)
-            
-            # 고변동률 주식
-            if len(high_gainers) > 0:
-                high_gainers.to_excel(writer, sheet_name='고변동률주식', index=False)
-            
-            # 중변동률 주식
-            if len(medium_gainers) > 0:
-                medium_gainers.to_excel(writer, sheet_name='중변동률주식', index=False)
-            
-            # 저변동률 주식
-            if len(low_gainers) > 0:
-                low_gainers.to_excel(writer, sheet_name='저변동률주식', index=False)
-            
-            # 워크시트 스타일링
-            for sheet_name in writer.sheets:
-                worksheet = writer.sheets[sheet_name]
-                
-                # 컬럼 너비 자동 조정
-                for column in worksheet.columns:
-                    max_length = 0
-                    column_letter = column[0].column_letter
-                    for cell in column:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(str(cell.value))
-                        except:
-                            pass
-                    adjusted_width = min(max_length + 2, 50)
-                    worksheet.column_dimensions[column_letter].width = adjusted_width
+        # 시트별로 행 단위 스트리밍 저장 (컬럼 너비는 데이터프레임에서 미리 계산)
+        sheets = [
+            ('주식상승률', df, False),                 # 기존 주식 데이터
+            ('통계요약', summary_df, False),           # 통계 요약
+            ('구간별분석', category_summary, False),   # 변동률 구간별 분석
+            ('상위5개주식', top_5_df, False),          # 상위 5개 주식
+        ]
+        for sheet_name, gainers in [('고변동률주식', high_gainers), ('중변동률주식', medium_gainers), ('저변동률주식', low_gainers)]:
+            if len(gainers) > 0:
+                sheets.append((sheet_name, gainers, False))
+        export_sheets(filename, sheets)
         
         logger.info("엑셀 파일 업데이트 완료")
         return True
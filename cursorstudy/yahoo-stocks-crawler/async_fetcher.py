@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Yahoo Finance 스크리너 비동기 수집기
+상승률·하락률·거래량 상위·인기 종목 스크리너와 각 페이지(start 오프셋)를
+하나의 aiohttp 커넥션 풀에서 호스트별 동시 요청 수를 제한하며 동시에 요청
+"""
+
+import asyncio
+import logging
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+SCREENERS = {
+    'gainers': "https://finance.yahoo.com/markets/stocks/gainers/",
+    'losers': "https://finance.yahoo.com/markets/stocks/losers/",
+    'most_active': "https://finance.yahoo.com/markets/stocks/most-active/",
+    'trending': "https://finance.yahoo.com/markets/stocks/trending/",
+}
+
+
+def supported_encodings():
+    """aiohttp가 풀 수 있는 압축 방식 (brotli는 requirements의 Brotli 또는 brotlicffi가 설치된 경우)"""
+    encodings = ['gzip', 'deflate']
+    try:
+        import brotli  # noqa: F401
+        encodings.append('br')
+    except ImportError:
+        try:
+            import brotlicffi  # noqa: F401
+            encodings.append('br')
+        except ImportError:
+            pass
+    return ', '.join(encodings)
+
+
+class AsyncScreenerFetcher:
+    """여러 스크리너 페이지를 동시에 가져오는 수집기"""
+
+    def __init__(self, headers=None, screeners=None, pages=1, page_size=25,
+                 limit=16, limit_per_host=4, timeout=30):
+        self.headers = dict(headers or {})
+        self.headers['Accept-Encoding'] = supported_encodings()
+        self.screeners = list(screeners or SCREENERS)
+        self.pages = pages  # 스크리너별로 가져올 페이지 수
+        self.page_size = page_size
+        self.limit = limit  # 전체 동시 연결 수
+        self.limit_per_host = limit_per_host  # 호스트별 동시 연결 수
+        self.timeout = timeout
+
+    def page_urls(self):
+        """(스크리너, 오프셋, URL) 목록"""
+        targets = []
+        for screener in self.screeners:
+            base_url = SCREENERS[screener]
+            for page in range(self.pages):
+                offset = page * self.page_size
+                targets.append((screener, offset, f"{base_url}?start={offset}&count={self.page_size}"))
+        return targets
+
+    async def _fetch(self, session, screener, offset, url):
+        try:
+            async with session.get(url) as response:
+                response.raise_for_status()
+                html = await response.text()
+            logger.info(f"페이지 로드 완료: {screener} (start={offset}, {len(html):,}자)")
+            return screener, offset, html
+        except Exception as e:
+            logger.error(f"페이지 로드 실패: {screener} (start={offset}): {e}")
+            return screener, offset, None
+
+    async def fetch_all(self):
+        """모든 스크리너 페이지를 하나의 커넥션 풀로 동시에 요청"""
+        connector = aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host, ttl_dns_cache=300)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(connector=connector, headers=self.headers, timeout=timeout) as session:
+            return await asyncio.gather(*(self._fetch(session, *target) for target in self.page_urls()))
+
+    def fetch(self):
+        """동기 코드에서 호출: [(스크리너, 오프셋, HTML 또는 None)] 반환"""
+        return asyncio.run(self.fetch_all())
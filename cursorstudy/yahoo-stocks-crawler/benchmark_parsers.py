@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+테이블 파서 벤치마크
+저장해 둔 스크리너 페이지(HTML)로 lxml 파서와 이전 BeautifulSoup 방식의
+추출 결과가 같은지 확인하고 페이지당 처리 시간을 비교
+
+사용법: python benchmark_parsers.py page1.html [page2.html ...] [--repeat 20]
+"""
+
+import argparse
+import time
+import logging
+from html_table_parser import TableRowParser, BACKENDS
+
+
+def time_backend(backend, pages, repeat):
+    """페이지마다 repeat번 파싱한 최소 시간(초)과 마지막 추출 결과"""
+    parser = TableRowParser(backend)
+    timings, results = [], []
+    for html_content in pages:
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            rows = parser.rows(html_content)
+            best = min(best, time.perf_counter() - start)
+        timings.append(best)
+        results.append(rows)
+    return timings, results
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="스크리너 페이지 테이블 파서 벤치마크")
+    arg_parser.add_argument('pages', nargs='+', help="저장한 스크리너 페이지 HTML 파일")
+    arg_parser.add_argument('--repeat', type=int, default=10, help="페이지별 반복 횟수")
+    args = arg_parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    pages = []
+    for path in args.pages:
+        with open(path, encoding='utf-8') as f:
+            pages.append(f.read())
+
+    report = {backend: time_backend(backend, pages, args.repeat) for backend in BACKENDS}
+    baseline = report['bs4'][1]
+
+    print(f"{'파일':<30} {'크기':>10} " + " ".join(f"{b:>10}" for b in BACKENDS) + f" {'속도 향상':>10}  결과 일치")
+    for i, path in enumerate(args.pages):
+        times = [report[b][0][i] for b in BACKENDS]
+        same = all(report[b][1][i] == baseline[i] for b in BACKENDS)
+        print(f"{path[-30:]:<30} {len(pages[i]):>10,} " + " ".join(f"{t * 1000:>8.1f}ms" for t in times)
+              + f" {times[1] / times[0]:>9.1f}x  {'✅' if same else '❌'}")
+
+
+if __name__ == "__main__":
+    main()
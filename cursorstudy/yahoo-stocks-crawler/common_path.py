@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+"""
+공용 모듈 경로 설정
+상위 디렉토리의 crawler_common 패키지를 import할 수 있도록 sys.path에 추가
+(from crawler_common... 보다 먼저 import)
+"""
+
+import os
+import sys
+
+COMMON_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if COMMON_ROOT not in sys.path:
+    sys.path.insert(0, COMMON_ROOT)
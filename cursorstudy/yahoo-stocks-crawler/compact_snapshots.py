@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+스냅샷 저장소 병합 작업
+지난 날짜 파티션의 작은 스냅샷 파일들을 종목 순으로 정렬한 일별 파일 하나로 병합하고
+종목별 인덱스를 갱신 (매일 한 번 실행)
+
+사용법: python compact_snapshots.py [--store yahoo_stocks_store] [--until 2025-01-31]
+"""
+
+import argparse
+from storage import SnapshotParquetStore, COMPACT_ROW_GROUP_SIZE
+
+
+def main():
+    """메인 함수"""
+    parser = argparse.ArgumentParser(description="스냅샷 저장소 일별 파티션 병합")
+    parser.add_argument('--store', default="yahoo_stocks_store", help="Parquet 스냅샷 저장소 디렉토리")
+    parser.add_argument('--until', default=None, help="이 날짜 이전 파티션만 병합 (기본: 오늘)")
+    parser.add_argument('--row-group-size', type=int, default=COMPACT_ROW_GROUP_SIZE, help="병합 파일의 행 그룹 크기")
+    args = parser.parse_args()
+
+    store = SnapshotParquetStore(args.store)
+    if not store.exists():
+        print(f"❌ 스냅샷 저장소가 없습니다: {args.store}")
+        return
+
+    compacted = store.compact(args.until, args.row_group_size)
+    if compacted:
+        print(f"✅ {len(compacted)}개 파티션 병합 완료: {compacted[0]} ~ {compacted[-1]}")
+    else:
+        print("✅ 병합할 파티션이 없습니다.")
+    print(f"📁 종목별 인덱스: {len(store.symbol_index()):,}개 항목")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,13 +5,20 @@ Yahoo Finance 주식 데이터 시각화 생성
 다양한 차트와 그래프를 생성하여 데이터를 시각적으로 분석
 """
 
-import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
 from datetime import datetime
 import logging
 import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+from add_statistics import load_stock_data
+from schema import validate
+import common_path  # crawler_common 패키지 경로 추가
+from crawler_common.render_scheduler import RenderScheduler
+from crawler_common.render_cache import RenderCache, method_fingerprint
+from crawler_common.render_profiles import PROFILES, resolve_profile, profile_files, profile_settings, save_figure
 
 # 한글 폰트 설정
 plt.rcParams['font.family'] = 'DejaVu Sans'
@@ -22,23 +29,51 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 logger = logging.getLogger(__name__)
 
 class StockDataVisualizer:
-    def __init__(self, excel_file="yahoo_stocks_gainers.xlsx"):
+    # generate_all_visualizations에서 렌더링하는 차트 메서드 -> (출력 파일 이름(확장자 제외), 입력 컬럼)
+    CHARTS = {
+        'create_price_change_distribution': ('price_change_distribution', ['Price_Change', 'Change_Percent']),
+        'create_top_performers_chart': ('top_performers_chart', ['Symbol', 'Change_Percent']),
+        'create_pe_ratio_analysis': ('pe_ratio_analysis', ['PE_Ratio', 'Change_Percent', 'Price_Change']),
+        'create_volume_analysis': ('volume_analysis', ['Volume', 'Change_Percent', 'Price_Change']),
+        'create_performance_categories': ('performance_categories', ['Change_Percent', 'Price_Change']),
+        'create_correlation_heatmap': ('correlation_heatmap', ['Price_Change', 'Change_Percent', 'PE_Ratio', 'Volume']),
+        'create_summary_dashboard': ('summary_dashboard', ['Symbol', 'Change_Percent', 'Price_Change', 'PE_Ratio']),
+    }
+    CHART_METHODS = list(CHARTS)
+
+    def __init__(self, excel_file="yahoo_stocks_gainers.xlsx", storage_backend="parquet", store_path=None, df=None,
+                 profile=None, consumer=None):
         self.excel_file = excel_file
+        self.profile = resolve_profile(profile, consumer)  # 출력 형식·해상도 (preview/report/vector)
+        self.storage_backend = storage_backend
+        self.store_path = store_path
         self.df = None
         self.output_dir = "visualizations"
-        self.load_data()
+        self.render_timings = {}
+        if df is None:
+            self.load_data()
+        else:
+            self.df = df
+            self.validate_schema()
         self.create_output_directory()
     
     def load_data(self):
         """데이터 로드"""
         try:
-            self.df = pd.read_excel(self.excel_file)
-            # 변동률을 숫자로 변환
-            self.df['Change_Percent_Numeric'] = self.df['Change_Percent'].str.replace('%', '').str.replace('+', '').astype(float)
+            self.df = load_stock_data(self.excel_file, self.storage_backend, self.store_path)
+            self.validate_schema()
             logger.info(f"데이터 로드 완료: {len(self.df)}개 주식")
         except Exception as e:
             logger.error(f"데이터 로드 실패: {e}")
     
+    def validate_schema(self):
+        """스키마 확인 (숫자 컬럼은 수집 시 float64로 저장되므로 다시 변환하지 않음)"""
+        validate(self.df)
+    
+    def save_chart(self, stem):
+        """현재 그림을 출력 프로파일로 저장하고 파일 이름 목록 반환"""
+        return save_figure(self.output_dir, stem, self.profile)
+    
     def create_output_directory(self):
         """출력 디렉토리 생성"""
         if not os.path.exists(self.output_dir):
@@ -60,26 +95,26 @@ class StockDataVisualizer:
         ax1.grid(True, alpha=0.3)
         
         # 변동률 히스토그램
-        ax2.hist(self.df['Change_Percent_Numeric'], bins=10, alpha=0.7, color='lightcoral', edgecolor='black')
+        ax2.hist(self.df['Change_Percent'], bins=10, alpha=0.7, color='lightcoral', edgecolor='black')
         ax2.set_title('Change Percentage Distribution', fontsize=14, fontweight='bold')
         ax2.set_xlabel('Change Percentage (%)', fontsize=12)
         ax2.set_ylabel('Frequency', fontsize=12)
         ax2.grid(True, alpha=0.3)
         
         plt.tight_layout()
-        plt.savefig(f'{self.output_dir}/price_change_distribution.png', dpi=300, bbox_inches='tight')
+        saved = self.save_chart('price_change_distribution')
         plt.close()
-        logger.info("가격 변동 분포 차트 생성 완료")
+        logger.info(f"가격 변동 분포 차트 생성 완료: {', '.join(saved)}")
     
     def create_top_performers_chart(self):
         """상위 성과 주식 바 차트"""
         plt.figure(figsize=(14, 8))
         
         # 상위 10개 주식 선택
-        top_10 = self.df.nlargest(10, 'Change_Percent_Numeric')
+        top_10 = self.df.nlargest(10, 'Change_Percent')
         
         # 바 차트 생성
-        bars = plt.bar(range(len(top_10)), top_10['Change_Percent_Numeric'], 
+        bars = plt.bar(range(len(top_10)), top_10['Change_Percent'], 
                       color=plt.cm.viridis(np.linspace(0, 1, len(top_10))))
         
         # 차트 스타일링
@@ -89,15 +124,15 @@ class StockDataVisualizer:
         plt.xticks(range(len(top_10)), top_10['Symbol'], rotation=45, ha='right')
         
         # 값 표시
-        for i, (bar, value) in enumerate(zip(bars, top_10['Change_Percent_Numeric'])):
+        for i, (bar, value) in enumerate(zip(bars, top_10['Change_Percent'])):
             plt.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.1, 
                     f'{value:.1f}%', ha='center', va='bottom', fontweight='bold')
         
         plt.grid(True, alpha=0.3, axis='y')
         plt.tight_layout()
-        plt.savefig(f'{self.output_dir}/top_performers_chart.png', dpi=300, bbox_inches='tight')
+        saved = self.save_chart('top_performers_chart')
         plt.close()
-        logger.info("상위 성과 주식 차트 생성 완료")
+        logger.info(f"상위 성과 주식 차트 생성 완료: {', '.join(saved)}")
     
     def create_pe_ratio_analysis(self):
         """PER 비율 분석 차트"""
@@ -114,7 +149,7 @@ class StockDataVisualizer:
         ax1.grid(True, alpha=0.3)
         
         # PER vs 변동률 산점도
-        scatter = ax2.scatter(self.df['PE_Ratio'], self.df['Change_Percent_Numeric'], 
+        scatter = ax2.scatter(self.df['PE_Ratio'], self.df['Change_Percent'], 
                             c=self.df['Price_Change'], cmap='viridis', alpha=0.7, s=100)
         ax2.set_title('PE Ratio vs Change Percentage', fontsize=14, fontweight='bold')
         ax2.set_xlabel('PE Ratio', fontsize=12)
@@ -126,44 +161,28 @@ class StockDataVisualizer:
         cbar.set_label('Price Change ($)', fontsize=10)
         
         plt.tight_layout()
-        plt.savefig(f'{self.output_dir}/pe_ratio_analysis.png', dpi=300, bbox_inches='tight')
+        saved = self.save_chart('pe_ratio_analysis')
         plt.close()
-        logger.info("PER 비율 분석 차트 생성 완료")
+        logger.info(f"PER 비율 분석 차트 생성 완료: {', '.join(saved)}")
     
     def create_volume_analysis(self):
         """거래량 분석 차트"""
         plt.figure(figsize=(12, 8))
         
-        # 거래량 데이터 정리 (M, K 단위 제거하고 숫자로 변환)
-        volume_numeric = []
-        for vol in self.df['Volume']:
-            if isinstance(vol, str):
-                if 'M' in vol:
-                    volume_numeric.append(float(vol.replace('M', '')) * 1000000)
-                elif 'K' in vol:
-                    volume_numeric.append(float(vol.replace('K', '')) * 1000)
-                else:
-                    try:
-                        volume_numeric.append(float(vol))
-                    except:
-                        volume_numeric.append(0)
-            else:
-                volume_numeric.append(vol if vol else 0)
-        
-        self.df['Volume_Numeric'] = volume_numeric
+        # 거래량(Volume)은 수집 시 float64로 저장됨 (값이 없으면 NaN)
         
         # 서브플롯 생성
         fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
         
         # 거래량 분포 (로그 스케일)
-        ax1.hist(np.log10(self.df['Volume_Numeric'] + 1), bins=15, alpha=0.7, color='orange', edgecolor='black')
+        ax1.hist(np.log10(self.df['Volume'].dropna() + 1), bins=15, alpha=0.7, color='orange', edgecolor='black')
         ax1.set_title('Volume Distribution (Log Scale)', fontsize=14, fontweight='bold')
         ax1.set_xlabel('Log10(Volume)', fontsize=12)
         ax1.set_ylabel('Frequency', fontsize=12)
         ax1.grid(True, alpha=0.3)
         
         # 거래량 vs 변동률
-        ax2.scatter(self.df['Volume_Numeric'], self.df['Change_Percent_Numeric'], 
+        ax2.scatter(self.df['Volume'], self.df['Change_Percent'], 
                    c=self.df['Price_Change'], cmap='plasma', alpha=0.7, s=100)
         ax2.set_title('Volume vs Change Percentage', fontsize=14, fontweight='bold')
         ax2.set_xlabel('Volume', fontsize=12)
@@ -172,18 +191,18 @@ class StockDataVisualizer:
         ax2.grid(True, alpha=0.3)
         
         plt.tight_layout()
-        plt.savefig(f'{self.output_dir}/volume_analysis.png', dpi=300, bbox_inches='tight')
+        saved = self.save_chart('volume_analysis')
         plt.close()
-        logger.info("거래량 분석 차트 생성 완료")
+        logger.info(f"거래량 분석 차트 생성 완료: {', '.join(saved)}")
     
     def create_performance_categories(self):
         """성과 구간별 분석 차트"""
         plt.figure(figsize=(12, 8))
         
         # 성과 구간 분류
-        high_performers = self.df[self.df['Change_Percent_Numeric'] >= 20]
-        medium_performers = self.df[(self.df['Change_Percent_Numeric'] >= 10) & (self.df['Change_Percent_Numeric'] < 20)]
-        low_performers = self.df[self.df['Change_Percent_Numeric'] < 10]
+        high_performers = self.df[self.df['Change_Percent'] >= 20]
+        medium_performers = self.df[(self.df['Change_Percent'] >= 10) & (self.df['Change_Percent'] < 20)]
+        low_performers = self.df[self.df['Change_Percent'] < 10]
         
         # 파이 차트
         fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
@@ -214,16 +233,16 @@ class StockDataVisualizer:
                     f'${value:.2f}', ha='center', va='bottom', fontweight='bold')
         
         plt.tight_layout()
-        plt.savefig(f'{self.output_dir}/performance_categories.png', dpi=300, bbox_inches='tight')
+        saved = self.save_chart('performance_categories')
         plt.close()
-        logger.info("성과 구간별 분석 차트 생성 완료")
+        logger.info(f"성과 구간별 분석 차트 생성 완료: {', '.join(saved)}")
     
     def create_correlation_heatmap(self):
         """상관관계 히트맵"""
         plt.figure(figsize=(10, 8))
         
         # 수치형 컬럼만 선택
-        numeric_columns = ['Price_Change', 'Change_Percent_Numeric', 'PE_Ratio', 'Volume_Numeric']
+        numeric_columns = ['Price_Change', 'Change_Percent', 'PE_Ratio', 'Volume']
         correlation_data = self.df[numeric_columns].corr()
         
         # 히트맵 생성
@@ -232,9 +251,9 @@ class StockDataVisualizer:
         
         plt.title('Correlation Heatmap of Stock Metrics', fontsize=16, fontweight='bold')
         plt.tight_layout()
-        plt.savefig(f'{self.output_dir}/correlation_heatmap.png', dpi=300, bbox_inches='tight')
+        saved = self.save_chart('correlation_heatmap')
         plt.close()
-        logger.info("상관관계 히트맵 생성 완료")
+        logger.info(f"상관관계 히트맵 생성 완료: {', '.join(saved)}")
     
     def create_summary_dashboard(self):
         """종합 대시보드"""
@@ -245,8 +264,8 @@ class StockDataVisualizer:
         
         # 1. 상위 5개 주식
         ax1 = fig.add_subplot(gs[0, 0])
-        top_5 = self.df.nlargest(5, 'Change_Percent_Numeric')
-        bars = ax1.bar(range(len(top_5)), top_5['Change_Percent_Numeric'], color='skyblue')
+        top_5 = self.df.nlargest(5, 'Change_Percent')
+        bars = ax1.bar(range(len(top_5)), top_5['Change_Percent'], color='skyblue')
         ax1.set_title('Top 5 Performers', fontweight='bold')
         ax1.set_ylabel('Change %')
         ax1.set_xticks(range(len(top_5)))
@@ -254,7 +273,7 @@ class StockDataVisualizer:
         
         # 2. 변동률 분포
         ax2 = fig.add_subplot(gs[0, 1])
-        ax2.hist(self.df['Change_Percent_Numeric'], bins=8, alpha=0.7, color='lightcoral')
+        ax2.hist(self.df['Change_Percent'], bins=8, alpha=0.7, color='lightcoral')
         ax2.set_title('Change % Distribution', fontweight='bold')
         ax2.set_xlabel('Change %')
         ax2.set_ylabel('Count')
@@ -268,7 +287,7 @@ class StockDataVisualizer:
         
         # 4. PER vs 변동률
         ax4 = fig.add_subplot(gs[1, 0])
-        scatter = ax4.scatter(self.df['PE_Ratio'], self.df['Change_Percent_Numeric'], 
+        scatter = ax4.scatter(self.df['PE_Ratio'], self.df['Change_Percent'], 
                             c=self.df['Price_Change'], cmap='viridis', alpha=0.7)
         ax4.set_title('PE Ratio vs Change %', fontweight='bold')
         ax4.set_xlabel('PE Ratio')
@@ -278,9 +297,9 @@ class StockDataVisualizer:
         ax5 = fig.add_subplot(gs[1, 1])
         categories = ['High', 'Medium', 'Low']
         counts = [
-            len(self.df[self.df['Change_Percent_Numeric'] >= 20]),
-            len(self.df[(self.df['Change_Percent_Numeric'] >= 10) & (self.df['Change_Percent_Numeric'] < 20)]),
-            len(self.df[self.df['Change_Percent_Numeric'] < 10])
+            len(self.df[self.df['Change_Percent'] >= 20]),
+            len(self.df[(self.df['Change_Percent'] >= 10) & (self.df['Change_Percent'] < 20)]),
+            len(self.df[self.df['Change_Percent'] < 10])
         ]
         ax5.pie(counts, labels=categories, autopct='%1.1f%%', startangle=90)
         ax5.set_title('Performance Categories', fontweight='bold')
@@ -293,9 +312,9 @@ class StockDataVisualizer:
         📊 STATISTICS SUMMARY
         
         Total Stocks: {len(self.df)}
-        Avg Change: {self.df['Change_Percent_Numeric'].mean():.1f}%
-        Max Change: {self.df['Change_Percent_Numeric'].max():.1f}%
-        Min Change: {self.df['Change_Percent_Numeric'].min():.1f}%
+        Avg Change: {self.df['Change_Percent'].mean():.1f}%
+        Max Change: {self.df['Change_Percent'].max():.1f}%
+        Min Change: {self.df['Change_Percent'].min():.1f}%
         
         Avg Price Change: ${self.df['Price_Change'].mean():.2f}
         Max Price Change: ${self.df['Price_Change'].max():.2f}
@@ -310,22 +329,66 @@ class StockDataVisualizer:
         plt.suptitle('Yahoo Finance Stock Gainers - Comprehensive Dashboard', 
                     fontsize=20, fontweight='bold', y=0.98)
         
-        plt.savefig(f'{self.output_dir}/summary_dashboard.png', dpi=300, bbox_inches='tight')
+        saved = self.save_chart('summary_dashboard')
         plt.close()
-        logger.info("종합 대시보드 생성 완료")
+        logger.info(f"종합 대시보드 생성 완료: {', '.join(saved)}")
+    
+    def stale_charts(self, cache):
+        """입력 데이터·설정이 바뀐 차트만 골라 {메서드명: 캐시 키} 반환"""
+        stale = {}
+        for name in self.CHART_METHODS:
+            stem, columns = self.CHARTS[name]
+            files = profile_files(stem, self.profile)
+            key = cache.key(name, self.df[columns], {
+                'files': files,
+                'profile': profile_settings(self.profile),
+                'code': method_fingerprint(getattr(type(self), name)),
+            })
+            if cache.hit(key):
+                logger.info(f"변경 없음, 기존 이미지 사용: {', '.join(files)}")
+            else:
+                stale[name] = key
+        return stale
+    
+    def render_charts(self, parallel=True, max_workers=None, use_cache=True):
+        """차트 메서드를 프로세스 풀(parallel=True) 또는 현재 프로세스에서 렌더링 (캐시된 차트는 건너뜀)"""
+        cache = RenderCache(self.output_dir) if use_cache else None
+        pending = self.stale_charts(cache) if cache else dict.fromkeys(self.CHART_METHODS)
+        if not pending:
+            self.render_timings = {}
+            cache.save()
+            return self.render_timings
+        
+        scheduler = RenderScheduler(
+            type(self),
+            init_kwargs={'excel_file': self.excel_file, 'storage_backend': self.storage_backend,
+                         'store_path': self.store_path},
+            attributes={'output_dir': self.output_dir, 'profile': self.profile},
+            max_workers=max_workers,
+        )
+        started = time.time()
+        if parallel:
+            try:
+                self.render_timings = scheduler.run(self.df, list(pending))
+            except (BrokenProcessPool, OSError) as e:
+                logger.warning(f"병렬 렌더링 실패, 순차 렌더링으로 전환: {e}")
+                self.render_timings = scheduler.run_serial(self, list(pending))
+        else:
+            self.render_timings = scheduler.run_serial(self, list(pending))
+        scheduler.report()
+        
+        if cache:
+            for name, key in pending.items():
+                cache.record(key, name, profile_files(self.CHARTS[name][0], self.profile), rendered_after=started)
+            cache.save()
+        return self.render_timings
     
-    def generate_all_visualizations(self):
-        """모든 시각화 생성"""
+    def generate_all_visualizations(self, parallel=True, max_workers=None, use_cache=True):
+        """모든 시각화 생성 (기본은 차트별 병렬 렌더링, 입력이 그대로인 차트는 재사용)"""
         logger.info("시각화 생성 시작")
         
         try:
-            self.create_price_change_distribution()
-            self.create_top_performers_chart()
-            self.create_pe_ratio_analysis()
-            self.create_volume_analysis()
-            self.create_performance_categories()
-            self.create_correlation_heatmap()
-            self.create_summary_dashboard()
+            self.render_charts(parallel=parallel, max_workers=max_workers, use_cache=use_cache)
             
             logger.info("모든 시각화 생성 완료")
             return True
@@ -343,13 +406,14 @@ def main():
         print("✅ 모든 시각화 이미지가 생성되었습니다!")
         print(f"📁 출력 폴더: {visualizer.output_dir}/")
         print("📊 생성된 차트:")
-        print("   - price_change_distribution.png: 가격 변동 분포")
-        print("   - top_performers_chart.png: 상위 성과 주식")
-        print("   - pe_ratio_analysis.png: PER 비율 분석")
-        print("   - volume_analysis.png: 거래량 분석")
-        print("   - performance_categories.png: 성과 구간별 분석")
-        print("   - correlation_heatmap.png: 상관관계 히트맵")
-        print("   - summary_dashboard.png: 종합 대시보드")
+        ext = '/'.join(PROFILES[visualizer.profile]['formats'])
+        print(f"   - price_change_distribution.{ext}: 가격 변동 분포")
+        print(f"   - top_performers_chart.{ext}: 상위 성과 주식")
+        print(f"   - pe_ratio_analysis.{ext}: PER 비율 분석")
+        print(f"   - volume_analysis.{ext}: 거래량 분석")
+        print(f"   - performance_categories.{ext}: 성과 구간별 분석")
+        print(f"   - correlation_heatmap.{ext}: 상관관계 히트맵")
+        print(f"   - summary_dashboard.{ext}: 종합 대시보드")
     else:
         print("❌ 시각화 생성에 실패했습니다.")
 
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+스크리너 페이지 테이블 파서
+- lxml: 미리 컴파일한 XPath로 테이블을 찾고 셀 텍스트만 추출 (기본)
+- bs4: BeautifulSoup(html.parser) 트리에서 CSS 선택자로 추출 (이전 방식, 비교용)
+스크리너별로 직전에 테이블을 찾은 선택자를 기억해 같은 스크리너의 다음 페이지에서 먼저 시도
+"""
+
+import logging
+from lxml import etree, html as lxml_html
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+# CSS 선택자 -> 같은 의미의 XPath (시도 순서대로)
+TABLE_SELECTORS = {
+    'table[data-testid="gainers-table"]': '//table[@data-testid="gainers-table"]',
+    'table': '//table',
+    'div[data-testid="gainers-table"] table': '//div[@data-testid="gainers-table"]//table',
+    'section table': '//section//table',
+}
+# 페이지의 첫 번째 테이블을 아무거나 잡는 선택자는 기억하지 않음 (다른 페이지에서 엉뚱한 테이블을 먼저 찾게 됨)
+GENERIC_SELECTORS = {'table'}
+COMPILED_SELECTORS = {css: etree.XPath(f"({xpath})[1]") for css, xpath in TABLE_SELECTORS.items()}
+ROW_XPATH = etree.XPath('.//tr')
+CELL_XPATH = etree.XPath('.//*[self::td or self::th]')
+
+BACKENDS = ['lxml', 'bs4']
+
+
+def _cell_text(cell):
+    """BeautifulSoup의 get_text(strip=True)와 같은 결과 (텍스트 조각별 공백 제거 후 연결)"""
+    return ''.join(text.strip() for text in cell.itertext() if text)
+
+
+class TableRowParser:
+    """페이지 HTML에서 테이블 행별 셀 텍스트 목록을 추출"""
+
+    def __init__(self, backend='lxml'):
+        if backend not in BACKENDS:
+            raise ValueError(f"지원하지 않는 파서: {backend}")
+        self.backend = backend
+        self.last_selectors = {}  # 스크리너(key) -> 직전에 테이블을 찾은 선택자
+
+    def selector_order(self, key=None):
+        """key(스크리너)에서 직전에 성공한 선택자를 맨 앞에 둔 시도 순서"""
+        last = self.last_selectors.get(key)
+        if last is None:
+            return list(TABLE_SELECTORS)
+        return [last] + [s for s in TABLE_SELECTORS if s != last]
+
+    def rows(self, html_content, key=None):
+        """헤더를 포함한 모든 행의 셀 텍스트 목록 (테이블이 없으면 None, key는 선택자를 기억할 스크리너 이름)"""
+        if self.backend == 'lxml':
+            return self._rows_lxml(html_content, key)
+        return self._rows_bs4(html_content, key)
+
+    def _remember(self, selector, key):
+        if selector != self.last_selectors.get(key):
+            logger.info(f"테이블 발견: {selector}")
+        if selector in GENERIC_SELECTORS:
+            self.last_selectors.pop(key, None)
+        else:
+            self.last_selectors[key] = selector
+
+    def _rows_lxml(self, html_content, key):
+        root = lxml_html.document_fromstring(html_content)
+        for selector in self.selector_order(key):
+            found = COMPILED_SELECTORS[selector](root)
+            if found:
+                self._remember(selector, key)
+                return [[_cell_text(cell) for cell in CELL_XPATH(row)] for row in ROW_XPATH(found[0])]
+        return None
+
+    def _rows_bs4(self, html_content, key):
+        soup = BeautifulSoup(html_content, 'html.parser')
+        for selector in self.selector_order(key):
+            table = soup.select_one(selector)
+            if table:
+                self._remember(selector, key)
+                return [[cell.get_text(strip=True) for cell in row.find_all(['td', 'th'])]
+                        for row in table.find_all('tr')]
+        return None
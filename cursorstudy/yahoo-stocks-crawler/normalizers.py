@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+스크리너 숫자 컬럼 정규화
+"+1.04", "+23.71%", "1.2M", "3.5B", "1,234.5", "--" 같은 셀 문자열을
+미리 컴파일한 정규식 하나로 컬럼 전체를 한 번에 float64로 변환 (변환할 수 없으면 NaN)
+- 부호(+, -, −)는 값에 반영, 퍼센트는 % 단위 그대로 (+23.71% -> 23.71)
+- K/M/B/T 접미사는 1e3/1e6/1e9/1e12 배
+"""
+
+import re
+import numpy as np
+import pandas as pd
+
+NUMBER_PATTERN = re.compile(
+    r'(?P<sign>[+\-−])?\s*(?P<number>(?:\d+(?:,\d{3})*)(?:\.\d*)?|\.\d+)\s*(?P<suffix>[KMBT])?',
+    re.IGNORECASE,
+)
+SUFFIX_MULTIPLIERS = {'K': 1e3, 'M': 1e6, 'B': 1e9, 'T': 1e12}
+NEGATIVE_SIGNS = ['-', '−']
+
+# 크롤러가 수집하는 숫자 컬럼 (수집 시 한 번만 변환)
+NUMERIC_COLUMNS = ['Price_Change', 'Change_Percent', 'Volume', 'Market_Cap', 'PE_Ratio', 'Avg_Volume']
+
+
+def to_float(values):
+    """셀 문자열 컬럼을 float64 Series로 변환 (이미 숫자면 그대로 float64)"""
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return series.astype('float64')
+
+    parts = series.astype('string').str.extract(NUMBER_PATTERN)
+    number = pd.to_numeric(parts['number'].str.replace(',', '', regex=False), errors='coerce')
+    multiplier = parts['suffix'].str.upper().map(SUFFIX_MULTIPLIERS)
+    sign = np.where(parts['sign'].isin(NEGATIVE_SIGNS), -1.0, 1.0)
+    result = number.to_numpy(dtype='float64', na_value=np.nan) * sign \
+        * multiplier.to_numpy(dtype='float64', na_value=1.0)
+
+    # 저장소에서 읽은 object 컬럼에는 이미 숫자로 저장된 값이 섞여 있을 수 있음
+    if series.dtype == object:
+        stored = pd.to_numeric(series, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+        result = np.where(np.isnan(stored), result, stored)
+    return pd.Series(result, index=series.index, name=series.name, dtype='float64')
+
+
+def normalize_frame(df, columns=NUMERIC_COLUMNS):
+    """데이터프레임의 숫자 컬럼을 float64로 변환한 복사본 반환 (없는 컬럼은 건너뜀)"""
+    normalized = df.copy()
+    for col in columns:
+        if col in normalized.columns:
+            normalized[col] = to_float(normalized[col])
+    return normalized
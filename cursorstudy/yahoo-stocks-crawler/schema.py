@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+주식 스크리너 데이터 스키마
+크롤러가 저장하는 데이터프레임의 컬럼·타입을 한 곳에서 정의
+- conform: 수집·로드 시 한 번만 스키마 타입으로 변환 (없는 컬럼은 명시적인 결측값으로 추가)
+- validate: 컬럼·타입만 확인 (값을 다시 파싱하지 않음), 통계·시각화는 검증된 데이터를 그대로 사용
+"""
+
+import pandas as pd
+from normalizers import NUMERIC_COLUMNS, normalize_frame
+
+# 컬럼 -> 타입 (숫자 컬럼은 결측값을 NaN으로 표현)
+SCHEMA = {
+    'Symbol': 'category',
+    'Name': 'string',
+    'Price_Change': 'float64',
+    'Change_Percent': 'float64',  # % 단위 (23.71 = +23.71%)
+    'Volume': 'float64',
+    'Market_Cap': 'float64',
+    'PE_Ratio': 'float64',
+    'Avg_Volume': 'float64',
+}
+
+
+class SchemaError(ValueError):
+    """데이터프레임이 스키마와 맞지 않을 때 발생"""
+
+
+def conform(df):
+    """스키마 컬럼을 앞에 두고 타입을 맞춘 복사본 반환 (스키마 밖의 컬럼은 뒤에 그대로 유지)"""
+    typed = normalize_frame(df, NUMERIC_COLUMNS)
+    for col, dtype in SCHEMA.items():
+        if col not in typed.columns:
+            typed[col] = pd.Series(pd.NA if dtype != 'float64' else float('nan'), index=typed.index)
+        if str(typed[col].dtype) != dtype:
+            typed[col] = typed[col].astype(dtype)
+    extra = [col for col in typed.columns if col not in SCHEMA]
+    return typed[list(SCHEMA) + extra]
+
+
+def validate(df):
+    """스키마 컬럼이 모두 있고 타입이 맞는지 확인하여 그대로 반환 (맞지 않으면 SchemaError)"""
+    if df is None:
+        raise SchemaError("데이터가 없습니다.")
+    missing = [col for col in SCHEMA if col not in df.columns]
+    if missing:
+        raise SchemaError(f"누락된 컬럼: {', '.join(missing)}")
+    mismatched = [f"{col}({df[col].dtype}, 기대 {dtype})" for col, dtype in SCHEMA.items()
+                  if str(df[col].dtype) != dtype]
+    if mismatched:
+        raise SchemaError(f"타입이 맞지 않는 컬럼: {', '.join(mismatched)}")
+    return df
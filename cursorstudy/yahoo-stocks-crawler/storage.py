@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+주식 상승률 스냅샷 저장소
+- Parquet: 크롤링할 때마다 수집 시각과 함께 날짜 파티션 파일로 추가 저장 (기본)
+  종목별 인덱스(종목 -> 파일·행 그룹)로 한 종목의 이력을 필요한 행 그룹만 읽어 조회하고,
+  지난 날짜의 작은 파일들은 compact로 종목 순으로 정렬된 일별 파일 하나로 병합
+- SQLite: WAL 모드, (symbol, screener, snapshot_time) 기준 upsert를 지원하는 스냅샷 테이블
+엑셀은 내보내기 전용으로 사용
+"""
+
+import os
+import sqlite3
+import logging
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from schema import conform
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_COLUMN = 'Snapshot_Time'
+PARTITION_COLUMN = 'snapshot_date'
+INDEX_FILE = '_symbol_index.parquet'
+COMPACTED_PREFIX = 'compacted-'
+COMPACT_ROW_GROUP_SIZE = 2000  # 병합 파일의 행 그룹 크기 (종목 순 정렬이므로 한 종목은 1~2개 행 그룹에 모임)
+SCREENER_COLUMN = 'Screener'
+DEFAULT_SCREENER = 'gainers'
+
+# SQLite 테이블 컬럼 -> 데이터프레임 컬럼 (선언 타입은 SQLITE_TYPES)
+SQLITE_COLUMNS = {
+    'symbol': 'Symbol',
+    'name': 'Name',
+    'price_change': 'Price_Change',
+    'change_percent': 'Change_Percent',
+    'volume': 'Volume',
+    'market_cap': 'Market_Cap',
+    'pe_ratio': 'PE_Ratio',
+    'avg_volume': 'Avg_Volume',
+    'screener': SCREENER_COLUMN,
+    'snapshot_time': SNAPSHOT_COLUMN,
+}
+SQLITE_TYPES = {
+    'symbol': 'TEXT NOT NULL',
+    'screener': f"TEXT NOT NULL DEFAULT '{DEFAULT_SCREENER}'",
+    'snapshot_time': 'TEXT NOT NULL',
+    'name': 'TEXT',
+    'price_change': 'REAL',
+    'change_percent': 'REAL',
+    'volume': 'REAL',
+    'market_cap': 'REAL',
+    'pe_ratio': 'REAL',
+    'avg_volume': 'REAL',
+}
+
+
+def with_screener(df):
+    """스크리너 컬럼이 없던 이전 스냅샷은 상승률(gainers) 스크리너로 간주"""
+    screener = df[SCREENER_COLUMN] if SCREENER_COLUMN in df.columns else pd.Series(pd.NA, index=df.index)
+    df[SCREENER_COLUMN] = screener.fillna(DEFAULT_SCREENER).astype('string')
+    return df
+
+
+def upgrade_frame(df):
+    """이전 형식(숫자가 "1.2M" 같은 문자열, 스크리너 없음)으로 저장된 스냅샷도 스키마 타입으로 변환"""
+    return conform(with_screener(df))
+
+
+def to_typed_frame(df, snapshot_time):
+    """크롤링 결과를 저장용 타입으로 변환하고 수집 시각 컬럼 추가"""
+    typed = upgrade_frame(df.copy())
+    typed[SNAPSHOT_COLUMN] = pd.Timestamp(snapshot_time).as_unit('ns')
+    return typed
+
+
+class SnapshotParquetStore:
+    """날짜 파티션 Parquet 스냅샷 저장소 (추가 전용)"""
+
+    def __init__(self, base_dir="yahoo_stocks_store"):
+        self.base_dir = base_dir
+
+    def exists(self):
+        """저장된 스냅샷이 있는지 확인"""
+        return bool(self._partitions())
+
+    def _partitions(self):
+        """날짜 파티션 디렉토리 목록 (오래된 순)"""
+        if not os.path.isdir(self.base_dir):
+            return []
+        return sorted(name for name in os.listdir(self.base_dir) if name.startswith(f"{PARTITION_COLUMN}="))
+
+    def _files(self, partitions=None):
+        """파티션별 Parquet 파일의 상대 경로 목록 (오래된 순, 병합 파일이 같은 날짜의 추가 파일보다 앞)"""
+        files = []
+        for partition in self._partitions() if partitions is None else partitions:
+            names = sorted(os.listdir(os.path.join(self.base_dir, partition)))
+            files.extend(f"{partition}/{name}" for name in names if name.endswith('.parquet'))
+        return files
+
+    def _read(self, file):
+        """파일 하나를 읽어 현재 스키마 타입으로 변환"""
+        return upgrade_frame(pd.read_parquet(os.path.join(self.base_dir, file)))
+
+    def append(self, df, snapshot_time=None):
+        """스냅샷 하나를 새 파일로 추가 (기존 파일은 수정하지 않음)"""
+        snapshot_time = snapshot_time or datetime.now()
+        typed = to_typed_frame(df, snapshot_time)
+
+        partition_dir = os.path.join(self.base_dir, f"{PARTITION_COLUMN}={snapshot_time:%Y-%m-%d}")
+        os.makedirs(partition_dir, exist_ok=True)
+        path = os.path.join(partition_dir, f"part-{snapshot_time:%Y%m%dT%H%M%S%f}.parquet")
+        typed.to_parquet(path + ".tmp", index=False)
+        os.replace(path + ".tmp", path)
+        logger.info(f"스냅샷 저장 완료: {path} ({len(typed)}개 행)")
+        self.symbol_index()  # 새 파일을 종목별 인덱스에 추가
+        return path
+
+    def load(self, start=None, end=None):
+        """기간(스냅샷 날짜)으로 필터링하여 모든 스냅샷 로드"""
+        partitions = self._partitions()
+        if start is not None:
+            partitions = [p for p in partitions if p >= f"{PARTITION_COLUMN}={pd.Timestamp(start):%Y-%m-%d}"]
+        if end is not None:
+            partitions = [p for p in partitions if p <= f"{PARTITION_COLUMN}={pd.Timestamp(end):%Y-%m-%d}"]
+        # 이전 형식의 파일이 섞여 있을 수 있으므로 파일별로 읽어 현재 타입으로 맞춘 뒤 합침
+        frames = [self._read(file) for file in self._files(partitions)]
+        if not frames:
+            return pd.DataFrame(columns=list(SQLITE_COLUMNS.values()))
+        df = conform(pd.concat(frames, ignore_index=True))  # 파일마다 다른 Symbol 범주를 하나로 합침
+        return df.sort_values(SNAPSHOT_COLUMN).reset_index(drop=True)
+
+    def load_latest(self):
+        """가장 최근 스냅샷 하나만 로드"""
+        partitions = self._partitions()
+        if not partitions:
+            return None
+        # 마지막 파일이 병합 파일이면 그날의 스냅샷이 모두 들어 있으므로 마지막 수집 시각만 남김
+        df = self._read(self._files(partitions[-1:])[-1])
+        latest = df[df[SNAPSHOT_COLUMN] == df[SNAPSHOT_COLUMN].max()]
+        return latest.reset_index(drop=True)
+
+    def _index_file(self, file):
+        """파일의 행 그룹별 종목·수집 시각 범위 (Symbol·수집 시각 컬럼만 읽음)"""
+        parquet = pq.ParquetFile(os.path.join(self.base_dir, file))
+        entries = []
+        for row_group in range(parquet.num_row_groups):
+            part = parquet.read_row_group(row_group, columns=['Symbol', SNAPSHOT_COLUMN]).to_pandas()
+            times = part.groupby(part['Symbol'].astype(str))[SNAPSHOT_COLUMN].agg(['min', 'max', 'size'])
+            entries.append(pd.DataFrame({
+                'Symbol': times.index, 'file': file, 'row_group': row_group,
+                'first_time': times['min'].to_numpy(), 'last_time': times['max'].to_numpy(),
+                'rows': times['size'].to_numpy(),
+            }))
+        return entries
+
+    def symbol_index(self):
+        """종목별 인덱스 (Symbol 순 정렬). 디스크의 파일 목록과 다르면 추가·삭제된 파일만 반영하여 저장"""
+        path = os.path.join(self.base_dir, INDEX_FILE)
+        index = pd.read_parquet(path) if os.path.exists(path) else None
+        files = set(self._files())
+        indexed = set() if index is None else set(index['file'].unique())
+        if index is not None and files == indexed:
+            return index
+
+        entries = [] if index is None else [index[index['file'].isin(files)]]
+        for file in sorted(files - indexed):
+            entries.extend(self._index_file(file))
+        entries = [entry for entry in entries if len(entry)]
+        if not entries:
+            return pd.DataFrame(columns=['Symbol', 'file', 'row_group', 'first_time', 'last_time', 'rows'])
+        index = pd.concat(entries, ignore_index=True).sort_values(['Symbol', 'file', 'row_group'], ignore_index=True)
+        os.makedirs(self.base_dir, exist_ok=True)
+        index.to_parquet(path + ".tmp", index=False)
+        os.replace(path + ".tmp", path)
+        logger.info(f"종목별 인덱스 갱신: {len(files - indexed)}개 파일 추가, {len(indexed - files)}개 파일 제거")
+        return index
+
+    def history(self, symbol, start=None, end=None):
+        """한 종목의 모든 스냅샷 (인덱스에서 찾은 행 그룹만 읽음, 기간은 스냅샷 날짜 기준)"""
+        index = self.symbol_index()
+        symbols = index['Symbol'].to_numpy(dtype=object)
+        lo, hi = np.searchsorted(symbols, symbol, side='left'), np.searchsorted(symbols, symbol, side='right')
+        hits = index.iloc[lo:hi]
+        start = pd.Timestamp(start).normalize() if start is not None else None
+        end = pd.Timestamp(end).normalize() + pd.Timedelta(days=1) if end is not None else None
+        if start is not None:
+            hits = hits[hits['last_time'] >= start]
+        if end is not None:
+            hits = hits[hits['first_time'] < end]
+
+        # 행 그룹을 Arrow 테이블로 읽어 종목 행만 남긴 뒤 한 번에 스키마 타입으로 변환
+        frames = []
+        for file, groups in hits.groupby('file', sort=True)['row_group']:
+            table = pq.ParquetFile(os.path.join(self.base_dir, file)).read_row_groups(sorted(groups))
+            table = table.filter(pc.equal(table['Symbol'].cast(pa.string()), symbol))
+            frames.append(table.to_pandas())
+        if not frames:
+            return conform(pd.DataFrame(columns=list(SQLITE_COLUMNS.values())))
+        df = upgrade_frame(pd.concat(frames, ignore_index=True))
+        if start is not None:
+            df = df[df[SNAPSHOT_COLUMN] >= start]
+        if end is not None:
+            df = df[df[SNAPSHOT_COLUMN] < end]
+        return df.sort_values(SNAPSHOT_COLUMN).reset_index(drop=True)
+
+    def compact(self, until=None, row_group_size=COMPACT_ROW_GROUP_SIZE):
+        """until 이전 날짜(기본: 오늘 이전)의 파티션마다 파일들을 종목·수집 시각 순으로 정렬한 파일 하나로 병합"""
+        until = f"{PARTITION_COLUMN}={pd.Timestamp(until or datetime.now()):%Y-%m-%d}"
+        compacted = []
+        for partition in self._partitions():
+            files = self._files([partition])
+            if partition >= until or len(files) < 2:
+                continue
+            df = conform(pd.concat([self._read(file) for file in files], ignore_index=True))
+            # 이전 병합이 파일 삭제 전에 중단되었으면 같은 스냅샷이 두 번 들어 있을 수 있음
+            df = df.drop_duplicates(['Symbol', SCREENER_COLUMN, SNAPSHOT_COLUMN], keep='last')
+            df = df.sort_values(['Symbol', SNAPSHOT_COLUMN], key=lambda s: s.astype(str) if s.name == 'Symbol' else s)
+
+            target = f"{partition}/{COMPACTED_PREFIX}{partition.split('=', 1)[1]}.parquet"
+            path = os.path.join(self.base_dir, target)
+            df.to_parquet(path + ".tmp", index=False, row_group_size=row_group_size)
+            os.replace(path + ".tmp", path)
+            for file in files:
+                if file != target:
+                    os.remove(os.path.join(self.base_dir, file))
+            logger.info(f"파티션 병합 완료: {partition} ({len(files)}개 파일 -> 1개, {len(df)}개 행)")
+            compacted.append(partition)
+        if compacted:
+            self.symbol_index()
+        return compacted
+
+
+class SQLiteSnapshotStore:
+    """SQLite 스냅샷 저장소 (stock_gainer_snapshots 테이블)"""
+
+    def __init__(self, db_path="yahoo_stocks.db"):
+        self.db_path = db_path
+
+    def connect(self):
+        """WAL 모드 연결 생성 (테이블·인덱스가 없으면 생성)"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_table(conn)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_snapshots_time ON stock_gainer_snapshots (snapshot_time)")
+        return conn
+
+    def _create_table(self, conn):
+        """스냅샷 테이블 생성 (컬럼 구성·타입이 다른 이전 테이블은 현재 스키마로 옮겨 재생성)"""
+        existing = {row[1]: row[2] for row in conn.execute("PRAGMA table_info(stock_gainer_snapshots)")}
+        expected = {name: declared.split()[0] for name, declared in SQLITE_TYPES.items()}
+        if existing and existing != expected:
+            self._migrate_table(conn, [c for c in existing if c in SQLITE_TYPES])
+            return
+        columns = ",\n".join(f"{name} {declared}" for name, declared in SQLITE_TYPES.items())
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS stock_gainer_snapshots (
+                {columns},
+                PRIMARY KEY (symbol, screener, snapshot_time)
+            )
+        """)
+
+    def _migrate_table(self, conn, columns):
+        """이전 테이블의 행을 현재 스키마로 옮김 (screener가 없으면 gainers, 숫자 문자열은 REAL로 변환)"""
+        old = pd.read_sql_query(f"SELECT {', '.join(columns)} FROM stock_gainer_snapshots", conn)
+        old = upgrade_frame(old.rename(columns=SQLITE_COLUMNS)).rename(columns={v: k for k, v in SQLITE_COLUMNS.items()})
+        values = old.reindex(columns=list(SQLITE_COLUMNS)).astype(object)
+        values = values.where(values.notna(), None)
+        with conn:
+            conn.execute("DROP INDEX IF EXISTS idx_snapshots_time")
+            conn.execute("ALTER TABLE stock_gainer_snapshots RENAME TO stock_gainer_snapshots_old")
+            self._create_table(conn)
+            conn.executemany(f"""
+                INSERT INTO stock_gainer_snapshots ({', '.join(SQLITE_COLUMNS)})
+                VALUES ({', '.join('?' for _ in SQLITE_COLUMNS)})
+            """, values.itertuples(index=False, name=None))
+            conn.execute("DROP TABLE stock_gainer_snapshots_old")
+        logger.info(f"스냅샷 테이블을 현재 스키마로 변환 완료 ({len(values)}개 행)")
+
+    def exists(self):
+        """저장된 스냅샷이 있는지 확인"""
+        if not os.path.exists(self.db_path):
+            return False
+        conn = self.connect()
+        try:
+            return conn.execute("SELECT 1 FROM stock_gainer_snapshots LIMIT 1").fetchone() is not None
+        finally:
+            conn.close()
+
+    def append(self, df, snapshot_time=None):
+        """스냅샷 하나를 추가 (같은 종목·수집 시각은 새 데이터로 갱신)"""
+        snapshot_time = snapshot_time or datetime.now()
+        typed = to_typed_frame(df, snapshot_time)
+        typed[SNAPSHOT_COLUMN] = typed[SNAPSHOT_COLUMN].dt.strftime('%Y-%m-%d %H:%M:%S.%f')
+
+        columns = [c for c in SQLITE_COLUMNS if SQLITE_COLUMNS[c] in typed.columns]
+        values = typed[[SQLITE_COLUMNS[c] for c in columns]].astype(object)
+        values = values.where(values.notna(), None)
+        updates = ", ".join(f"{c} = excluded.{c}" for c in columns if c not in ('symbol', 'screener', 'snapshot_time'))
+        conn = self.connect()
+        try:
+            with conn:
+                conn.executemany(f"""
+                    INSERT INTO stock_gainer_snapshots ({', '.join(columns)})
+                    VALUES ({', '.join('?' for _ in columns)})
+                    ON CONFLICT(symbol, screener, snapshot_time) DO UPDATE SET {updates}
+                """, values.itertuples(index=False, name=None))
+        finally:
+            conn.close()
+        logger.info(f"스냅샷 저장 완료: {self.db_path} ({len(typed)}개 행)")
+        return snapshot_time
+
+    def _query(self, where="", params=()):
+        conn = self.connect()
+        try:
+            df = pd.read_sql_query(
+                f"SELECT {', '.join(SQLITE_COLUMNS)} FROM stock_gainer_snapshots {where} ORDER BY snapshot_time",
+                conn, params=params)
+        finally:
+            conn.close()
+        df = upgrade_frame(df.rename(columns=SQLITE_COLUMNS))
+        df[SNAPSHOT_COLUMN] = pd.to_datetime(df[SNAPSHOT_COLUMN])
+        return df
+
+    def load(self, start=None, end=None):
+        """기간(스냅샷 날짜)으로 필터링하여 모든 스냅샷 로드"""
+        conditions, params = [], []
+        if start is not None:
+            conditions.append("snapshot_time >= ?")
+            params.append(f"{pd.Timestamp(start):%Y-%m-%d}")
+        if end is not None:
+            conditions.append("snapshot_time < date(?, '+1 day')")
+            params.append(f"{pd.Timestamp(end):%Y-%m-%d}")
+        where = "WHERE " + " AND ".join(conditions) if conditions else ""
+        return self._query(where, params)
+
+    def history(self, symbol, start=None, end=None):
+        """한 종목의 모든 스냅샷 ((symbol, screener, snapshot_time) 기본 키로 조회, 기간은 스냅샷 날짜 기준)"""
+        conditions, params = ["symbol = ?"], [symbol]
+        if start is not None:
+            conditions.append("snapshot_time >= ?")
+            params.append(f"{pd.Timestamp(start):%Y-%m-%d}")
+        if end is not None:
+            conditions.append("snapshot_time < date(?, '+1 day')")
+            params.append(f"{pd.Timestamp(end):%Y-%m-%d}")
+        return self._query("WHERE " + " AND ".join(conditions), params)
+
+    def load_latest(self):
+        """가장 최근 스냅샷 하나만 로드"""
+        if not self.exists():
+            return None
+        return self._query("WHERE snapshot_time = (SELECT MAX(snapshot_time) FROM stock_gainer_snapshots)")
+
+
+def open_store(backend="parquet", path=None):
+    """저장소 백엔드 선택 ("parquet" 또는 "sqlite")"""
+    if backend == "parquet":
+        return SnapshotParquetStore(path or "yahoo_stocks_store")
+    if backend == "sqlite":
+        return SQLiteSnapshotStore(path or "yahoo_stocks.db")
+    raise ValueError(f"지원하지 않는 저장소 백엔드: {backend}")
@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+"""
+테스트 공통 설정
+- 프로젝트 디렉토리와 crawler_common 패키지를 import 경로에 추가
+"""
+
+import os
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+import common_path  # crawler_common 패키지 경로 추가
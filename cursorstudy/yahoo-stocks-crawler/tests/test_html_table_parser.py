@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""스크리너 페이지 테이블 파서 테스트 (스크리너별 선택자 기억)"""
+
+import pytest
+
+from html_table_parser import TableRowParser, BACKENDS
+
+NAV = '<table><tr><td>nav</td></tr></table>'
+GAINERS = f'<html><body>{NAV}<table data-testid="gainers-table"><tr><td>G</td></tr></table></body></html>'
+LOSERS = '<html><body><table><tr><td>L</td></tr></table></body></html>'
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_generic_table_match_does_not_leak_into_other_screeners(backend):
+    parser = TableRowParser(backend)
+
+    assert parser.rows(GAINERS, 'gainers') == [['G']]
+    assert parser.rows(LOSERS, 'losers') == [['L']]
+    assert parser.rows(GAINERS, 'gainers') == [['G']]
+    # 스크리너를 구분하지 않아도 아무 테이블이나 잡는 선택자는 기억하지 않음
+    assert parser.rows(LOSERS) == [['L']]
+    assert parser.rows(GAINERS) == [['G']]
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_specific_selector_is_tried_first_for_the_same_screener(backend):
+    parser = TableRowParser(backend)
+    parser.rows(GAINERS, 'gainers')
+
+    assert parser.selector_order('gainers')[0] == 'table[data-testid="gainers-table"]'
+    assert parser.selector_order('losers') == parser.selector_order()
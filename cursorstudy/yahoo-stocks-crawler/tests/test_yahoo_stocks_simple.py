@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""간단 크롤러 실행 결과 테스트 (네트워크 없이 스크리너 페이지를 직접 넘김)"""
+
+from yahoo_stocks_simple import YahooStocksSimpleCrawler
+
+CELLS = ['AAA', 'A Co', '', '10.5+1.0(+5%)', '+1.0', '+5%', '1M', '2B', '10', '1M']
+PAGE = ('<table><tr><th>Symbol</th></tr><tr>' + ''.join(f'<td>{cell}</td>' for cell in CELLS)
+        + '</tr></table>')
+
+
+def make_crawler(tmp_path, pages):
+    crawler = YahooStocksSimpleCrawler(store_path=str(tmp_path / "store"), export_excel=False)
+    crawler.fetch_screeners = lambda: pages
+    return crawler
+
+
+def test_run_saves_snapshot(tmp_path):
+    crawler = make_crawler(tmp_path, [('gainers', 0, PAGE)])
+
+    assert crawler.run()
+    assert crawler.store.exists()
+
+
+def test_run_fails_when_store_append_fails(tmp_path):
+    crawler = make_crawler(tmp_path, [('gainers', 0, PAGE)])
+
+    def fail(df):
+        raise OSError("disk full")
+    crawler.store.append = fail
+
+    assert not crawler.run()
+
+
+def test_run_fails_when_required_screener_is_missing(tmp_path):
+    crawler = make_crawler(tmp_path, [('gainers', 0, None), ('losers', 0, PAGE)])
+    crawler.screeners.append('losers')
+
+    assert not crawler.run()
+    assert not crawler.store.exists()
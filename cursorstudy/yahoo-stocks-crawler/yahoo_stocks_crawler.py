@@ -5,44 +5,42 @@ Yahoo Finance 주식 상승률 크롤러
 https://finance.yahoo.com/markets/stocks/gainers/ 에서 주식 상승률 데이터를 수집하여 엑셀 파일로 저장
 """
 
-import time
 import pandas as pd
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
+import common_path  # crawler_common 패키지 경로 추가
+from crawler_common.webdriver_utils import shared_pool, WaitTimer, wait_for_any_selector, wait_for_rows
 import logging
-import re
+from storage import open_store
+from schema import conform
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class YahooStocksCrawler:
-    def __init__(self):
+    # 테이블을 찾을 때 시도할 선택자 (우선순위 순)
+    TABLE_SELECTORS = [
+        "section[class*='mainContent'] table",
+        "table[data-testid='gainers-table']",
+        "table",
+        "div[data-testid='gainers-table'] table"
+    ]
+    
+    def __init__(self, driver_pool=None, storage_backend="parquet", store_path=None, export_excel=True):
         self.url = "https://finance.yahoo.com/markets/stocks/gainers/"
+        self.store = open_store(storage_backend, store_path)  # 기본 저장소 (Parquet 또는 SQLite)
+        self.export_excel = export_excel  # 엑셀은 내보내기 전용
         self.driver = None
+        self.driver_pool = driver_pool or shared_pool()  # 드라이버는 항상 풀에서 대여 (기본은 프로세스 공용 풀)
+        self.table_selector = None
+        self.wait_timer = WaitTimer()
         self.data = []
         
     def setup_driver(self):
         """Chrome WebDriver 설정"""
         try:
-            chrome_options = Options()
-            chrome_options.add_argument("--headless")  # 브라우저 창을 띄우지 않음
-            chrome_options.add_argument("--no-sandbox")
-            chrome_options.add_argument("--disable-dev-shm-usage")
-            chrome_options.add_argument("--disable-gpu")
-            chrome_options.add_argument("--window-size=1920,1080")
-            chrome_options.add_argument("--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-            
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
-            self.driver.implicitly_wait(10)
-            logger.info("Chrome WebDriver 설정 완료")
+            self.driver = self.driver_pool.acquire()
+            logger.info("WebDriver 풀에서 드라이버 대여")
             return True
         except Exception as e:
             logger.error(f"WebDriver 설정 실패: {e}")
@@ -54,31 +52,19 @@ class YahooStocksCrawler:
             logger.info(f"페이지 로드 중: {self.url}")
             self.driver.get(self.url)
             
-            # 페이지 로드 대기 시간 증가
-            time.sleep(10)
+            # 고정 대기 대신 테이블과 데이터 행이 실제로 나타날 때까지 대기
+            def wait_for_table():
+                selector, _ = wait_for_any_selector(self.driver, self.TABLE_SELECTORS)
+                return selector, wait_for_rows(self.driver, f"{selector} tbody tr")
             
-            # 여러 선택자로 테이블 찾기 시도
-            table_selectors = [
-                "section[class*='mainContent'] table",
-                "table[data-testid='gainers-table']",
-                "table",
-                "div[data-testid='gainers-table'] table"
-            ]
-            
-            table = None
-            for selector in table_selectors:
-                try:
-                    table = self.driver.find_element(By.CSS_SELECTOR, selector)
-                    logger.info(f"테이블 발견: {selector}")
-                    break
-                except:
-                    continue
-            
-            if not table:
+            try:
+                self.table_selector, row_count = self.wait_timer.measure("페이지 로드", wait_for_table)
+            except Exception:
                 logger.error("테이블을 찾을 수 없습니다.")
                 return False
             
-            logger.info("페이지 로드 완료")
+            logger.info(f"테이블 발견: {self.table_selector}")
+            logger.info(f"페이지 로드 완료 (행 {row_count}개)")
             return True
         except Exception as e:
             logger.error(f"페이지 로드 실패: {e}")
@@ -87,13 +73,10 @@ class YahooStocksCrawler:
     def extract_stock_data(self):
         """주식 데이터 추출"""
         try:
-            # 여러 선택자로 테이블 찾기 시도
-            table_selectors = [
-                "section[class*='mainContent'] table",
-                "table[data-testid='gainers-table']",
-                "table",
-                "div[data-testid='gainers-table'] table"
-            ]
+            # 로드 시 찾은 선택자를 먼저 시도
+            table_selectors = self.TABLE_SELECTORS
+            if self.table_selector:
+                table_selectors = [self.table_selector] + [s for s in self.TABLE_SELECTORS if s != self.table_selector]
             
             table = None
             for selector in table_selectors:
@@ -127,16 +110,16 @@ class YahooStocksCrawler:
                         pe_ratio = cells[6].text.strip() if len(cells) > 6 else ""
                         avg_volume = cells[7].text.strip() if len(cells) > 7 else ""
                         
-                        # 데이터 정리
+                        # 숫자 컬럼은 추출을 마친 뒤 스키마 타입으로 한 번에 변환
                         data_row = {
                             'Symbol': symbol,
                             'Name': name,
-                            'Price_Change': self._clean_price_data(price_change),
-                            'Change_Percent': self._clean_percent_data(change_percent),
-                            'Volume': self._clean_volume_data(volume),
-                            'Market_Cap': self._clean_market_cap_data(market_cap),
-                            'PE_Ratio': self._clean_pe_ratio_data(pe_ratio),
-                            'Avg_Volume': self._clean_volume_data(avg_volume)
+                            'Price_Change': price_change,
+                            'Change_Percent': change_percent,
+                            'Volume': volume,
+                            'Market_Cap': market_cap,
+                            'PE_Ratio': pe_ratio,
+                            'Avg_Volume': avg_volume
                         }
                         
                         self.data.append(data_row)
@@ -146,6 +129,10 @@ class YahooStocksCrawler:
                     logger.warning(f"행 {i} 데이터 추출 실패: {e}")
                     continue
             
+            # 스키마 타입으로 변환 (+1.04, +23.71%, 1.2M -> float64, 빈 값 -> NaN)
+            if self.data:
+                self.data = conform(pd.DataFrame(self.data)).to_dict('records')
+            
             logger.info(f"총 {len(self.data)}개 주식 데이터 추출 완료")
             return len(self.data) > 0
             
@@ -153,60 +140,17 @@ class YahooStocksCrawler:
             logger.error(f"주식 데이터 추출 실패: {e}")
             return False
     
-    def _clean_price_data(self, price_str):
-        """가격 데이터 정리"""
+    def save_to_store(self):
+        """수집한 데이터를 스냅샷 저장소에 추가"""
         try:
-            # +, - 기호와 숫자만 추출
-            cleaned = re.sub(r'[^\d\.\+\-]', '', price_str)
-            if cleaned:
-                return cleaned
-            return price_str
-        except:
-            return price_str
-    
-    def _clean_percent_data(self, percent_str):
-        """퍼센트 데이터 정리"""
-        try:
-            # +, - 기호와 숫자, % 기호만 추출
-            cleaned = re.sub(r'[^\d\.\+\-%]', '', percent_str)
-            if cleaned:
-                return cleaned
-            return percent_str
-        except:
-            return percent_str
-    
-    def _clean_volume_data(self, volume_str):
-        """거래량 데이터 정리"""
-        try:
-            # 숫자와 K, M, B 단위만 추출
-            cleaned = re.sub(r'[^\d\.KM]', '', volume_str)
-            if cleaned:
-                return cleaned
-            return volume_str
-        except:
-            return volume_str
-    
-    def _clean_market_cap_data(self, market_cap_str):
-        """시가총액 데이터 정리"""
-        try:
-            # 숫자와 K, M, B 단위만 추출
-            cleaned = re.sub(r'[^\d\.KM]', '', market_cap_str)
-            if cleaned:
-                return cleaned
-            return market_cap_str
-        except:
-            return market_cap_str
-    
-    def _clean_pe_ratio_data(self, pe_str):
-        """PER 데이터 정리"""
-        try:
-            # 숫자와 소수점만 추출
-            cleaned = re.sub(r'[^\d\.]', '', pe_str)
-            if cleaned:
-                return cleaned
-            return pe_str
-        except:
-            return pe_str
+            if not self.data:
+                logger.warning("저장할 데이터가 없습니다.")
+                return False
+            self.store.append(pd.DataFrame(self.data))
+            return True
+        except Exception as e:
+            logger.error(f"스냅샷 저장소 저장 실패: {e}")
+            return False
     
     def save_to_excel(self, filename="yahoo_stocks_gainers.xlsx"):
         """데이터를 엑셀 파일로 저장"""
@@ -263,9 +207,13 @@ class YahooStocksCrawler:
             if not self.extract_stock_data():
                 return False
             
-            # 엑셀 파일로 저장
+            # 스냅샷 저장소에 저장 후 엑셀로 내보내기
             if self.data:
-                self.save_to_excel()
+                # 스냅샷 저장소가 기준 데이터이므로 저장에 실패하면 엑셀도 내보내지 않고 실패로 처리
+                if not self.save_to_store():
+                    return False
+                if self.export_excel:
+                    self.save_to_excel()
                 logger.info(f"크롤링 완료! 총 {len(self.data)}개의 주식 데이터를 수집했습니다.")
                 return True
             else:
@@ -277,9 +225,11 @@ class YahooStocksCrawler:
             return False
         
         finally:
+            self.wait_timer.report()
             if self.driver:
-                self.driver.quit()
-                logger.info("WebDriver 종료")
+                self.driver_pool.release(self.driver)
+                self.driver = None
+                logger.info("WebDriver 풀에 드라이버 반납")
 
 def main():
     """메인 함수"""
@@ -2,23 +2,33 @@
 # -*- coding: utf-8 -*-
 """
 Yahoo Finance 주식 상승률 크롤러 (Simple Version)
-requests와 BeautifulSoup을 사용하여 더 안정적으로 크롤링
+aiohttp와 lxml(또는 BeautifulSoup)을 사용하여 더 안정적으로 크롤링
 """
 
-import requests
 import pandas as pd
-from bs4 import BeautifulSoup
 import logging
-import re
-import time
+from storage import open_store, SCREENER_COLUMN
+from async_fetcher import AsyncScreenerFetcher
+from html_table_parser import TableRowParser
+from schema import conform
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# 통계·시각화가 사용하는 스크리너 (모든 페이지를 받아 행이 있어야 스냅샷을 저장)
+REQUIRED_SCREENERS = ['gainers']
+
 class YahooStocksSimpleCrawler:
-    def __init__(self):
-        self.url = "https://finance.yahoo.com/markets/stocks/gainers/"
+    def __init__(self, storage_backend="parquet", store_path=None, export_excel=True, screeners=None, pages=1,
+                 parser="lxml", required_screeners=None):
+        self.store = open_store(storage_backend, store_path)  # 기본 저장소 (Parquet 또는 SQLite)
+        self.export_excel = export_excel  # 엑셀은 내보내기 전용
+        self.screeners = list(screeners or ['gainers'])  # gainers, losers, most_active, trending
+        self.pages = pages  # 스크리너별 페이지 수 (start 오프셋)
+        required = REQUIRED_SCREENERS if required_screeners is None else required_screeners
+        self.required_screeners = [s for s in required if s in self.screeners]  # 설정된 것만 확인
+        self.table_parser = TableRowParser(parser)  # lxml(기본) 또는 bs4
         self.data = []
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -28,87 +38,54 @@ class YahooStocksSimpleCrawler:
             'Connection': 'keep-alive',
         }
         
-    def load_page(self):
-        """웹페이지 로드"""
-        try:
-            logger.info(f"페이지 로드 중: {self.url}")
-            
-            # 세션 생성
-            session = requests.Session()
-            session.headers.update(self.headers)
-            
-            # 페이지 요청
-            response = session.get(self.url, timeout=30)
-            response.raise_for_status()
-            
-            logger.info(f"페이지 로드 완료. 상태 코드: {response.status_code}")
-            return response.text
-            
-        except Exception as e:
-            logger.error(f"페이지 로드 실패: {e}")
-            return None
+    def fetch_screeners(self):
+        """설정된 스크리너의 모든 페이지를 동시에 요청: [(스크리너, 오프셋, HTML 또는 None)]"""
+        fetcher = AsyncScreenerFetcher(self.headers, self.screeners, self.pages)
+        return fetcher.fetch()
     
-    def extract_stock_data(self, html_content):
-        """주식 데이터 추출"""
+    def extract_stock_data(self, html_content, screener="gainers"):
+        """주식 데이터 추출 (screener: 데이터를 가져온 스크리너 이름)"""
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            # 테이블 찾기 - 여러 선택자 시도
-            table = None
-            table_selectors = [
-                'table[data-testid="gainers-table"]',
-                'table',
-                'div[data-testid="gainers-table"] table',
-                'section table'
-            ]
-            
-            for selector in table_selectors:
-                table = soup.select_one(selector)
-                if table:
-                    logger.info(f"테이블 발견: {selector}")
-                    break
-            
-            if not table:
+            # 테이블 찾기 - 여러 선택자 시도 (같은 스크리너에서 직전에 찾은 선택자 우선), 행별 셀 텍스트 추출
+            rows = self.table_parser.rows(html_content, screener)
+            if rows is None:
                 logger.error("테이블을 찾을 수 없습니다.")
                 return False
-            
-            # 테이블의 모든 행 찾기
-            rows = table.find_all('tr')
             logger.info(f"발견된 행 수: {len(rows)}")
             
             # 헤더 행 건너뛰기 (첫 번째 행)
-            for i, row in enumerate(rows[1:], 1):
+            for i, cells in enumerate(rows[1:], 1):
                 try:
-                    cells = row.find_all(['td', 'th'])
                     if len(cells) >= 6:  # 최소 6개 컬럼이 있어야 함
                         # 각 셀에서 데이터 추출
-                        symbol = cells[0].get_text(strip=True)
-                        name = cells[1].get_text(strip=True)
+                        symbol = cells[0]
+                        name = cells[1]
                         
                         # 실제 구조에 맞게 데이터 추출
                         # 셀 2: 빈 값 (차트/아이콘)
                         # 셀 3: 전체 가격 정보 (203.71+39.04(+23.71%))
                         # 셀 4: 가격 변동 (+39.04)
                         # 셀 5: 변동률 (+23.71%)
-                        price_change = cells[4].get_text(strip=True) if len(cells) > 4 else ""
-                        change_percent = cells[5].get_text(strip=True) if len(cells) > 5 else ""
+                        price_change = cells[4] if len(cells) > 4 else ""
+                        change_percent = cells[5] if len(cells) > 5 else ""
                         
                         # 추가 컬럼들 (있는 경우)
-                        volume = cells[6].get_text(strip=True) if len(cells) > 6 else ""
-                        market_cap = cells[7].get_text(strip=True) if len(cells) > 7 else ""
-                        pe_ratio = cells[8].get_text(strip=True) if len(cells) > 8 else ""
-                        avg_volume = cells[9].get_text(strip=True) if len(cells) > 9 else ""
+                        volume = cells[6] if len(cells) > 6 else ""
+                        market_cap = cells[7] if len(cells) > 7 else ""
+                        pe_ratio = cells[8] if len(cells) > 8 else ""
+                        avg_volume = cells[9] if len(cells) > 9 else ""
                         
-                        # 데이터 정리
+                        # 숫자 컬럼은 run에서 모든 페이지를 모은 뒤 스키마 타입으로 한 번에 변환
                         data_row = {
                             'Symbol': symbol,
                             'Name': name,
-                            'Price_Change': price_change,  # 이미 정리된 형태
-                            'Change_Percent': change_percent,  # 이미 정리된 형태
-                            'Volume': self._clean_volume_data(volume),
-                            'Market_Cap': self._clean_market_cap_data(market_cap),
-                            'PE_Ratio': self._clean_pe_ratio_data(pe_ratio),
-                            'Avg_Volume': self._clean_volume_data(avg_volume)
+                            'Price_Change': price_change,
+                            'Change_Percent': change_percent,
+                            'Volume': volume,
+                            'Market_Cap': market_cap,
+                            'PE_Ratio': pe_ratio,
+                            'Avg_Volume': avg_volume,
+                            SCREENER_COLUMN: screener
                         }
                         
                         self.data.append(data_row)
@@ -125,88 +102,17 @@ class YahooStocksSimpleCrawler:
             logger.error(f"주식 데이터 추출 실패: {e}")
             return False
     
-    def _clean_price_data(self, price_str):
-        """가격 데이터 정리"""
-        try:
-            # +, - 기호와 숫자만 추출
-            cleaned = re.sub(r'[^\d\.\+\-]', '', price_str)
-            if cleaned:
-                return cleaned
-            return price_str
-        except:
-            return price_str
-    
-    def _clean_percent_data(self, percent_str):
-        """퍼센트 데이터 정리"""
-        try:
-            # +, - 기호와 숫자, % 기호만 추출
-            cleaned = re.sub(r'[^\d\.\+\-%]', '', percent_str)
-            if cleaned:
-                return cleaned
-            return percent_str
-        except:
-            return percent_str
-    
-    def _clean_volume_data(self, volume_str):
-        """거래량 데이터 정리"""
-        try:
-            # 숫자와 K, M, B 단위만 추출
-            cleaned = re.sub(r'[^\d\.KM]', '', volume_str)
-            if cleaned:
-                return cleaned
-            return volume_str
-        except:
-            return volume_str
-    
-    def _clean_market_cap_data(self, market_cap_str):
-        """시가총액 데이터 정리"""
+    def save_to_store(self):
+        """수집한 데이터를 스냅샷 저장소에 추가"""
         try:
-            # 숫자와 K, M, B 단위만 추출
-            cleaned = re.sub(r'[^\d\.KM]', '', market_cap_str)
-            if cleaned:
-                return cleaned
-            return market_cap_str
-        except:
-            return market_cap_str
-    
-    def _clean_pe_ratio_data(self, pe_str):
-        """PER 데이터 정리"""
-        try:
-            # 숫자와 소수점만 추출
-            cleaned = re.sub(r'[^\d\.]', '', pe_str)
-            if cleaned:
-                return cleaned
-            return pe_str
-        except:
-            return pe_str
-    
-    def _parse_price_change_data(self, price_text, percent_text):
-        """가격 변동 데이터 파싱"""
-        try:
-            # 가격 변동 텍스트에서 절대 변동값 추출 (예: "203.71+39.04(+23.71%)" -> 39.04)
-            price_change = ""
-            change_percent = ""
-            
-            # 가격 변동 텍스트에서 + 또는 - 뒤의 숫자 추출
-            price_match = re.search(r'[+-](\d+\.?\d*)', price_text)
-            if price_match:
-                price_change = price_match.group(1)
-                # + 기호가 있으면 양수, - 기호가 있으면 음수
-                if '+' in price_text:
-                    price_change = '+' + price_change
-                else:
-                    price_change = '-' + price_change
-            
-            # 퍼센트 텍스트에서 퍼센트 값 추출
-            percent_match = re.search(r'([+-]?\d+\.?\d*)%', percent_text)
-            if percent_match:
-                change_percent = percent_match.group(1) + '%'
-            
-            return price_change, change_percent
-            
+            if not self.data:
+                logger.warning("저장할 데이터가 없습니다.")
+                return False
+            self.store.append(pd.DataFrame(self.data))
+            return True
         except Exception as e:
-            logger.warning(f"가격 변동 데이터 파싱 실패: {e}")
-            return price_text, percent_text
+            logger.error(f"스냅샷 저장소 저장 실패: {e}")
+            return False
     
     def save_to_excel(self, filename="yahoo_stocks_gainers.xlsx"):
         """데이터를 엑셀 파일로 저장"""
@@ -233,7 +139,8 @@ class YahooStocksSimpleCrawler:
                     'E': 15,  # Volume
                     'F': 20,  # Market_Cap
                     'G': 12,  # PE_Ratio
-                    'H': 15   # Avg_Volume
+                    'H': 15,  # Avg_Volume
+                    'I': 12   # Screener
                 }
                 
                 for col, width in column_widths.items():
@@ -251,18 +158,37 @@ class YahooStocksSimpleCrawler:
         try:
             logger.info("Yahoo Finance 주식 상승률 크롤링을 시작합니다.")
             
-            # 페이지 로드
-            html_content = self.load_page()
-            if not html_content:
+            # 스크리너 페이지 동시 로드
+            fetched = self.fetch_screeners()
+            failed = {screener for screener, _, html in fetched if not html}
+            pages = [(screener, html) for screener, _, html in fetched if html]
+            if not pages:
                 return False
             
-            # 주식 데이터 추출
-            if not self.extract_stock_data(html_content):
+            # 주식 데이터 추출 (스크리너별로 같은 종목이 여러 페이지에 나오면 하나만 유지)
+            for screener, html_content in pages:
+                self.extract_stock_data(html_content, screener)
+            
+            # 필수 스크리너의 페이지가 빠졌거나 행이 없으면 불완전한 스냅샷을 저장하지 않음
+            extracted = {row[SCREENER_COLUMN] for row in self.data}
+            missing = [s for s in self.required_screeners if s in failed or s not in extracted]
+            if missing:
+                logger.error(f"필수 스크리너 데이터가 없어 스냅샷을 저장하지 않습니다: {', '.join(missing)}")
                 return False
+            if failed:
+                logger.warning(f"일부 페이지를 받지 못한 스크리너: {', '.join(sorted(failed))}")
+            if self.data:
+                # 스키마 타입으로 변환 (+1.04, +23.71%, 1.2M -> float64, 빈 값 -> NaN)
+                df = pd.DataFrame(self.data).drop_duplicates([SCREENER_COLUMN, 'Symbol'])
+                self.data = conform(df).to_dict('records')
             
-            # 엑셀 파일로 저장
+            # 스냅샷 저장소에 저장 후 엑셀로 내보내기
             if self.data:
-                self.save_to_excel()
+                # 스냅샷 저장소가 기준 데이터이므로 저장에 실패하면 엑셀도 내보내지 않고 실패로 처리
+                if not self.save_to_store():
+                    return False
+                if self.export_excel:
+                    self.save_to_excel()
                 logger.info(f"크롤링 완료! 총 {len(self.data)}개의 주식 데이터를 수집했습니다.")
                 return True
             else: